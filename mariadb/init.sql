@@ -4,7 +4,13 @@ CREATE TABLE IF NOT EXISTS Event (
     message VARCHAR(255) NOT NULL,
     severity_ID INT NOT NULL,
     event_type_ID INT NOT NULL,
-    source_ID INT NOT NULL
+    source_ID INT NOT NULL,
+    -- Keyset pagination on (timestamp, id), optionally after an equality
+    -- filter; see src/pagination.py.
+    KEY idx_event_ts (timestamp, id),
+    KEY idx_event_source_ts (source_ID, timestamp, id),
+    KEY idx_event_severity_ts (severity_ID, timestamp, id),
+    KEY idx_event_type_ts (event_type_ID, timestamp, id)
 );
 
 CREATE TABLE IF NOT EXISTS Severity (
@@ -59,3 +65,56 @@ INSERT INTO Location (name, country, city) VALUES
 ('US-01', 'USA', 'New York'),
 ('DE-01', 'Germany', 'Frankfurt');
 
+
+-- Message templates of the "templated" schema profile, which stores
+-- Event.message as template_ID and message_param; see src/message_templates.py.
+CREATE TABLE IF NOT EXISTS MessageTemplate (
+    id SMALLINT NOT NULL PRIMARY KEY,
+    template VARCHAR(255) NOT NULL
+);
+
+INSERT INTO MessageTemplate (id, template) VALUES
+(1, 'System startup completed'),
+(2, 'System shutdown initiated'),
+(3, 'Service restart required'),
+(4, 'Memory usage at {}%'),
+(5, 'CPU utilization peaked at {}%'),
+(6, 'Failed login attempt from IP {}'),
+(7, 'Suspicious activity detected'),
+(8, 'Firewall rule updated'),
+(9, 'New security patch applied'),
+(10, 'User account locked after {} attempts'),
+(11, 'Response time exceeded {}ms'),
+(12, 'Database query took {}ms'),
+(13, 'Network latency increased to {}ms'),
+(14, 'Queue size reached {}'),
+(15, 'User {} logged in successfully'),
+(16, 'Password change attempted'),
+(17, 'Configuration updated by admin'),
+(18, 'New user account created');
+
+
+-- Event counts per minute and per hour, see src/rollups.py.
+CREATE TABLE IF NOT EXISTS Event_rollup_minute (
+    bucket DATETIME NOT NULL,
+    severity_ID INT NOT NULL,
+    event_type_ID INT NOT NULL,
+    source_ID INT NOT NULL,
+    event_count BIGINT NOT NULL,
+    PRIMARY KEY (bucket, severity_ID, event_type_ID, source_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Event_rollup_hour (
+    bucket DATETIME NOT NULL,
+    severity_ID INT NOT NULL,
+    event_type_ID INT NOT NULL,
+    source_ID INT NOT NULL,
+    event_count BIGINT NOT NULL,
+    PRIMARY KEY (bucket, severity_ID, event_type_ID, source_ID)
+);
+
+-- Last Event id folded into the rollups by the compactor.
+CREATE TABLE IF NOT EXISTS Rollup_watermark (
+    name VARCHAR(63) PRIMARY KEY,
+    last_event_id BIGINT NOT NULL
+);
@@ -0,0 +1,79 @@
+"""
+Storage backends process_data() can benchmark.
+
+Backends are registered by import path and only imported when first
+created, so an engine's client library is needed only if it is used.
+"""
+import importlib
+import inspect
+from .base import QUERY_SHAPES, StorageBackend
+
+_REGISTRY = {
+    "mariadb": "maria:MariaDBBackend",
+    "influxdb": "influx:InfluxDBBackend",
+    "sqlite": "embedded:SQLiteBackend",
+    "duckdb": "embedded:DuckDBBackend",
+}
+
+
+def register_backend(name, target):
+    """
+    Registers a backend under a name.
+
+    Args:
+        name (str): Name used in the `backend` endpoint parameter.
+        target (str | type): A class, or "module:Class" relative to this package.
+    """
+    _REGISTRY[name] = target
+
+
+def available_backends():
+    """Returns the names of all registered backends."""
+    return sorted(_REGISTRY)
+
+
+def get_backend_class(name):
+    """
+    Resolves a registered backend name to its class, importing it if needed.
+
+    Raises:
+        ValueError: If no backend is registered under that name.
+    """
+    target = _REGISTRY.get(name)
+    if target is None:
+        raise ValueError(f"Unknown backend: {name}")
+    if isinstance(target, str):
+        module_name, class_name = target.split(":")
+        module = importlib.import_module(f".{module_name}", __name__)
+        target = getattr(module, class_name)
+        _REGISTRY[name] = target
+    return target
+
+
+def create_backend(name, **options):
+    """
+    Creates a backend instance.
+
+    Options the backend's constructor does not accept are ignored, so callers
+    can pass engine-specific settings without checking which engine is used.
+
+    Args:
+        name (str): A registered backend name.
+        **options: Constructor arguments.
+
+    Returns:
+        StorageBackend: The new backend.
+    """
+    backend_class = get_backend_class(name)
+    accepted = inspect.signature(backend_class).parameters
+    return backend_class(**{key: value for key, value in options.items() if key in accepted})
+
+
+__all__ = [
+    "QUERY_SHAPES",
+    "StorageBackend",
+    "available_backends",
+    "create_backend",
+    "get_backend_class",
+    "register_backend",
+]
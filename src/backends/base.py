@@ -0,0 +1,60 @@
+from typing import Protocol
+from ..result_stream import DEFAULT_BATCH_SIZE
+
+# Query shapes every backend answers, named after the select_*_events_mariadb helpers.
+QUERY_SHAPES = ("all", "simple", "join")
+
+
+class StorageBackend(Protocol):
+    """
+    Operations process_data() needs from a storage engine.
+
+    Write operations return True on success and False on failure, query
+    operations return a list of event dicts with the keys timestamp, message,
+    severity_ID, event_type_ID and source_ID, mirroring the MariaDB helpers.
+    """
+
+    # Human-readable engine name used in benchmark messages.
+    name: str
+    # Insert engine recorded with each benchmark result.
+    engine: str
+
+    def insert(self, events_data, report=None) -> bool:
+        """Bulk-inserts row dicts or a column dict; fills report with insert stats if given."""
+
+    def delete_range(self, num_entries, report=None) -> bool:
+        """Deletes the num_entries events with the lowest ids, or the closest equivalent; fills report if given."""
+
+    def update(self, report=None) -> bool:
+        """Moves events with severity_ID 2 to severity_ID 3; fills report with update stats if given."""
+
+    def truncate(self) -> bool:
+        """Removes all events."""
+
+    def purge_before(self, cutoff, report=None) -> bool:
+        """Removes events older than the cutoff datetime; fills report with delete stats if given."""
+
+    def select_all(self) -> list:
+        """Returns every event."""
+
+    def select_simple(self) -> list:
+        """Returns events with severity_ID 2."""
+
+    def select_join(self) -> list:
+        """Returns events whose source is located in the USA."""
+
+    def stream(self, query, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple"):
+        """Streams a QUERY_SHAPES query in bounded batches; see result_stream.stream_rows()."""
+
+    def close(self) -> None:
+        """Releases resources held by the backend instance."""
+
+    # Backends with selectable physical designs additionally provide
+    # apply_profile(name) -> bool and a `profile` attribute naming the
+    # design in use; process_data() tags results with it and refuses
+    # operations for which unsupported_operation(operation), if provided,
+    # returns an error message. Backends that can observe lock contention
+    # provide lock_stats() -> dict of counters, which the workload driver
+    # diffs around a run. Backends with pre-aggregated rollups provide
+    # aggregate(dimension, source, granularity) -> list and reset_rollups()
+    # for the "aggregate" benchmark.
@@ -0,0 +1,329 @@
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import time
+from ..result_stream import DEFAULT_BATCH_SIZE, iter_cursor
+from ..tracing import phase
+from ..generator import SAMPLE_DATA, column_messages, event_rows, events_length, is_columnar, slice_columns
+
+# Rows per executemany() call.
+CHUNK_SIZE = 50000
+
+EVENT_COLUMNS = "timestamp, message, severity_ID, event_type_ID, source_ID"
+
+SELECT_QUERIES = {
+    "all": f"SELECT {EVENT_COLUMNS} FROM Event",
+    "simple": f"""
+    SELECT {EVENT_COLUMNS} FROM Event
+    WHERE severity_ID = 2
+    """,
+    "join": """
+    SELECT e.timestamp, e.message, e.severity_ID, e.event_type_ID, e.source_ID FROM Event e
+    JOIN Source s ON e.source_ID = s.id
+    JOIN Location l ON s.location_id = l.id
+    WHERE l.country = 'USA'
+    """,
+}
+
+DIMENSION_TABLES = """
+CREATE TABLE IF NOT EXISTS Severity (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(63) NOT NULL,
+    description VARCHAR(255)
+);
+CREATE TABLE IF NOT EXISTS Event_type (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(63) NOT NULL,
+    description VARCHAR(255)
+);
+CREATE TABLE IF NOT EXISTS Source (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(63) NOT NULL,
+    ip_address VARCHAR(45) NOT NULL,
+    location_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS Location (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(63) NOT NULL,
+    country VARCHAR(63) NOT NULL,
+    city VARCHAR(63) NOT NULL
+);
+"""
+
+
+def dimension_rows():
+    """
+    Builds the Severity, Event_type, Source and Location rows from SAMPLE_DATA,
+    with the same ids mariadb/init.sql assigns.
+
+    Returns:
+        dict: Table name -> list of row tuples, id first.
+    """
+    return {
+        "Severity": [
+            (i, severity["name"], severity["description"])
+            for i, severity in enumerate(SAMPLE_DATA["severities"], start=1)
+        ],
+        "Event_type": [
+            (i, event_type["name"], event_type["description"])
+            for i, event_type in enumerate(SAMPLE_DATA["event_types"], start=1)
+        ],
+        "Source": [
+            (i, source["name"], source["ip_address"], i)
+            for i, source in enumerate(SAMPLE_DATA["sources"], start=1)
+        ],
+        "Location": [
+            (i, source["location"]["name"], source["location"]["country"], source["location"]["city"])
+            for i, source in enumerate(SAMPLE_DATA["sources"], start=1)
+        ],
+    }
+
+
+class EmbeddedSQLBackend(ABC):
+    """
+    Shared StorageBackend implementation for in-process DB-API engines.
+
+    Subclasses open the connection and provide the Event DDL. One instance
+    owns one connection; calls are serialized with a lock so an instance can
+    be shared between request threads.
+
+    Args:
+        path (str): Database file, or ":memory:".
+    """
+
+    name = None
+    engine = "executemany"
+    event_table_ddl = None
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = self.connect(path)
+        self.create_schema()
+
+    @abstractmethod
+    def connect(self, path):
+        """Opens the DB-API connection to path."""
+
+    def create_schema(self):
+        cursor = self.conn.cursor()
+        for statement in (self.event_table_ddl + DIMENSION_TABLES).split(";"):
+            if statement.strip():
+                cursor.execute(statement)
+        for table, rows in dimension_rows().items():
+            cursor.execute(f"DELETE FROM {table}")
+            placeholders = ", ".join("?" for _ in rows[0])
+            cursor.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+        self.conn.commit()
+        cursor.close()
+
+    def _execute(self, query, params=(), report=None):
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                with phase("execute"):
+                    cursor.execute(query, params)
+                rows = self._affected_rows(cursor)
+                with phase("commit"):
+                    self.conn.commit()
+                cursor.close()
+        except self.errors as e:
+            print(f"Error executing query: {e}")
+            return False
+        if report is not None:
+            elapsed = time.perf_counter() - started
+            report.update({
+                'rows': rows,
+                'seconds': round(elapsed, 6),
+                'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else None,
+            })
+        return True
+
+    def _affected_rows(self, cursor):
+        return cursor.rowcount
+
+    def _fetch(self, query):
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                with phase("execute"):
+                    cursor.execute(query)
+                with phase("fetch"):
+                    results = cursor.fetchall()
+                cursor.close()
+        except self.errors as e:
+            print(f"Error fetching query results: {e}")
+            return []
+        with phase("materialize", rows=len(results)):
+            return [
+                {
+                    'timestamp': event[0],
+                    'message': event[1],
+                    'severity_ID': event[2],
+                    'event_type_ID': event[3],
+                    'source_ID': event[4]
+                }
+                for event in results
+            ]
+
+    def _insert_rows(self, cursor, events_data):
+        insert_query = f"INSERT INTO Event ({EVENT_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+        for i in range(0, events_length(events_data), CHUNK_SIZE):
+            with phase("serialize"):
+                values = event_rows(events_data, i, i + CHUNK_SIZE)
+            with phase("execute", rows=len(values)):
+                cursor.executemany(insert_query, values)
+
+    def insert(self, events_data, report=None):
+        total_rows = events_length(events_data)
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                self._insert_rows(cursor, events_data)
+                with phase("commit"):
+                    self.conn.commit()
+                cursor.close()
+        except (self.errors, ValueError) as e:
+            print(f"Error inserting events into {self.name}: {e}")
+            return False
+        elapsed = time.perf_counter() - started
+        print(f"Inserted {total_rows} rows into the Event table.")
+        if report is not None:
+            report.update({
+                'rows': total_rows,
+                'seconds': round(elapsed, 6),
+                'rows_per_sec': round(total_rows / elapsed, 1) if elapsed > 0 else None,
+            })
+        return True
+
+    def delete_range(self, num_entries, report=None):
+        # Ids keep growing across truncates, so count from the lowest one left.
+        return self._execute("DELETE FROM Event WHERE id < (SELECT MIN(id) FROM Event) + ?", (num_entries,),
+                             report)
+
+    def update(self, report=None):
+        return self._execute("UPDATE Event SET severity_ID = 3 WHERE severity_ID = 2", report=report)
+
+    def truncate(self):
+        return self._execute("DELETE FROM Event")
+
+    def purge_before(self, cutoff, report=None):
+        return self._execute("DELETE FROM Event WHERE timestamp < ?", (f"{cutoff:%Y-%m-%d %H:%M:%S}",))
+
+    def select_all(self):
+        return self._fetch(SELECT_QUERIES["all"])
+
+    def select_simple(self):
+        return self._fetch(SELECT_QUERIES["simple"])
+
+    def select_join(self):
+        return self._fetch(SELECT_QUERIES["join"])
+
+    def stream(self, query, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple"):
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(SELECT_QUERIES[query])
+                yield from iter_cursor(cursor, batch_size, row_format)
+            finally:
+                cursor.close()
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteBackend(EmbeddedSQLBackend):
+    """
+    SQLite implementation of StorageBackend.
+
+    Args:
+        path (str): Database file. Defaults to SQLITE_PATH or "events.sqlite".
+    """
+
+    name = "SQLite"
+    errors = sqlite3.Error
+    # AUTOINCREMENT keeps ids growing across deletes, like MariaDB's AUTO_INCREMENT.
+    event_table_ddl = """
+    CREATE TABLE IF NOT EXISTS Event (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        message VARCHAR(255) NOT NULL,
+        severity_ID INT NOT NULL,
+        event_type_ID INT NOT NULL,
+        source_ID INT NOT NULL
+    );
+    """
+
+    def __init__(self, path=None):
+        super().__init__(path or os.environ.get('SQLITE_PATH', 'events.sqlite'))
+
+    def connect(self, path):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+
+class DuckDBBackend(EmbeddedSQLBackend):
+    """
+    DuckDB implementation of StorageBackend. Requires the optional duckdb package.
+
+    Column dicts are inserted by scanning the NumPy arrays directly instead of
+    going through executemany.
+
+    Args:
+        path (str): Database file. Defaults to DUCKDB_PATH or "events.duckdb".
+    """
+
+    name = "DuckDB"
+    engine = "numpy_scan"
+    # No primary key: DuckDB's ART index only slows bulk loads, and ids come
+    # from a sequence so they still grow across deletes.
+    event_table_ddl = """
+    CREATE SEQUENCE IF NOT EXISTS event_id_seq;
+    CREATE TABLE IF NOT EXISTS Event (
+        id BIGINT DEFAULT nextval('event_id_seq'),
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        message VARCHAR(255) NOT NULL,
+        severity_ID INT NOT NULL,
+        event_type_ID INT NOT NULL,
+        source_ID INT NOT NULL
+    );
+    """
+
+    def __init__(self, path=None):
+        import duckdb
+        self.errors = duckdb.Error
+        super().__init__(path or os.environ.get('DUCKDB_PATH', 'events.duckdb'))
+
+    def connect(self, path):
+        import duckdb
+        return duckdb.connect(path)
+
+    def _affected_rows(self, cursor):
+        # DuckDB returns the count of a DELETE or UPDATE as its result row.
+        return cursor.fetchone()[0]
+
+    def _insert_rows(self, cursor, events_data):
+        if not is_columnar(events_data):
+            return super()._insert_rows(cursor, events_data)
+        for i in range(0, events_length(events_data), CHUNK_SIZE):
+            columns = slice_columns(events_data, i, i + CHUNK_SIZE)
+            # Scanned by name from this frame by DuckDB's replacement scan.
+            with phase("serialize"):
+                event_chunk = {
+                    'timestamp': columns['timestamp'],
+                    'message': column_messages(columns),
+                    'severity_ID': columns['severity_ID'],
+                    'event_type_ID': columns['event_type_ID'],
+                    'source_ID': columns['source_ID'],
+                }
+            with phase("execute", rows=len(columns['timestamp'])):
+                cursor.execute(f"""
+                INSERT INTO Event ({EVENT_COLUMNS})
+                SELECT epoch_ms(timestamp * 1000), message, severity_ID, event_type_ID, source_ID
+                FROM event_chunk
+                """)
@@ -0,0 +1,60 @@
+from ..influx import (
+    clear_events_influxdb,
+    delete_events_influxdb,
+    insert_events_influxdb,
+    purge_events_influxdb,
+    select_all_events_influxdb,
+    select_join_events_influxdb,
+    select_simple_events_influxdb,
+    stream_events_influxdb,
+    update_simple_events_influxdb,
+)
+from ..result_stream import DEFAULT_BATCH_SIZE
+
+
+class InfluxDBBackend:
+    """
+    InfluxDB implementation of StorageBackend on top of src/influx.py.
+
+    Args:
+        batch_size (int): Points per HTTP write. None uses INFLUXDB_BATCH_SIZE.
+        flush_interval (int): Milliseconds before a partial batch is sent.
+    """
+
+    name = "InfluxDB"
+    engine = "write_api"
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def insert(self, events_data, report=None):
+        return insert_events_influxdb(events_data, batch_size=self.batch_size,
+                                      flush_interval=self.flush_interval, report=report)
+
+    def delete_range(self, num_entries, report=None):
+        return delete_events_influxdb(num_entries)
+
+    def update(self, report=None):
+        return update_simple_events_influxdb()
+
+    def truncate(self):
+        return clear_events_influxdb()
+
+    def purge_before(self, cutoff, report=None):
+        return purge_events_influxdb(cutoff)
+
+    def select_all(self):
+        return select_all_events_influxdb()
+
+    def select_simple(self):
+        return select_simple_events_influxdb()
+
+    def select_join(self):
+        return select_join_events_influxdb()
+
+    def stream(self, query, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple"):
+        return stream_events_influxdb(query, batch_size=batch_size, row_format=row_format)
+
+    def close(self):
+        pass
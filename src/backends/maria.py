@@ -0,0 +1,132 @@
+from ..maria import (
+    aggregate_events_mariadb,
+    INSERT_ENGINES,
+    JOIN_PATHS,
+    clear_events_table,
+    delete_events_mariadb,
+    insert_events_mariadb,
+    lock_status_mariadb,
+    purge_events_mariadb,
+    reset_rollups_mariadb,
+    select_all_events_mariadb,
+    select_join_events_mariadb,
+    select_simple_events_mariadb,
+    stream_events_mariadb,
+    update_simple_events_mariadb,
+)
+from ..db_pool import get_pool
+from ..keyed_batches import DEFAULT_KEYED_BATCH_SIZE
+from ..result_stream import DEFAULT_BATCH_SIZE
+from ..retention import RETENTION_BATCH_SIZE, RETENTION_STRATEGIES
+from ..schema_profiles import apply_profile, get_active_profile, unsupported_operation
+from ..statements import STATEMENT_MODES
+
+
+class MariaDBBackend:
+    """
+    MariaDB implementation of StorageBackend on top of the pooled helpers in src/maria.py.
+
+    Args:
+        engine (str): One of INSERT_ENGINES.
+        workers (int): Writer connections for the "executemany" engine.
+        commit_every (int): Chunks per commit; 0 commits once at the end and requires workers=1.
+        retention (str): How deletes run, one of RETENTION_STRATEGIES.
+        retention_batch_size (int): Ids per DELETE for the batched strategies.
+        retention_throttle_ms (int): Pause between delete batches.
+        update_batch_size (int): Ids per UPDATE.
+        rollups (bool): Maintain the rollup tables on insert. None follows ROLLUP_MODE.
+        join_path (str): How the "join" shape filters by country, one of JOIN_PATHS.
+        statements (str): How inserts and selects are sent, one of STATEMENT_MODES.
+            None follows SQL_STATEMENT_MODE.
+    """
+
+    name = "MariaDb"
+
+    def __init__(self, engine="executemany", workers=1, commit_every=1, retention="batched",
+                 retention_batch_size=RETENTION_BATCH_SIZE, retention_throttle_ms=0,
+                 update_batch_size=DEFAULT_KEYED_BATCH_SIZE, rollups=None, join_path="join",
+                 statements=None):
+        if engine not in INSERT_ENGINES:
+            raise ValueError(f"Unknown insert engine: {engine}")
+        if retention not in RETENTION_STRATEGIES:
+            raise ValueError(f"Unknown retention strategy: {retention}")
+        if join_path not in JOIN_PATHS:
+            raise ValueError(f"Unknown join path: {join_path}")
+        if statements is not None and statements not in STATEMENT_MODES:
+            raise ValueError(f"Unknown statement mode: {statements}")
+        if commit_every == 0 and workers > 1:
+            raise ValueError("commit_every=0 commits once at the end and needs workers=1")
+        self.engine = engine
+        self.workers = workers
+        self.commit_every = commit_every
+        self.retention = retention
+        self.update_batch_size = update_batch_size
+        self.rollups = rollups
+        self.join_path = join_path
+        self.statements = statements
+        self._retention_options = {
+            'batch_size': retention_batch_size,
+            'throttle': retention_throttle_ms / 1000,
+        }
+
+    def insert(self, events_data, report=None):
+        return insert_events_mariadb(events_data, engine=self.engine, workers=self.workers,
+                                     commit_every=self.commit_every, report=report, rollups=self.rollups,
+                                     statement_mode=self.statements)
+
+    def delete_range(self, num_entries, report=None):
+        return delete_events_mariadb(num_entries, self.retention, report=report, **self._retention_options)
+
+    def update(self, report=None):
+        return update_simple_events_mariadb(batch_size=self.update_batch_size, report=report)
+
+    def truncate(self):
+        return clear_events_table(self.retention, **self._retention_options)
+
+    def purge_before(self, cutoff, report=None):
+        return purge_events_mariadb(cutoff, self.retention, report=report, **self._retention_options)
+
+    def select_all(self):
+        return select_all_events_mariadb(statement_mode=self.statements)
+
+    def select_simple(self):
+        return select_simple_events_mariadb(statement_mode=self.statements)
+
+    def select_join(self):
+        return select_join_events_mariadb(self.join_path, statement_mode=self.statements)
+
+    def stream(self, query, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple"):
+        return stream_events_mariadb(query, batch_size=batch_size, row_format=row_format, join_path=self.join_path)
+
+    def apply_profile(self, profile):
+        """Recreates the Event table with a schema profile, see schema_profiles.PROFILES."""
+        return apply_profile(profile)
+
+    def unsupported_operation(self, operation):
+        """Returns why the active schema profile cannot run a benchmark operation, or None."""
+        return unsupported_operation(operation)
+
+    def aggregate(self, dimension, source="rollup", granularity="hour"):
+        """Runs a dashboard aggregate from the rollups or the raw events, see rollups.AGGREGATES."""
+        return aggregate_events_mariadb(dimension, source, granularity)
+
+    def reset_rollups(self):
+        return reset_rollups_mariadb()
+
+    def lock_stats(self):
+        """Server row lock counters plus this process's connection pool waits."""
+        pool = get_pool().stats()
+        stats = lock_status_mariadb()
+        stats.update({
+            'pool_waits': pool['waits'],
+            'pool_wait_time_ms': pool['wait_time_ms'],
+            'pool_timeouts': pool['timeouts'],
+        })
+        return stats
+
+    @property
+    def profile(self):
+        return get_active_profile()
+
+    def close(self):
+        pass
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of the row-based generate_data() against the columnar generators.
+
+With --memory every case is run once more under tracemalloc to report its
+peak allocation and the time the garbage collector spent during the call.
+
+Usage:
+    python -m src.bench_generator --rows 1000000 --repeat 3 --memory
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from .event_batch import EventBatch
+from .generator import generate_batch, generate_columns, generate_data, event_rows
+
+
+def time_call(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def measure_memory(func):
+    """
+    Runs func once and returns (peak traced MB, ms spent in garbage collection).
+    """
+    gc_started = []
+    gc_ms = []
+
+    def on_gc(gc_phase, info):
+        if gc_phase == "start":
+            gc_started.append(time.perf_counter())
+        elif gc_started:
+            gc_ms.append((time.perf_counter() - gc_started.pop()) * 1000)
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(on_gc)
+    del result
+    return peak / 1024 / 1024, sum(gc_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--memory', action='store_true', help='also report peak memory and GC time')
+    args = parser.parse_args()
+
+    cases = {
+        'generate_data (rows)': lambda: generate_data(args.rows),
+        'generate_columns': lambda: generate_columns(args.rows, seed=args.seed),
+        'generate_batch': lambda: generate_batch(args.rows, seed=args.seed),
+        'generate_columns + insert tuples': lambda: event_rows(generate_columns(args.rows, seed=args.seed)),
+        'generate_batch + lazy tuples': lambda: sum(1 for _ in generate_batch(args.rows, seed=args.seed)),
+        'row dicts -> EventBatch': lambda: EventBatch.from_dicts(generate_data(args.rows)),
+    }
+
+    baseline = None
+    for name, func in cases.items():
+        median_ms = time_call(func, args.repeat)
+        if baseline is None:
+            baseline = median_ms
+        line = f"{name:<36} {median_ms:>10.2f} ms  {baseline / median_ms:>6.1f}x"
+        if args.memory:
+            peak_mb, gc_ms = measure_memory(func)
+            line += f"  {peak_mb:>9.1f} MB peak  {gc_ms:>8.2f} ms GC"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
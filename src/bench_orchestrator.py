@@ -0,0 +1,348 @@
+"""
+Multi-process benchmark orchestrator.
+
+Splits a sweep into cells, one per operation, query and span, and runs
+every cell in a fresh worker process, so no cell inherits the caches,
+connections or heap of another and nothing of the web server is measured.
+Before every run of a cell the Event table is reset (the schema profile is
+re-applied, or the table truncated) together with the rollups.
+
+Cells run in parallel on isolated slots: a MariaDB schema per slot, cloned
+from mariadb/init.sql, or a database file per slot for the embedded
+backends. Each worker is pinned to one CPU and reports its CPU time and
+peak RSS next to the wall time of every span. CPU time and RSS are those of
+the client process; server work is not included.
+
+Usage:
+    python -m src.bench_orchestrator --operations insert,query --queries simple,join --parallel 4
+    python -m src.bench_orchestrator --operations update --spans 1000,10000 --parallel 2 --output update.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+import mariadb
+from .backends import QUERY_SHAPES, create_backend
+from .bench_runner import machine_metadata, summarize
+from .benchmark import BENCHMARK_SEED, DATASET_ROWS, INSERT_SPANS, OTHER_SPANS, process_data
+from .dataset_cache import get_dataset_cache
+from .db_pool import get_db_config
+
+# Version of the result file layout written by main().
+ORCHESTRATOR_SCHEMA_VERSION = 1
+
+OPERATIONS = ("insert", "delete", "purge", "update", "query")
+
+# How concurrent cells of a backend are kept apart; backends not listed
+# share one store and run one cell at a time.
+ISOLATION = {"mariadb": "schema", "sqlite": "file", "duckdb": "file"}
+
+INIT_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mariadb", "init.sql")
+
+
+def build_cells(operations, queries=QUERY_SHAPES, spans=None):
+    """
+    Lists the cells of a sweep.
+
+    Args:
+        operations (list): OPERATIONS to run.
+        queries (list): Query shapes for "query".
+        spans (list): Row counts. Defaults to benchmark.INSERT_SPANS or OTHER_SPANS per operation.
+
+    Returns:
+        list: (operation, query or None, span) tuples.
+    """
+    cells = []
+    for operation in operations:
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        operation_spans = spans or (INSERT_SPANS if operation == "insert" else OTHER_SPANS)
+        for query in (queries if operation == "query" else [None]):
+            if query is not None and query not in QUERY_SHAPES:
+                raise ValueError(f"Unknown query: {query}")
+            cells.extend((operation, query, span) for span in operation_spans)
+    return cells
+
+
+def _statements(path):
+    with open(path, encoding='utf-8') as f:
+        lines = [line for line in f if not line.lstrip().startswith('--')]
+    return [statement.strip() for statement in ''.join(lines).split(';') if statement.strip()]
+
+
+def provision_schemas(count, prefix=None, admin_user=None, admin_password=None, init_sql=INIT_SQL):
+    """
+    Recreates count benchmark schemas from init.sql.
+
+    Existing schemas of the same name are dropped. Requires a user allowed
+    to create databases; the application user is granted access to them.
+
+    Args:
+        count (int): Number of schemas.
+        prefix (str): Schema name prefix. Defaults to "<MARIADB_DATABASE>_bench".
+        admin_user (str): User creating the schemas. Defaults to MARIADB_ADMIN_USER or root.
+        admin_password (str): Its password. Defaults to MARIADB_ROOT_PASSWORD.
+        init_sql (str): Schema script to run in each schema.
+
+    Returns:
+        list: The schema names.
+
+    Raises:
+        mariadb.Error: If a schema cannot be created.
+    """
+    config = get_db_config()
+    app_user = config['user']
+    database = config.pop('database')
+    prefix = prefix or f"{database}_bench"
+    config['user'] = admin_user or os.environ.get('MARIADB_ADMIN_USER', 'root')
+    config['password'] = admin_password if admin_password is not None else os.environ.get(
+        'MARIADB_ROOT_PASSWORD', config['password'])
+    statements = _statements(init_sql)
+
+    schemas = [f"{prefix}{slot}" for slot in range(count)]
+    conn = mariadb.connect(**config)
+    try:
+        cursor = conn.cursor()
+        for schema in schemas:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{schema}`")
+            cursor.execute(f"CREATE DATABASE `{schema}`")
+            cursor.execute(f"USE `{schema}`")
+            for statement in statements:
+                cursor.execute(statement)
+            if app_user != config['user']:
+                cursor.execute(f"GRANT ALL PRIVILEGES ON `{schema}`.* TO '{app_user}'@'%'")
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return schemas
+
+
+def _slot_targets(backend, parallel, provision, options):
+    """Returns one isolation target per slot: a schema name, a file path or None."""
+    isolation = ISOLATION.get(backend)
+    if isolation is None:
+        if parallel > 1:
+            raise ValueError(f"Backend {backend} cannot run cells in parallel")
+        return [None]
+    if isolation == "file":
+        base, extension = os.path.splitext(options.get('path') or f"events.{backend}")
+        return [f"{base}-bench{slot}{extension}" for slot in range(parallel)]
+    if provision:
+        return provision_schemas(parallel)
+    prefix = f"{get_db_config()['database']}_bench"
+    return [f"{prefix}{slot}" for slot in range(parallel)]
+
+
+def _rusage():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime, usage.ru_stime
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _reset(backend, profile, options):
+    """Returns the store to an empty Event table and empty rollups."""
+    store = create_backend(backend, **options)
+    try:
+        if hasattr(store, "apply_profile"):
+            reset = store.apply_profile(profile or "baseline")
+        else:
+            reset = store.truncate()
+        if reset and hasattr(store, "reset_rollups"):
+            reset = store.reset_rollups()
+        return reset
+    finally:
+        store.close()
+
+
+def run_cell(cell, slots, backend="mariadb", profile=None, repetitions=5, warmup=1, seed=BENCHMARK_SEED,
+             pin=True, options=None):
+    """
+    Runs one cell in the calling worker process; see run_sweep().
+
+    Claims a free slot from the shared queue for the duration of the cell and
+    points the process at the slot's schema or file.
+
+    Returns:
+        dict: The cell, its slot, CPU, the span summary, per-run CPU time and the peak RSS,
+        or the cell with an "error".
+    """
+    operation, query, span = cell
+    slot, target = slots.get()
+    try:
+        options = dict(options or {})
+        if target is not None:
+            if ISOLATION[backend] == "schema":
+                os.environ['MARIADB_DATABASE'] = target
+            else:
+                options['path'] = target
+        cpu = None
+        if pin and hasattr(os, "sched_setaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+            cpu = cpus[slot % len(cpus)]
+            os.sched_setaffinity(0, {cpu})
+
+        result = {'operation': operation, 'query': query, 'span': span, 'slot': slot, 'target': target,
+                  'cpu': cpu, 'pid': os.getpid()}
+        cell_started = time.perf_counter()
+        durations = []
+        cpu_user_ms = []
+        cpu_system_ms = []
+        last = None
+        for iteration in range(warmup + repetitions):
+            if not _reset(backend, profile, options):
+                return {**result, 'error': 'Error resetting the Event table'}
+            user_before, system_before = _rusage()
+            output = json.loads(process_data(operation, query, seed=seed, backend=backend, spans=[span],
+                                             **options))
+            user_after, system_after = _rusage()
+            if isinstance(output, dict):
+                return {**result, 'error': output['message']}
+            if iteration < warmup:
+                continue
+            last = output[-1]
+            durations.append(last['duration_ns'])
+            cpu_user_ms.append((user_after - user_before) * 1000)
+            cpu_system_ms.append((system_after - system_before) * 1000)
+
+        result.update(summarize(durations, last.get('rows', span)))
+        result.update({
+            'engine': last['engine'],
+            'profile': last.get('profile', profile),
+            'cpu_user_ms_p50': round(statistics.median(cpu_user_ms), 3),
+            'cpu_system_ms_p50': round(statistics.median(cpu_system_ms), 3),
+            'peak_rss_mb': _peak_rss_mb(),
+            'cell_seconds': round(time.perf_counter() - cell_started, 3),
+        })
+        return result
+    finally:
+        slots.put((slot, target))
+
+
+def run_sweep(cells, backend="mariadb", parallel=1, profile=None, repetitions=5, warmup=1, seed=BENCHMARK_SEED,
+              pin=True, provision=True, **options):
+    """
+    Runs every cell in its own worker process, up to parallel at a time.
+
+    Workers are spawned, not forked, and each serves a single cell. The
+    largest spans are started first so the slots finish close together.
+
+    Args:
+        cells (list): Cells from build_cells().
+        backend (str): A registered backend name.
+        parallel (int): Concurrent cells, each on its own schema or file.
+        profile (str): Schema profile re-applied before every run. Defaults to "baseline"
+            for backends with profiles.
+        repetitions (int): Measured runs per cell.
+        warmup (int): Runs discarded before measuring.
+        seed (int): Dataset seed.
+        pin (bool): Pin each worker to one CPU.
+        provision (bool): Recreate the MariaDB benchmark schemas first; False reuses them.
+        **options: Backend options such as engine or workers.
+
+    Returns:
+        list: One result per cell, in the order of cells.
+    """
+    parallel = max(1, parallel)
+    targets = _slot_targets(backend, parallel, provision, options)
+    # Generated once here, so every worker reads the dataset from the on-disk cache.
+    get_dataset_cache().get(DATASET_ROWS, seed)
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with context.Manager() as manager:
+        slots = manager.Queue()
+        for slot, target in enumerate(targets):
+            slots.put((slot, target))
+        order = sorted(range(len(cells)), key=lambda index: -cells[index][2])
+        with ProcessPoolExecutor(max_workers=len(targets), mp_context=context, max_tasks_per_child=1) as executor:
+            futures = {
+                executor.submit(run_cell, cells[index], slots, backend, profile, repetitions, warmup, seed, pin,
+                                options): index
+                for index in order
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                operation, query, span = cells[index]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = {'operation': operation, 'query': query, 'span': span,
+                                      'error': f"{type(e).__name__}: {e}"}
+                result = results[index]
+                status = result.get('error') or f"p50 {result['p50_ms']:.3f} ms"
+                print(f"{operation:<7} {query or '-':<7} {span:>8}  {status}")
+    return [results[index] for index in range(len(cells))]
+
+
+def _parse_list(value):
+    return [item for item in value.split(',') if item]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=_parse_list, default=list(OPERATIONS))
+    parser.add_argument('--queries', type=_parse_list, default=list(QUERY_SHAPES))
+    parser.add_argument('--spans', type=lambda value: [int(span) for span in _parse_list(value)])
+    parser.add_argument('--backend', default='mariadb')
+    parser.add_argument('--profile')
+    parser.add_argument('--parallel', type=int, default=1, help='cells run at the same time')
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    parser.add_argument('--option', action='append', default=[], metavar='KEY=VALUE',
+                        help='backend option, e.g. engine=load_data or workers=4')
+    parser.add_argument('--no-pin', action='store_true', help='do not pin workers to CPUs')
+    parser.add_argument('--no-provision', action='store_true', help='reuse the existing benchmark schemas')
+    parser.add_argument('--output', help='JSON result file')
+    args = parser.parse_args()
+
+    options = {}
+    for option in args.option:
+        key, value = option.split('=', 1)
+        options[key] = int(value) if value.lstrip('-').isdigit() else value
+    cells = build_cells(args.operations, args.queries, args.spans)
+
+    started = time.perf_counter()
+    results = run_sweep(cells, args.backend, args.parallel, args.profile, args.repetitions, args.warmup, args.seed,
+                        not args.no_pin, not args.no_provision, **options)
+    elapsed = time.perf_counter() - started
+    print(f"{len(cells)} cells in {elapsed:.1f} s")
+
+    if args.output:
+        document = {
+            'schema_version': ORCHESTRATOR_SCHEMA_VERSION,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'machine': machine_metadata(),
+            'settings': {
+                'backend': args.backend,
+                'profile': args.profile,
+                'options': options,
+                'parallel': args.parallel,
+                'repetitions': args.repetitions,
+                'warmup': args.warmup,
+                'seed': args.seed,
+                'dataset_rows': DATASET_ROWS,
+                'pinned': not args.no_pin,
+            },
+            'seconds': round(elapsed, 3),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=4)
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Deep-page latency of keyset against OFFSET pagination.
+
+Loads the seeded dataset into MariaDB, then times fetching the page at each
+depth, newest first. Keyset pages are addressed by the cursor of the page
+before them, collected by walking the pages once untimed; OFFSET pages skip
+(depth - 1) * page_size rows. The query cache is bypassed.
+
+Usage:
+    python -m src.bench_pagination --depths 1,10,100,1000 --page-size 500 --source 3
+"""
+import argparse
+import json
+import time
+from .bench_runner import summarize
+from .benchmark import BENCHMARK_SEED, DATASET_ROWS
+from .dataset_cache import get_dataset_cache
+from .maria import clear_events_table, fetch_query_results, insert_events_mariadb, page_source_ids
+from .pagination import DEFAULT_PAGE_SIZE, PAGINATION_MODES, page_query
+
+DEFAULT_DEPTHS = [1, 10, 100, 1000]
+
+
+def _keyset_positions(filters, page_size, depths):
+    """Walks the pages up to the deepest depth and returns depth -> (timestamp, id) to seek after."""
+    positions = {}
+    after = None
+    for depth in range(1, max(depths) + 1):
+        if depth in depths:
+            positions[depth] = after
+        query, params = page_query(**filters, limit=page_size, after=after)
+        rows = fetch_query_results(query, params)
+        if len(rows) < page_size:
+            break
+        after = (rows[-1][1], rows[-1][0])
+    return positions
+
+
+def benchmark_pagination(modes=PAGINATION_MODES, page_size=DEFAULT_PAGE_SIZE, depths=DEFAULT_DEPTHS, source=None,
+                         country=None, rows=DATASET_ROWS, seed=BENCHMARK_SEED, repetitions=5, load=True):
+    """
+    Times the page at each depth for each pagination mode.
+
+    Args:
+        modes (list): PAGINATION_MODES to run.
+        page_size (int): Rows per page.
+        depths (list): 1-based page numbers to time.
+        source (int): Optional source_ID filter.
+        country (str): Optional country filter, resolved through the dimension cache.
+        rows (int): Rows of the seeded dataset to load.
+        seed (int): Dataset seed.
+        repetitions (int): Timed fetches per page.
+        load (bool): Reload the Event table first; False reuses its contents.
+
+    Returns:
+        list | dict: One entry per mode and reachable depth with the summary of
+        its repetitions, or a dict with a message on failure.
+    """
+    unknown = [mode for mode in modes if mode not in PAGINATION_MODES]
+    if unknown:
+        raise ValueError(f"Unknown pagination mode: {unknown[0]}")
+    if load:
+        if not clear_events_table():
+            return {'message': 'Error clearing Event table in MariaDb!'}
+        if not insert_events_mariadb(get_dataset_cache().get(rows, seed)):
+            return {'message': 'Error saving data in MariaDb!'}
+
+    filters = {'source_ids': page_source_ids(source, country)}
+    depths = sorted(set(depths))
+    positions = _keyset_positions(filters, page_size, depths) if "keyset" in modes else {}
+
+    results = []
+    for mode in modes:
+        for depth in depths:
+            if mode == "keyset":
+                if depth not in positions:
+                    continue
+                query, params = page_query(**filters, limit=page_size, after=positions[depth])
+            else:
+                query, params = page_query(**filters, limit=page_size, offset=(depth - 1) * page_size)
+            durations = []
+            page_rows = 0
+            for _ in range(repetitions):
+                started = time.perf_counter_ns()
+                page_rows = len(fetch_query_results(query, params))
+                durations.append(time.perf_counter_ns() - started)
+            if not page_rows:
+                continue
+            results.append({
+                'mode': mode,
+                'depth': depth,
+                'page_size': page_size,
+                'skipped_rows': (depth - 1) * page_size,
+                **summarize(durations, page_rows),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default=",".join(PAGINATION_MODES))
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--depths', default=",".join(str(depth) for depth in DEFAULT_DEPTHS))
+    parser.add_argument('--source', type=int)
+    parser.add_argument('--country')
+    parser.add_argument('--rows', type=int, default=DATASET_ROWS)
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--no-load', action='store_true', help='reuse the current contents of the Event table')
+    parser.add_argument('--output', help='JSON result file')
+    args = parser.parse_args()
+
+    results = benchmark_pagination(args.modes.split(','), args.page_size,
+                                   [int(depth) for depth in args.depths.split(',')], args.source, args.country,
+                                   args.rows, args.seed, args.repetitions, not args.no_load)
+    if isinstance(results, dict):
+        raise SystemExit(results['message'])
+    for entry in results:
+        print(f"{entry['mode']:<8} page {entry['depth']:>6}  p50 {entry['p50_ms']:>10.3f} ms  "
+              f"p99 {entry['p99_ms']:>10.3f} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
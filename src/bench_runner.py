@@ -0,0 +1,331 @@
+"""
+In-process benchmark runner with repetition statistics and regression checks.
+
+Runs process_data() directly (no HTTP round trip), discards warmup runs and
+summarizes every span over the remaining repetitions.
+
+Usage:
+    python -m src.bench_runner run --operation insert --backend mariadb --repetitions 10 --output insert.json
+    python -m src.bench_runner run --operation query --query simple --csv simple.csv
+    python -m src.bench_runner run --operation aggregate --query severity --aggregate-source raw
+    python -m src.bench_runner compare baseline.json candidate.json --threshold 0.1
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+import numpy as np
+from .backends import QUERY_SHAPES
+from .benchmark import BENCHMARK_SEED, DATASET_ROWS, process_data
+from .generator import DATASET_SCHEMA_VERSION
+from .rollups import AGGREGATE_SOURCES, AGGREGATES
+from .tracing import PHASES
+
+# Version of the result file layout written by write_json() and write_csv().
+RESULTS_SCHEMA_VERSION = 1
+
+PERCENTILES = (50, 90, 99)
+
+# Two-sided 95% Student t critical values by degrees of freedom; 1.96 above 30.
+T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048,
+    29: 2.045, 30: 2.042,
+}
+
+CSV_FIELDS = [
+    "schema_version", "created", "operation", "query", "result_mode", "backend", "engine", "profile",
+    "dataset_rows", "seed", "span", "n", "rows", "mean_ms", "stddev_ms", "min_ms", "max_ms",
+    "p50_ms", "p90_ms", "p99_ms", "ci95_low_ms", "ci95_high_ms", "rows_per_sec",
+] + [f"{name}_p50_ms" for name in PHASES]
+
+
+def machine_metadata():
+    """Describes the host the benchmark ran on."""
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+def summarize(durations_ns, rows):
+    """
+    Summarizes the repetitions of one span.
+
+    Args:
+        durations_ns (list): Durations in nanoseconds.
+        rows (int): Rows the operation handled, used for rows_per_sec.
+
+    Returns:
+        dict: n, mean, stddev, min, max, percentiles and the 95% confidence
+            interval of the mean, all in milliseconds, plus rows_per_sec at p50.
+    """
+    values = np.asarray(durations_ns, dtype=np.float64) / 1e6
+    n = len(values)
+    mean = float(values.mean())
+    stddev = statistics.stdev(values.tolist()) if n > 1 else 0.0
+    half_width = T_95.get(n - 1, 1.96) * stddev / n ** 0.5 if n > 1 else 0.0
+    summary = {
+        'n': n,
+        'rows': rows,
+        'mean_ms': round(mean, 4),
+        'stddev_ms': round(stddev, 4),
+        'min_ms': round(float(values.min()), 4),
+        'max_ms': round(float(values.max()), 4),
+    }
+    for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{q}_ms'] = round(float(value), 4)
+    summary['ci95_low_ms'] = round(mean - half_width, 4)
+    summary['ci95_high_ms'] = round(mean + half_width, 4)
+    p50_seconds = summary['p50_ms'] / 1000
+    summary['rows_per_sec'] = round(rows / p50_seconds, 1) if p50_seconds > 0 else None
+    return summary
+
+
+def run(operation, query=None, backend="mariadb", repetitions=5, warmup=1, seed=BENCHMARK_SEED, spans=None,
+        result_mode=None, row_format="tuple", profile=None, trace_phases=False, aggregate_source="rollup",
+        **backend_options):
+    """
+    Runs process_data() warmup + repetitions times and summarizes each span.
+
+    Args:
+        repetitions (int): Measured runs.
+        warmup (int): Runs discarded before measuring.
+        trace_phases (bool): Also record per-phase timings; each span then
+            carries the median of every phase as phases_p50_ms.
+        Other arguments are passed to process_data().
+
+    Returns:
+        dict: A result document with schema_version, metadata and per-span results.
+
+    Raises:
+        RuntimeError: If a run reports an error.
+    """
+    durations = {}
+    phases = {}
+    rows = {}
+    engine = None
+    for iteration in range(warmup + repetitions):
+        output = json.loads(process_data(operation, query, seed=seed, backend=backend, result_mode=result_mode,
+                                         row_format=row_format, profile=profile, spans=spans,
+                                         trace_phases=trace_phases, aggregate_source=aggregate_source,
+                                         **backend_options))
+        if isinstance(output, dict):
+            raise RuntimeError(output['message'])
+        if iteration < warmup:
+            continue
+        for entry in output:
+            engine = entry['engine']
+            durations.setdefault(entry['span'], []).append(entry['duration_ns'])
+            rows[entry['span']] = entry.get('rows', entry['span'])
+            for phase_name, ms in entry.get('phases', {}).items():
+                phases.setdefault(entry['span'], {}).setdefault(phase_name, []).append(ms)
+
+    return {
+        'schema_version': RESULTS_SCHEMA_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': machine_metadata(),
+        'backend': {
+            'name': backend,
+            'engine': engine,
+            'profile': profile,
+            'options': backend_options,
+        },
+        'dataset': {
+            'rows': DATASET_ROWS,
+            'seed': seed,
+            'schema_version': DATASET_SCHEMA_VERSION,
+        },
+        'benchmark': {
+            'operation': operation,
+            'query': query,
+            'result_mode': result_mode,
+            'row_format': row_format,
+            'aggregate_source': aggregate_source if operation == "aggregate" else None,
+            'warmup': warmup,
+            'repetitions': repetitions,
+            'trace_phases': trace_phases,
+        },
+        'results': [
+            {'span': span, **summarize(values, rows[span]), **_phase_medians(phases.get(span))}
+            for span, values in sorted(durations.items())
+        ],
+    }
+
+
+def _phase_medians(span_phases):
+    if not span_phases:
+        return {}
+    return {'phases_p50_ms': {name: round(statistics.median(values), 4) for name, values in span_phases.items()}}
+
+
+def write_json(document, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=4)
+
+
+def write_csv(document, path):
+    """Writes one row per span, repeating the run metadata on every row."""
+    meta = {
+        'schema_version': document['schema_version'],
+        'created': document['created'],
+        'operation': document['benchmark']['operation'],
+        'query': document['benchmark']['query'],
+        'result_mode': document['benchmark']['result_mode'],
+        'backend': document['backend']['name'],
+        'engine': document['backend']['engine'],
+        'profile': document['backend']['profile'],
+        'dataset_rows': document['dataset']['rows'],
+        'seed': document['dataset']['seed'],
+    }
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for result in document['results']:
+            phases = {f"{name}_p50_ms": ms for name, ms in result.get('phases_p50_ms', {}).items()}
+            writer.writerow({**meta, **{key: value for key, value in result.items() if key != 'phases_p50_ms'},
+                             **phases})
+
+
+def load_results(path):
+    """
+    Loads a result document written by write_json().
+
+    Raises:
+        ValueError: If the file uses a different schema version.
+    """
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    if document.get('schema_version') != RESULTS_SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported results schema version {document.get('schema_version')}")
+    return document
+
+
+def compare(baseline, candidate, threshold=0.1):
+    """
+    Compares two result documents span by span.
+
+    A span regresses when the candidate's p50 is more than threshold slower
+    than the baseline's and the 95% confidence intervals of the means do not
+    overlap, so noise within the measured spread is not flagged.
+
+    Args:
+        baseline (dict): Result document of the reference run.
+        candidate (dict): Result document to check.
+        threshold (float): Relative p50 slowdown tolerated, e.g. 0.1 for 10%.
+
+    Returns:
+        list: Per-span dicts with span, baseline_p50_ms, candidate_p50_ms, change and status
+            ("regression", "improvement" or "ok").
+    """
+    baseline_spans = {result['span']: result for result in baseline['results']}
+    comparisons = []
+    for result in candidate['results']:
+        reference = baseline_spans.get(result['span'])
+        if reference is None:
+            continue
+        change = (result['p50_ms'] - reference['p50_ms']) / reference['p50_ms'] if reference['p50_ms'] else 0.0
+        if change > threshold and result['ci95_low_ms'] > reference['ci95_high_ms']:
+            status = "regression"
+        elif change < -threshold and result['ci95_high_ms'] < reference['ci95_low_ms']:
+            status = "improvement"
+        else:
+            status = "ok"
+        comparisons.append({
+            'span': result['span'],
+            'baseline_p50_ms': reference['p50_ms'],
+            'candidate_p50_ms': result['p50_ms'],
+            'change': round(change, 4),
+            'status': status,
+        })
+    return comparisons
+
+
+def mismatched_metadata(baseline, candidate):
+    """Returns the names of the settings that differ between two result documents."""
+    differences = []
+    for section in ('benchmark', 'dataset'):
+        for key, value in baseline[section].items():
+            if key not in ('warmup', 'repetitions', 'trace_phases') and candidate[section].get(key) != value:
+                differences.append(f"{section}.{key}")
+    for key in ('name', 'engine', 'profile'):
+        if candidate['backend'].get(key) != baseline['backend'].get(key):
+            differences.append(f"backend.{key}")
+    return differences
+
+
+def _parse_spans(value):
+    return [int(span) for span in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run a benchmark and write its statistics')
+    run_parser.add_argument('--operation', required=True,
+                            choices=['insert', 'delete', 'purge', 'update', 'query', 'aggregate'])
+    run_parser.add_argument('--query', choices=[*QUERY_SHAPES, *AGGREGATES],
+                            help='query shape, or the dimension of an aggregate')
+    run_parser.add_argument('--aggregate-source', default='rollup', choices=AGGREGATE_SOURCES)
+    run_parser.add_argument('--backend', default='mariadb')
+    run_parser.add_argument('--profile')
+    run_parser.add_argument('--repetitions', type=int, default=5)
+    run_parser.add_argument('--warmup', type=int, default=1)
+    run_parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    run_parser.add_argument('--spans', type=_parse_spans, help='comma-separated row counts')
+    run_parser.add_argument('--result-mode')
+    run_parser.add_argument('--row-format', default='tuple')
+    run_parser.add_argument('--option', action='append', default=[], metavar='KEY=VALUE',
+                            help='backend option, e.g. engine=load_data or workers=4')
+    run_parser.add_argument('--trace', action='store_true', help='record per-phase timings')
+    run_parser.add_argument('--output', help='JSON result file')
+    run_parser.add_argument('--csv', help='CSV result file')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions between two JSON result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        options = {}
+        for option in args.option:
+            key, value = option.split('=', 1)
+            options[key] = int(value) if value.lstrip('-').isdigit() else value
+        document = run(args.operation, args.query, backend=args.backend, repetitions=args.repetitions,
+                       warmup=args.warmup, seed=args.seed, spans=args.spans, result_mode=args.result_mode,
+                       row_format=args.row_format, profile=args.profile, trace_phases=args.trace,
+                       aggregate_source=args.aggregate_source, **options)
+        for result in document['results']:
+            print(f"{result['span']:>8}  p50 {result['p50_ms']:>10.3f} ms  p99 {result['p99_ms']:>10.3f} ms  "
+                  f"±{(result['ci95_high_ms'] - result['mean_ms']):.3f} ms  {result['rows_per_sec']} rows/s")
+        if args.output:
+            write_json(document, args.output)
+        if args.csv:
+            write_csv(document, args.csv)
+        return 0
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    differences = mismatched_metadata(baseline, candidate)
+    if differences:
+        print(f"Warning: runs differ in {', '.join(differences)}")
+    comparisons = compare(baseline, candidate, args.threshold)
+    for item in comparisons:
+        print(f"{item['span']:>8}  {item['baseline_p50_ms']:>10.3f} -> {item['candidate_p50_ms']:>10.3f} ms  "
+              f"{item['change']:>+8.1%}  {item['status']}")
+    return 1 if any(item['status'] == "regression" for item in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Cold start cost of the web app.
+
+Starts a fresh interpreter per run, imports src.main, runs the app's
+startup handlers and reports the import and startup time, the peak RSS
+and which heavy optional modules got loaded. With limits set, exits
+non-zero when a run exceeds them, so CI can track cold start.
+
+Usage:
+    python -m src.bench_startup --runs 5 --max-import-ms 1500 --max-rss-mb 150
+    python -m src.bench_startup --runs 1 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules the app must not import at startup; they belong to optional
+# backends or to report generation.
+FORBIDDEN_MODULES = ("matplotlib", "pandas", "influxdb_client", "duckdb")
+
+PROBE = """
+import asyncio, json, resource, sys, time
+started = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+ready = []
+
+
+async def serve():
+    # Startup handlers run on entering the lifespan, shutdown handlers on leaving it.
+    async with src.main.app.router.lifespan_context(src.main.app):
+        ready.append(time.perf_counter())
+
+
+asyncio.run(serve())
+ready = ready[0]
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'startup_ms': (ready - imported) * 1000,
+    'rss_mb': peak / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    'modules': len(sys.modules),
+    'loaded': [name for name in FORBIDDEN if name in sys.modules],
+}))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_startup(forbidden=FORBIDDEN_MODULES, import_times=False):
+    """
+    Imports and starts the app once in a fresh interpreter.
+
+    Args:
+        forbidden (tuple): Module names to report if they were imported.
+        import_times (bool): Also collect -X importtime output.
+
+    Returns:
+        dict: import_ms, startup_ms, rss_mb, modules, loaded (forbidden modules
+        found) and, with import_times, the cumulative microseconds per top-level module.
+
+    Raises:
+        RuntimeError: If the app fails to import or start.
+    """
+    command = [sys.executable]
+    if import_times:
+        command += ["-X", "importtime"]
+    command += ["-c", f"FORBIDDEN = {tuple(forbidden)!r}\n" + PROBE]
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"App failed to start: {completed.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if import_times:
+        result['import_us'] = _cumulative_import_times(completed.stderr)
+    return result
+
+
+def _cumulative_import_times(stderr):
+    """
+    Parses -X importtime output into the cost of what src.main imports directly.
+
+    Returns:
+        dict: Package (src modules by name) -> cumulative microseconds, slowest first.
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Each nesting level indents the name by two more spaces; the probe's
+        # own imports are at one space, those of src.main at three.
+        if len(name) - len(name.lstrip()) == 3:
+            parts = name.strip().split(".")
+            package = ".".join(parts[:2]) if parts[0] == "src" else parts[0]
+            totals[package] = totals.get(package, 0) + int(cumulative)
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def benchmark_startup(runs=5, forbidden=FORBIDDEN_MODULES):
+    """
+    Measures cold start over several runs.
+
+    Returns:
+        dict: Per-run results plus the median import_ms, startup_ms and rss_mb,
+        and every forbidden module any run loaded.
+    """
+    results = [measure_startup(forbidden) for _ in range(runs)]
+    return {
+        'runs': results,
+        'import_ms_p50': round(statistics.median(result['import_ms'] for result in results), 1),
+        'startup_ms_p50': round(statistics.median(result['startup_ms'] for result in results), 1),
+        'rss_mb_p50': round(statistics.median(result['rss_mb'] for result in results), 1),
+        'loaded': sorted({name for result in results for name in result['loaded']}),
+    }
+
+
+def check_limits(summary, max_import_ms=None, max_rss_mb=None):
+    """Returns the violated limits of a benchmark_startup() summary as messages."""
+    failures = []
+    if summary['loaded']:
+        failures.append(f"heavy modules imported at startup: {', '.join(summary['loaded'])}")
+    if max_import_ms is not None and summary['import_ms_p50'] > max_import_ms:
+        failures.append(f"import took {summary['import_ms_p50']} ms, limit {max_import_ms} ms")
+    if max_rss_mb is not None and summary['rss_mb_p50'] > max_rss_mb:
+        failures.append(f"RSS after startup is {summary['rss_mb_p50']} MB, limit {max_rss_mb} MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float)
+    parser.add_argument('--max-rss-mb', type=float)
+    parser.add_argument('--forbid', default=",".join(FORBIDDEN_MODULES), help='modules that must not be imported')
+    parser.add_argument('--top', type=int, help='also list the slowest top-level imports')
+    parser.add_argument('--output', help='JSON result file')
+    args = parser.parse_args()
+
+    forbidden = tuple(name for name in args.forbid.split(',') if name)
+    summary = benchmark_startup(args.runs, forbidden)
+    print(f"import p50 {summary['import_ms_p50']} ms  startup p50 {summary['startup_ms_p50']} ms  "
+          f"RSS p50 {summary['rss_mb_p50']} MB")
+    if args.top:
+        import_us = measure_startup(forbidden, import_times=True)['import_us']
+        for name, microseconds in list(import_us.items())[:args.top]:
+            print(f"{microseconds / 1000:>10.1f} ms  {name}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    failures = check_limits(summary, args.max_import_ms, args.max_rss_mb)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
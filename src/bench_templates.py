@@ -0,0 +1,156 @@
+"""
+Table size and scan speed of text against template message storage.
+
+For each schema profile, recreates the Event table, loads the seeded
+dataset and reads the table's data and index size from
+information_schema.TABLES after ANALYZE TABLE. Then times full scans of the
+"all" shape:
+
+- "records": select_all_events_mariadb(), rows whose messages are not read.
+- "messages": the same rows, reading every message.
+- "stream": stream_events_mariadb() drained as tuples, messages rendered.
+
+The query cache is cleared before every timed select.
+
+Usage:
+    python -m src.bench_templates --profiles baseline,templated --rows 1000000
+"""
+import argparse
+import json
+import time
+import mariadb
+from .bench_runner import summarize
+from .benchmark import BENCHMARK_SEED, DATASET_ROWS
+from .dataset_cache import get_dataset_cache
+from .db_pool import PoolTimeoutError, pooled_connection
+from .maria import insert_events_mariadb, select_all_events_mariadb, stream_events_mariadb
+from .message_templates import get_message_storage
+from .query_cache import get_query_cache
+from .result_stream import consume
+from .schema_profiles import apply_profile
+
+DEFAULT_PROFILES = ["baseline", "templated"]
+
+SCANS = ("records", "messages", "stream")
+
+TABLE_SIZE_QUERY = """
+SELECT DATA_LENGTH, INDEX_LENGTH, AVG_ROW_LENGTH FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Event'
+"""
+
+
+def event_table_size():
+    """
+    Returns the on-disk size of the Event table as estimated by the server.
+
+    Returns:
+        dict: data_bytes, index_bytes and avg_row_bytes.
+
+    Raises:
+        mariadb.Error: If the statistics cannot be read.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("ANALYZE TABLE Event")
+        cursor.fetchall()
+        cursor.execute(TABLE_SIZE_QUERY)
+        data_bytes, index_bytes, avg_row_bytes = cursor.fetchone()
+        cursor.close()
+    return {'data_bytes': int(data_bytes), 'index_bytes': int(index_bytes), 'avg_row_bytes': int(avg_row_bytes)}
+
+
+def _scan(kind):
+    get_query_cache().clear()
+    if kind == "stream":
+        rows = stream_events_mariadb("all")
+        try:
+            return consume(rows, "drain")
+        finally:
+            rows.close()
+    events = select_all_events_mariadb()
+    if kind == "messages":
+        for event in events:
+            event['message']
+    return len(events)
+
+
+def benchmark_message_storage(profiles=DEFAULT_PROFILES, rows=DATASET_ROWS, seed=BENCHMARK_SEED, repetitions=5,
+                              scans=SCANS, restore="baseline"):
+    """
+    Measures table size and scan latency under each schema profile.
+
+    Args:
+        profiles (list): Keys of schema_profiles.PROFILES to compare.
+        rows (int): Rows of the seeded dataset to load.
+        seed (int): Dataset seed.
+        repetitions (int): Timed runs per scan.
+        scans (list): SCANS to time.
+        restore (str): Profile applied after the run; None keeps the last one.
+
+    Returns:
+        list | dict: One entry per profile and scan with the table size and the
+        summary of its repetitions, or a dict with a message on failure.
+    """
+    unknown = [scan for scan in scans if scan not in SCANS]
+    if unknown:
+        raise ValueError(f"Unknown scan: {unknown[0]}")
+    events_data = get_dataset_cache().get(rows, seed)
+    results = []
+    try:
+        for profile in profiles:
+            if not apply_profile(profile):
+                return {'message': f'Error applying schema profile {profile}!'}
+            started = time.perf_counter()
+            if not insert_events_mariadb(events_data):
+                return {'message': 'Error saving data in MariaDb!'}
+            insert_seconds = time.perf_counter() - started
+            try:
+                size = event_table_size()
+            except (mariadb.Error, PoolTimeoutError) as e:
+                return {'message': f'Error reading the Event table size: {e}'}
+            for scan in scans:
+                durations = []
+                scanned = 0
+                for _ in range(repetitions):
+                    started = time.perf_counter_ns()
+                    scanned = _scan(scan)
+                    durations.append(time.perf_counter_ns() - started)
+                results.append({
+                    'profile': profile,
+                    'message_storage': get_message_storage(),
+                    'scan': scan,
+                    'insert_seconds': round(insert_seconds, 3),
+                    **size,
+                    **summarize(durations, scanned),
+                })
+    finally:
+        if restore:
+            apply_profile(restore)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', default=",".join(DEFAULT_PROFILES))
+    parser.add_argument('--scans', default=",".join(SCANS))
+    parser.add_argument('--rows', type=int, default=DATASET_ROWS)
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help='keep the last profile instead of restoring baseline')
+    parser.add_argument('--output', help='JSON result file')
+    args = parser.parse_args()
+
+    results = benchmark_message_storage(args.profiles.split(','), args.rows, args.seed, args.repetitions,
+                                        args.scans.split(','), None if args.keep else "baseline")
+    if isinstance(results, dict):
+        raise SystemExit(results['message'])
+    for entry in results:
+        print(f"{entry['profile']:<10} {entry['scan']:<9} data {entry['data_bytes'] / 2**20:>9.1f} MiB  "
+              f"index {entry['index_bytes'] / 2**20:>9.1f} MiB  p50 {entry['p50_ms']:>10.3f} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+from .generator import SEEDED_REFERENCE_TIME, slice_events
+from .dataset_cache import get_dataset_cache
+from .backends import QUERY_SHAPES, create_backend
+from .result_stream import RESULT_MODES, ROW_FORMATS, consume
+from .rollups import AGGREGATE_SOURCES, AGGREGATES
+from .tracing import export_trace, trace
+
+# Seed of the dataset every benchmark run draws its rows from.
+BENCHMARK_SEED = int(os.environ.get('BENCHMARK_SEED', 42))
+
+# Rows in the cached dataset the spans are sliced from.
+DATASET_ROWS = 1000000
+
+# The "purge" benchmark removes events older than this, about half of each
+# seeded span. It falls on an hour boundary, so with the partitioned profile
+# whole partitions are emptied.
+PURGE_CUTOFF = SEEDED_REFERENCE_TIME
+
+def process_data(operation, query=None, seed=BENCHMARK_SEED, backend="mariadb", result_mode=None,
+                 row_format="tuple", profile=None, spans=None, trace_phases=False, aggregate_source="rollup",
+                 **backend_options):
+    """
+    Benchmarks one operation over growing spans of the cached dataset.
+
+    Args:
+        operation (str): "insert", "delete", "purge", "update", "query" or "aggregate".
+        query (str): Query shape for "query", one of QUERY_SHAPES; dimension for
+            "aggregate", one of rollups.AGGREGATES.
+        seed (int): Dataset seed.
+        backend (str): A registered backend name, see available_backends().
+        result_mode (str): For "query", one of RESULT_MODES to stream the result
+            instead of calling the select_* helper, which returns a list of dicts.
+        row_format (str): Row format of streamed results, one of ROW_FORMATS.
+        profile (str): Schema profile to apply first, see schema_profiles.PROFILES.
+        spans (list): Row counts to run. Defaults to INSERT_SPANS or OTHER_SPANS.
+        trace_phases (bool): Record per-phase timings of every span into its
+            result's "phases" and export them, see tracing.export_trace().
+        aggregate_source (str): For "aggregate", read the "rollup" tables or scan the "raw" events.
+        **backend_options: Backend settings such as engine, workers, commit_every or retention.
+
+    Returns:
+        str: JSON list of per-span durations measured with perf_counter_ns, or a JSON error message.
+    """
+    if operation == "query" and query not in QUERY_SHAPES:
+        return json.dumps({'message': f'Unknown query: {query}'})
+    if operation == "aggregate":
+        if query not in AGGREGATES:
+            return json.dumps({'message': f'Unknown aggregate: {query}'})
+        if aggregate_source not in AGGREGATE_SOURCES:
+            return json.dumps({'message': f'Unknown aggregate source: {aggregate_source}'})
+        backend_options.setdefault('rollups', True)
+    if result_mode is not None and result_mode not in RESULT_MODES:
+        return json.dumps({'message': f'Unknown result mode: {result_mode}'})
+    if row_format not in ROW_FORMATS:
+        return json.dumps({'message': f'Unknown row format: {row_format}'})
+    try:
+        store = create_backend(backend, **backend_options)
+    except (ValueError, ImportError) as e:
+        return json.dumps({'message': f'Cannot use backend {backend}: {e}'})
+    try:
+        if profile is not None:
+            if not hasattr(store, "apply_profile"):
+                return json.dumps({'message': f'Backend {backend} does not support schema profiles!'})
+            if not store.apply_profile(profile):
+                return json.dumps({'message': f'Error applying schema profile {profile}!'})
+        error = store.unsupported_operation(operation) if hasattr(store, "unsupported_operation") else None
+        if error:
+            return json.dumps({'message': error})
+        if operation == "aggregate" and not hasattr(store, "aggregate"):
+            return json.dumps({'message': f'Backend {backend} does not support aggregates!'})
+        return _run_benchmark(store, backend, operation, query, seed, result_mode, row_format, spans,
+                              trace_phases, aggregate_source)
+    finally:
+        store.close()
+
+# Spans for insert and for the other operations.
+INSERT_SPANS = [1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 200000]
+OTHER_SPANS = [1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000]
+
+def _timing_entry(span, duration_ns, engine, backend):
+    # "duration" keeps the str(timedelta) format older result files use.
+    return {
+        'span': span,
+        'duration': str(timedelta(microseconds=duration_ns // 1000)),
+        'duration_ns': duration_ns,
+        'engine': engine,
+        'backend': backend,
+    }
+
+def _span_trace(enabled, operation, span, backend):
+    if not enabled:
+        return nullcontext()
+    return trace(f"benchmark.{operation}", span=span, backend=backend)
+
+def _finish_trace(span_trace):
+    export_trace(span_trace)
+    return span_trace.phase_totals_ms()
+
+def _run_benchmark(store, backend, operation, query, seed, result_mode, row_format, spans, trace_phases,
+                   aggregate_source):
+    name = store.name
+    engine = store.engine
+    profile = getattr(store, "profile", None)
+    retention = getattr(store, "retention", None)
+    join_path = getattr(store, "join_path", None)
+    statements = getattr(store, "statements", None)
+
+    data = get_dataset_cache().get(DATASET_ROWS, seed)
+    
+    time_durations = []
+    
+    if spans is None:
+        spans = INSERT_SPANS if operation == "insert" else OTHER_SPANS
+
+    if operation == "insert":
+        for span in spans:
+            # Every span starts from an empty table and, where kept, empty rollups.
+            if not store.truncate() or (hasattr(store, "reset_rollups") and not store.reset_rollups()):
+                return json.dumps({'message': f'Error clearing Event table in {name}!'})
+            temp_data = slice_events(data, 0, span)
+            insert_report = {}
+            with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                timestamp_start = time.perf_counter_ns()
+                insert_result = store.insert(temp_data, report=insert_report)
+                if not insert_result:
+                    return json.dumps({'message': f'Error saving data in {name}!'})
+                timestamp_end = time.perf_counter_ns()
+            entry = _timing_entry(span, timestamp_end - timestamp_start, engine, backend)
+            if profile:
+                entry['profile'] = profile
+            if statements:
+                entry['statements'] = statements
+            if span_trace is not None:
+                entry['phases'] = _finish_trace(span_trace)
+            if insert_report:
+                entry['rows_per_sec'] = insert_report['rows_per_sec']
+                if 'chunks' in insert_report:
+                    entry['workers'] = insert_report['workers']
+                    entry['chunks'] = insert_report['chunks']
+            time_durations.append(entry)
+    else:
+        for span in spans:
+            temp_data = slice_events(data, 0, span)
+            if operation in ("delete", "update"):
+                # Start every span, and every repetition of it, from the span's rows alone.
+                if not store.truncate() or (hasattr(store, "reset_rollups") and not store.reset_rollups()):
+                    return json.dumps({'message': f'Error clearing Event table in {name}!'})
+            if operation == "delete":
+                insert_result = store.insert(temp_data)
+                if not insert_result:
+                    return json.dumps({'message': f'Error saving data in {name}!'})
+                delete_report = {}
+                with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                    timestamp_start = time.perf_counter_ns()
+                    operation_result = store.delete_range(span, report=delete_report)
+                    if not operation_result:
+                        return json.dumps({'message': f'Error deleting data in {name}!'})
+                    timestamp_end = time.perf_counter_ns()
+            elif operation == "purge":
+                clear_result = store.truncate()
+                if not clear_result:
+                    return json.dumps({'message': f'Error clearing Event table in {name}!'})
+                insert_result = store.insert(temp_data)
+                if not insert_result:
+                    return json.dumps({'message': f'Error saving data in {name}!'})
+                purge_report = {}
+                with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                    timestamp_start = time.perf_counter_ns()
+                    operation_result = store.purge_before(PURGE_CUTOFF, report=purge_report)
+                    if not operation_result:
+                        return json.dumps({'message': f'Error deleting data in {name}!'})
+                    timestamp_end = time.perf_counter_ns()
+            elif operation == "update":
+                result = store.insert(temp_data)
+                if not result:
+                    return json.dumps({'message': f'Error saving data in {name}!'})
+                update_report = {}
+                with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                    timestamp_start = time.perf_counter_ns()
+                    result_2 = store.update(report=update_report)
+                    if not result_2:
+                        return json.dumps({'message': f'Error updating data in {name}!'})
+                    timestamp_end = time.perf_counter_ns()
+            elif operation == "aggregate":
+                if not store.truncate() or not store.reset_rollups():
+                    return json.dumps({'message': f'Error clearing Event table in {name}!'})
+                insert_result = store.insert(temp_data)
+                if not insert_result:
+                    return json.dumps({'message': f'Error saving data in {name}!'})
+                with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                    timestamp_start = time.perf_counter_ns()
+                    operation_result = store.aggregate(query, aggregate_source)
+                    timestamp_end = time.perf_counter_ns()
+                rows = len(operation_result)
+            elif operation == "query":
+                # Clear the table before inserting data
+                clear_result = store.truncate()
+                if not clear_result:
+                    return json.dumps({'message': f'Error clearing Event table in {name}!'})
+                print(f"Table cleared for span {span}")
+                insert_result = store.insert(temp_data)
+                if not insert_result:
+                    return json.dumps({'message': f'Error saving data in {name}!'})
+                print(f"Data inserted for span {span}")
+                if result_mode is None:
+                    with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                        timestamp_start = time.perf_counter_ns()
+                        operation_result = getattr(store, f"select_{query}")()
+                        if operation_result is None:
+                            return json.dumps({'message': f'Error querying data in {name}!'})
+                        elif not operation_result:
+                            print(f"No matching records found for span {span}")
+                        timestamp_end = time.perf_counter_ns()
+                    rows = len(operation_result)
+                else:
+                    stream = store.stream(query, row_format=row_format)
+                    try:
+                        with _span_trace(trace_phases, operation, span, backend) as span_trace:
+                            timestamp_start = time.perf_counter_ns()
+                            rows = consume(stream, result_mode)
+                            timestamp_end = time.perf_counter_ns()
+                    except Exception as e:
+                        print(f"Error streaming query results: {e}")
+                        return json.dumps({'message': f'Error querying data in {name}!'})
+                    finally:
+                        stream.close()
+                print(f"Data queried for span {span}")
+            
+            entry = _timing_entry(span, timestamp_end - timestamp_start, engine, backend)
+            if profile:
+                entry['profile'] = profile
+            if span_trace is not None:
+                entry['phases'] = _finish_trace(span_trace)
+            if operation in ("delete", "purge") and retention:
+                entry['retention'] = retention
+            if operation == "delete" and delete_report:
+                entry['rows'] = delete_report['rows']
+            if operation == "purge" and purge_report:
+                entry['rows'] = purge_report['rows']
+                entry['batches'] = purge_report['batches']
+            if operation == "update" and update_report:
+                entry['rows'] = update_report['rows']
+                entry['rows_per_sec'] = update_report['rows_per_sec']
+                if 'batches' in update_report:
+                    entry['batches'] = update_report['batches']
+                    entry['retries'] = update_report['retries']
+            if operation == "query":
+                entry['rows'] = rows
+                entry['result_mode'] = result_mode or "select"
+                if statements and result_mode is None:
+                    entry['statements'] = statements
+                if query == "join" and join_path:
+                    entry['join_path'] = join_path
+            if operation == "aggregate":
+                entry['rows'] = rows
+                entry['aggregate_source'] = aggregate_source
+            time_durations.append(entry)
+    
+    return json.dumps(time_durations)
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import threading
+from .generator import event_rows, events_length
+from .message_templates import ENCODED_COLUMNS, encoded_rows, get_message_storage
+from .tracing import phase, run_in_context
+
+# Rows serialized per write to the pipe/file; bounds Python memory use.
+STREAM_CHUNK_SIZE = 50000
+
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+LOAD_DATA_QUERY = """
+LOAD DATA LOCAL INFILE '{path}'
+INTO TABLE Event
+CHARACTER SET utf8mb4
+FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+LINES TERMINATED BY '\\n'
+({columns})
+"""
+
+TEXT_COLUMNS = "timestamp, message, severity_ID, event_type_ID, source_ID"
+
+
+def _tsv_field(value):
+    if value is None:
+        return '\\N'
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def iter_tsv_chunks(events_data, chunk_size=STREAM_CHUNK_SIZE, message_storage="text"):
+    """
+    Serializes events as TSV in the format LOAD DATA expects by default.
+
+    Only one chunk of rows is materialized at a time.
+
+    Args:
+        events_data (list | dict): Row dicts or a column dict.
+        chunk_size (int): Rows per yielded chunk.
+        message_storage (str): "template" writes the columns of message_templates.ENCODED_COLUMNS.
+
+    Yields:
+        bytes: UTF-8 encoded TSV lines.
+    """
+    serialize = encoded_rows if message_storage == "template" else event_rows
+    for start in range(0, events_length(events_data), chunk_size):
+        rows = serialize(events_data, start, start + chunk_size)
+        lines = ['\t'.join(_tsv_field(value) for value in row) for row in rows]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _write_chunks(path, events_data, message_storage, errors):
+    try:
+        chunks = iter_tsv_chunks(events_data, message_storage=message_storage)
+        with open(path, 'wb') as f:
+            while True:
+                with phase("serialize"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                f.write(chunk)
+    except (OSError, ValueError) as e:
+        errors.append(e)
+
+
+def _load_outcome(cursor):
+    """Returns the rows the last LOAD DATA affected and its first warning, or None."""
+    loaded, warnings = cursor.rowcount, cursor.warnings
+    if not warnings:
+        return loaded, None
+    cursor.execute("SHOW WARNINGS LIMIT 1")
+    level, code, message = cursor.fetchone()
+    return loaded, f"{warnings} warnings, first: {level} {code} {message}"
+
+
+def load_data_infile(conn, events_data, message_storage=None):
+    """
+    Bulk-loads events with LOAD DATA LOCAL INFILE, streaming the rows.
+
+    On POSIX the rows are written to a named pipe by a background thread while
+    the server reads from it, so nothing but the current chunk is held in
+    memory or on disk. Elsewhere they are streamed to a temporary file first.
+    The connection must have been opened with local_infile enabled. The caller
+    commits.
+
+    Args:
+        conn (mariadb.Connection): An open connection.
+        events_data (list | dict): Row dicts or a column dict.
+        message_storage (str): How Event stores messages, one of
+            message_templates.MESSAGE_STORAGES. Defaults to the current schema's.
+
+    Returns:
+        int: Number of rows the server loaded.
+
+    Raises:
+        ValueError: If the server loaded fewer rows than were sent or reported
+            warnings. LOCAL INFILE turns bad rows into warnings, so rows that
+            were skipped or truncated would otherwise pass as loaded. The
+            caller should roll back.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix='event-load-')
+    path = os.path.join(tmp_dir, 'events.tsv')
+    message_storage = message_storage or get_message_storage()
+    columns = ENCODED_COLUMNS if message_storage == "template" else TEXT_COLUMNS
+    query = LOAD_DATA_QUERY.format(path=path.replace("'", "''"), columns=columns)
+    errors = []
+    try:
+        if hasattr(os, 'mkfifo'):
+            os.mkfifo(path)
+            writer = threading.Thread(target=run_in_context(_write_chunks),
+                                      args=(path, events_data, message_storage, errors), daemon=True)
+            writer.start()
+            cursor = conn.cursor()
+            try:
+                with phase("execute"):
+                    cursor.execute(query)
+                loaded, warning = _load_outcome(cursor)
+            finally:
+                cursor.close()
+                # If the server never opened the pipe (e.g. the statement was
+                # rejected), briefly open the read end so the writer's open()
+                # returns and its next write fails with a broken pipe.
+                while writer.is_alive():
+                    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+                    writer.join(0.05)
+                    os.close(fd)
+        else:
+            _write_chunks(path, events_data, message_storage, errors)
+            cursor = conn.cursor()
+            try:
+                with phase("execute"):
+                    cursor.execute(query)
+                loaded, warning = _load_outcome(cursor)
+            finally:
+                cursor.close()
+        if errors:
+            raise errors[0]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    expected = events_length(events_data)
+    if loaded != expected:
+        raise ValueError(f"LOAD DATA loaded {loaded} of {expected} rows: {warning}")
+    if warning:
+        raise ValueError(f"LOAD DATA reported warnings: {warning}")
+    return loaded
@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+from .generator import COLUMNS, DATASET_SCHEMA_VERSION, generate_columns
+
+
+class DatasetCache:
+    """
+    Cache of generated benchmark datasets keyed by (rows, seed, schema version).
+
+    Recently used datasets are kept in memory up to `max_bytes`; every dataset
+    is also written to `cache_dir` as one .npy file per column and reopened
+    memory-mapped, so a restarted process can reuse it without regenerating.
+
+    Args:
+        cache_dir (str): Directory for the on-disk copies. None disables spilling.
+        max_bytes (int): Upper bound on the in-memory LRU size.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _nbytes(columns):
+        return sum(values.nbytes for values in columns.values())
+
+    def _path(self, key):
+        rows, seed, version = key
+        return os.path.join(self.cache_dir, f"events-r{rows}-s{seed}-v{version}")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in COLUMNS}
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable cached dataset {path}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+
+    def _store(self, key, columns):
+        if not self.cache_dir:
+            return columns
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            for name in COLUMNS:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), columns[name])
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not spill dataset to {path}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return columns
+        return self._load(key) or columns
+
+    def _remember(self, key, columns):
+        """Adds a dataset to the LRU and evicts the oldest ones over the cap. Caller holds the lock."""
+        self._entries[key] = columns
+        self._size += self._nbytes(columns)
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= self._nbytes(evicted)
+            self._stats['evictions'] += 1
+
+    def get(self, rows, seed):
+        """
+        Returns the dataset for (rows, seed), generating it only on a full miss.
+
+        The returned arrays may be read-only memory maps and must not be modified.
+
+        Args:
+            rows (int): Number of events.
+            seed (int): Generator seed.
+
+        Returns:
+            dict: Column name -> NumPy array, as produced by generate_columns().
+        """
+        key = (rows, seed, DATASET_SCHEMA_VERSION)
+        with self._lock:
+            columns = self._entries.get(key)
+            if columns is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return columns
+
+            columns = self._load(key)
+            if columns is not None:
+                self._stats['disk_hits'] += 1
+            else:
+                self._stats['misses'] += 1
+                columns = self._store(key, generate_columns(rows, seed=seed))
+            self._remember(key, columns)
+            return columns
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Hit/miss/eviction counters and the in-memory footprint.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._size
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_dataset_cache():
+    """
+    Returns the process-wide dataset cache, creating it on first use.
+
+    Settings are read from DATASET_CACHE_DIR (empty disables the on-disk copy)
+    and DATASET_CACHE_MAX_MB.
+
+    Returns:
+        DatasetCache: The shared cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DatasetCache(
+                    cache_dir=os.environ.get('DATASET_CACHE_DIR', '.dataset_cache') or None,
+                    max_bytes=int(os.environ.get('DATASET_CACHE_MAX_MB', 512)) * 1024 * 1024,
+                )
+    return _cache
@@ -0,0 +1,322 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import mariadb
+from .tracing import phase
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+def get_db_config():
+    """
+    Builds the MariaDB connection settings from the environment.
+
+    Returns:
+        dict: Keyword arguments for mariadb.connect().
+    """
+    return {
+        'host': os.environ.get('MARIADB_HOST', 'localhost'),
+        'port': int(os.environ.get('MARIADB_PORT', 3306)),
+        'user': os.environ.get('MARIADB_USER', 'root'),
+        'password': os.environ.get('MARIADB_PASSWORD', ''),
+        'database': os.environ.get('MARIADB_DATABASE', 'test_db'),
+        'max_allowed_packet': 1024 * 1024 * 256,
+        'local_infile': True,
+    }
+
+
+class _PoolEntry:
+    __slots__ = ('conn', 'created_at', 'last_used_at', 'statements')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used_at = now
+        # Prepared cursors by SQL text, see statements.prepared_cursor().
+        self.statements = OrderedDict()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of MariaDB connections.
+
+    Connections are opened lazily up to `size`. Idle connections are reused
+    most-recently-used first, pinged before reuse when they have been idle for
+    longer than `ping_interval`, and closed once they exceed `max_lifetime` or
+    sit idle for longer than `idle_timeout`.
+
+    Args:
+        connect_kwargs (dict): Keyword arguments for mariadb.connect().
+        size (int): Maximum number of open connections.
+        max_lifetime (float): Seconds after which a connection is recycled.
+        idle_timeout (float): Seconds an idle connection is kept open.
+        checkout_timeout (float): Seconds to wait for a free connection.
+        ping_interval (float): Idle seconds after which a connection is pinged on checkout.
+    """
+
+    def __init__(self, connect_kwargs, size=5, max_lifetime=1800.0, idle_timeout=300.0,
+                 checkout_timeout=30.0, ping_interval=30.0):
+        self.connect_kwargs = connect_kwargs
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+
+        self._idle = deque()
+        self._in_use = {}
+        self._open_count = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_ms': 0.0,
+            'timeouts': 0,
+            'opened': 0,
+            'closed': 0,
+            'health_check_failures': 0,
+        }
+
+    def _is_expired(self, entry, now):
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        if self.idle_timeout and now - entry.last_used_at > self.idle_timeout:
+            return True
+        return False
+
+    def _close_entry(self, entry):
+        try:
+            entry.conn.close()
+        except mariadb.Error:
+            pass
+        with self._cond:
+            self._open_count -= 1
+            self._stats['closed'] += 1
+            self._cond.notify()
+
+    def _evict_idle(self, now):
+        """Removes expired connections from the idle list. Caller holds the lock."""
+        expired = [entry for entry in self._idle if self._is_expired(entry, now)]
+        for entry in expired:
+            self._idle.remove(entry)
+        return expired
+
+    def _take(self):
+        """Returns an idle entry, a reserved slot (None) or waits for one."""
+        deadline = None
+        waited = False
+        wait_start = time.perf_counter()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                expired = self._evict_idle(time.monotonic())
+                if expired:
+                    self._open_count -= len(expired)
+                    self._stats['closed'] += len(expired)
+                    for entry in expired:
+                        try:
+                            entry.conn.close()
+                        except mariadb.Error:
+                            pass
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open_count < self.size:
+                    self._open_count += 1
+                    entry = None
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.checkout_timeout
+                    waited = True
+                    self._stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No MariaDB connection available after {self.checkout_timeout}s"
+                    )
+                self._cond.wait(remaining)
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['wait_time_ms'] += (time.perf_counter() - wait_start) * 1000
+        return entry
+
+    def _open(self):
+        try:
+            conn = mariadb.connect(**self.connect_kwargs)
+        except mariadb.Error:
+            with self._cond:
+                self._open_count -= 1
+                self._stats['checkouts'] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['opened'] += 1
+        return _PoolEntry(conn)
+
+    def acquire(self):
+        """
+        Borrows a connection from the pool, opening one if needed.
+
+        Returns:
+            mariadb.Connection: A healthy connection. Must be given back with release().
+        """
+        while True:
+            entry = self._take()
+            if entry is None:
+                entry = self._open()
+                break
+            if self.ping_interval is not None and time.monotonic() - entry.last_used_at >= self.ping_interval:
+                try:
+                    entry.conn.ping()
+                except mariadb.Error:
+                    with self._cond:
+                        self._stats['health_check_failures'] += 1
+                        self._stats['checkouts'] -= 1
+                    self._close_entry(entry)
+                    continue
+            break
+
+        with self._cond:
+            self._in_use[id(entry.conn)] = entry
+        return entry.conn
+
+    def release(self, conn, discard=False):
+        """
+        Returns a borrowed connection to the pool.
+
+        Any open transaction is rolled back so the next borrower starts clean.
+
+        Args:
+            conn (mariadb.Connection): The connection obtained from acquire().
+            discard (bool): Close the connection instead of reusing it.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            return
+
+        if not discard:
+            try:
+                conn.rollback()
+            except mariadb.Error:
+                discard = True
+
+        now = time.monotonic()
+        if discard or self._closed or (self.max_lifetime and now - entry.created_at > self.max_lifetime):
+            self._close_entry(entry)
+            return
+
+        entry.last_used_at = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that borrows a connection and always returns it.
+
+        A connection that raised an error which a rollback cannot recover
+        from is discarded rather than reused.
+        """
+        with phase("connect"):
+            conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except mariadb.Error:
+            try:
+                conn.rollback()
+            except mariadb.Error:
+                discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def statements(self, conn):
+        """
+        Returns the prepared statement registry of a borrowed connection.
+
+        The registry lives as long as the connection, so statements prepared
+        by one borrower are reused by the next.
+
+        Args:
+            conn (mariadb.Connection): A connection obtained from acquire().
+
+        Returns:
+            OrderedDict: SQL text -> prepared cursor.
+        """
+        with self._cond:
+            return self._in_use[id(conn)].statements
+
+    def stats(self):
+        """
+        Returns a snapshot of the pool counters.
+
+        Returns:
+            dict: Checkout, wait, open/close counters and current occupancy.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['wait_time_ms'] = round(stats['wait_time_ms'], 3)
+            stats['size'] = self.size
+            stats['open'] = self._open_count
+            stats['in_use'] = len(self._in_use)
+            stats['idle'] = len(self._idle)
+        return stats
+
+    def close(self):
+        """Closes all idle connections and stops handing out new ones."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for entry in idle:
+            self._close_entry(entry)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Pool settings are read from MARIADB_POOL_SIZE, MARIADB_POOL_MAX_LIFETIME,
+    MARIADB_POOL_IDLE_TIMEOUT, MARIADB_POOL_TIMEOUT and MARIADB_POOL_PING_INTERVAL.
+
+    Returns:
+        ConnectionPool: The shared pool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_db_config(),
+                    size=int(os.environ.get('MARIADB_POOL_SIZE', 5)),
+                    max_lifetime=float(os.environ.get('MARIADB_POOL_MAX_LIFETIME', 1800)),
+                    idle_timeout=float(os.environ.get('MARIADB_POOL_IDLE_TIMEOUT', 300)),
+                    checkout_timeout=float(os.environ.get('MARIADB_POOL_TIMEOUT', 30)),
+                    ping_interval=float(os.environ.get('MARIADB_POOL_PING_INTERVAL', 30)),
+                )
+    return _pool
+
+
+def pooled_connection():
+    """
+    Borrows a connection from the shared pool.
+
+    Returns:
+        contextmanager: Yields a mariadb.Connection and returns it to the pool on exit.
+    """
+    return get_pool().connection()
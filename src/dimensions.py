@@ -0,0 +1,198 @@
+"""
+In-process cache of the Severity, Event_type, Source and Location tables.
+
+The dimension tables hold a handful of rows and rarely change, so instead of
+joining them on every query they are loaded once; filters on their columns
+are rewritten into id predicates on Event (e.g. source_ID IN (3)) and
+result rows are enriched with names in Python.
+
+Entries are revalidated once they are older than the TTL: a CHECKSUM TABLE
+over the four tables serves as their version, and they are only reloaded
+when it changed.
+"""
+import os
+import threading
+import time
+from .db_pool import pooled_connection
+from .tracing import phase
+
+DIMENSION_TABLES = ("Severity", "Event_type", "Source", "Location")
+
+DIMENSION_QUERIES = {
+    "severities": "SELECT id, name FROM Severity",
+    "event_types": "SELECT id, name FROM Event_type",
+    "sources": "SELECT id, name, ip_address, location_id FROM Source",
+    "locations": "SELECT id, name, country, city FROM Location",
+}
+
+VERSION_QUERY = f"CHECKSUM TABLE {', '.join(DIMENSION_TABLES)}"
+
+
+class DimensionCache:
+    """
+    Dimension rows keyed by id, revalidated after `ttl` seconds.
+
+    Args:
+        ttl (float): Seconds before the version is checked again; 0 checks on every use.
+    """
+
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._tables = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'loads': 0, 'version_checks': 0}
+
+    def _load(self, cursor):
+        tables = {}
+        for name, query in DIMENSION_QUERIES.items():
+            cursor.execute(query)
+            tables[name] = {row[0]: row for row in cursor.fetchall()}
+        return tables
+
+    def tables(self):
+        """
+        Returns the cached dimension rows, loading or revalidating them if due.
+
+        Returns:
+            dict: Table name in DIMENSION_QUERIES -> {id: row tuple}.
+
+        Raises:
+            mariadb.Error: If loading fails and nothing is cached yet.
+        """
+        with self._lock:
+            if self._tables is not None and time.monotonic() - self._checked_at < self.ttl:
+                self._stats['hits'] += 1
+                return self._tables
+            with phase("fetch", cache="dimensions"):
+                with pooled_connection() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.execute(VERSION_QUERY)
+                        version = tuple(row[1] for row in cursor.fetchall())
+                        self._stats['version_checks'] += 1
+                        if self._tables is None or version != self._version:
+                            self._tables = self._load(cursor)
+                            self._version = version
+                            self._stats['loads'] += 1
+                        conn.commit()
+                    finally:
+                        cursor.close()
+            self._checked_at = time.monotonic()
+            return self._tables
+
+    def invalidate(self):
+        """Forces a reload on the next use, e.g. after writing a dimension table."""
+        with self._lock:
+            self._tables = None
+            self._version = None
+
+    def source_ids(self, country=None, city=None):
+        """
+        Returns the sorted ids of the sources located in a country and/or city.
+        """
+        tables = self.tables()
+        locations = tables["locations"]
+        return sorted(
+            source_id for source_id, (_, _, _, location_id) in tables["sources"].items()
+            if location_id in locations
+            and (country is None or locations[location_id][2] == country)
+            and (city is None or locations[location_id][3] == city)
+        )
+
+    def severity_ids(self, name):
+        """Returns the ids of the severities called name, ignoring case."""
+        return sorted(
+            severity_id for severity_id, (_, severity) in self.tables()["severities"].items()
+            if severity.lower() == name.lower()
+        )
+
+    def event_filter(self, country=None, city=None, severity=None):
+        """
+        Rewrites filters on dimension columns into a condition on Event ids.
+
+        Args:
+            country (str): Location.country of the event's source.
+            city (str): Location.city of the event's source.
+            severity (str): Severity.name, case-insensitive.
+
+        Returns:
+            tuple: (condition, params) for a WHERE clause; "1=1" with no filters,
+            "1=0" if no dimension row matches.
+        """
+        conditions = []
+        params = []
+        for column, ids in (
+            ("source_ID", self.source_ids(country, city) if country is not None or city is not None else None),
+            ("severity_ID", self.severity_ids(severity) if severity is not None else None),
+        ):
+            if ids is None:
+                continue
+            if not ids:
+                return "1=0", ()
+            conditions.append(f"{column} IN ({', '.join('%s' for _ in ids)})")
+            params.extend(ids)
+        return " AND ".join(conditions) or "1=1", tuple(params)
+
+    def enrich(self, events):
+        """
+        Adds severity, event_type, source, country and city names to event dicts in place.
+
+        Args:
+            events (list): Event dicts with severity_ID, event_type_ID and source_ID.
+
+        Returns:
+            list: The same events.
+        """
+        tables = self.tables()
+        severities = {key: row[1] for key, row in tables["severities"].items()}
+        event_types = {key: row[1] for key, row in tables["event_types"].items()}
+        sources = {}
+        for key, (_, name, _, location_id) in tables["sources"].items():
+            location = tables["locations"].get(location_id)
+            sources[key] = (name, location[2], location[3]) if location else (name, None, None)
+        unknown = (None, None, None)
+        with phase("materialize", rows=len(events)):
+            for event in events:
+                source, country, city = sources.get(event['source_ID'], unknown)
+                event['severity'] = severities.get(event['severity_ID'])
+                event['event_type'] = event_types.get(event['event_type_ID'])
+                event['source'] = source
+                event['country'] = country
+                event['city'] = city
+        return events
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Hit, load and version check counters and the cached row counts.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['ttl'] = self.ttl
+            stats['rows'] = {name: len(rows) for name, rows in (self._tables or {}).items()}
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_dimension_cache():
+    """
+    Returns the process-wide dimension cache, creating it on first use.
+
+    The TTL is read from DIMENSION_CACHE_TTL_S.
+
+    Returns:
+        DimensionCache: The shared cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DimensionCache(ttl=float(os.environ.get('DIMENSION_CACHE_TTL_S', 60)))
+    return _cache
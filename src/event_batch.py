@@ -0,0 +1,224 @@
+"""
+Compact columnar container for events.
+
+An EventBatch keeps every field in a flat array: timestamps as int64
+wall-clock epoch seconds, the ids as int8 for generated events and int32
+(Event's INT columns) for rows read back, and messages as (start, end)
+byte offsets into one shared UTF-8 buffer. A million events take a few tens
+of MB instead of the hundreds of MB of the equivalent row dicts, and hold
+a handful of objects for the garbage collector to track instead of
+millions.
+
+Slicing returns views sharing the arrays and the message buffer. Python
+objects (strings, insert tuples, dicts) are only created on demand.
+"""
+from datetime import timezone
+import numpy as np
+
+# Field order of Event insert tuples and query results.
+EVENT_FIELDS = ("timestamp", "message", "severity_ID", "event_type_ID", "source_ID")
+
+# Rows turned into Python tuples at a time by EventBatch.rows().
+ROW_CHUNK_SIZE = 4096
+
+_ID_FIELDS = ("severity_ID", "event_type_ID", "source_ID")
+_shared_messages = None
+
+
+def _message_table_offsets():
+    """
+    Returns (buffer, starts, ends) of generator.MESSAGE_TABLE packed into one buffer.
+
+    Built on first use; every batch made by from_columns() shares the buffer.
+    """
+    global _shared_messages
+    if _shared_messages is None:
+        from .generator import MESSAGE_TABLE
+        _shared_messages = _pack_messages(MESSAGE_TABLE.tolist())
+    return _shared_messages
+
+
+def _pack_messages(messages):
+    encoded = [message.encode() for message in messages]
+    ends = np.cumsum([len(message) for message in encoded], dtype=np.int64)
+    starts = ends - np.array([len(message) for message in encoded], dtype=np.int64)
+    return b"".join(encoded), starts, ends
+
+
+def _epoch_seconds(timestamps):
+    """Converts datetimes or "YYYY-MM-DD HH:MM:SS" strings to int64 wall-clock epoch seconds."""
+    values = list(timestamps)
+    if values and getattr(values[0], "tzinfo", None) is not None:
+        values = [value.astimezone(timezone.utc).replace(tzinfo=None) for value in values]
+    return np.array(values, dtype="datetime64[s]").astype(np.int64)
+
+
+class EventBatch:
+    """
+    Events stored as columns.
+
+    Indexing with a field name returns that column ("message" decodes the
+    messages), a slice returns a zero-copy EventBatch and an int returns one
+    insert tuple. Iterating yields insert tuples lazily, see rows().
+
+    Args:
+        timestamp (np.ndarray): int64 wall-clock epoch seconds.
+        severity_ID (np.ndarray): Severity ids.
+        event_type_ID (np.ndarray): Event type ids.
+        source_ID (np.ndarray): Source ids.
+        message_buffer (bytes): UTF-8 message bytes, possibly shared with other batches.
+        message_starts (np.ndarray): Offset of each event's message in message_buffer.
+        message_ends (np.ndarray): Offset after each event's message.
+    """
+
+    __slots__ = ("timestamp", "severity_ID", "event_type_ID", "source_ID",
+                 "message_buffer", "message_starts", "message_ends")
+
+    def __init__(self, timestamp, severity_ID, event_type_ID, source_ID, message_buffer, message_starts,
+                 message_ends):
+        self.timestamp = timestamp
+        self.severity_ID = severity_ID
+        self.event_type_ID = event_type_ID
+        self.source_ID = source_ID
+        self.message_buffer = message_buffer
+        self.message_starts = message_starts
+        self.message_ends = message_ends
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Wraps a column dict from generate_columns().
+
+        The numeric columns are shared, not copied; messages point into one
+        process-wide buffer of every message the generator can produce.
+        """
+        buffer, starts, ends = _message_table_offsets()
+        message_ids = columns["message_ID"]
+        return cls(columns["timestamp"], columns["severity_ID"], columns["event_type_ID"],
+                   columns["source_ID"], buffer, starts[message_ids], ends[message_ids])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a batch from (timestamp, message, severity_ID, event_type_ID, source_ID) tuples.
+
+        Timestamps may be datetimes or "YYYY-MM-DD HH:MM:SS" strings. Ids are
+        kept as int32 like the Event columns, since stored events may use ids
+        beyond the generator's.
+        """
+        if not rows:
+            return cls.empty()
+        timestamps, messages, severities, event_types, sources = zip(*rows)
+        buffer, starts, ends = _pack_messages(messages)
+        return cls(_epoch_seconds(timestamps), np.array(severities, dtype=np.int32),
+                   np.array(event_types, dtype=np.int32), np.array(sources, dtype=np.int32), buffer, starts, ends)
+
+    @classmethod
+    def from_dicts(cls, events):
+        """Builds a batch from event dicts as produced by generate_data()."""
+        return cls.from_rows([tuple(event[name] for name in EVENT_FIELDS) for event in events])
+
+    @classmethod
+    def empty(cls):
+        ids = np.empty(0, dtype=np.int32)
+        offsets = np.empty(0, dtype=np.int64)
+        return cls(np.empty(0, dtype=np.int64), ids, ids, ids, b"", offsets, offsets)
+
+    @classmethod
+    def concat(cls, batches):
+        """
+        Concatenates batches into one.
+
+        Message buffers are joined unless every batch already shares the same one.
+        """
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        columns = {name: np.concatenate([getattr(batch, name) for batch in batches])
+                   for name in ("timestamp",) + _ID_FIELDS}
+        if all(batch.message_buffer is batches[0].message_buffer for batch in batches):
+            buffer = batches[0].message_buffer
+            starts = np.concatenate([batch.message_starts for batch in batches])
+            ends = np.concatenate([batch.message_ends for batch in batches])
+        else:
+            shifts = np.cumsum([0] + [len(batch.message_buffer) for batch in batches[:-1]])
+            buffer = b"".join(batch.message_buffer for batch in batches)
+            starts = np.concatenate([batch.message_starts + shift for batch, shift in zip(batches, shifts)])
+            ends = np.concatenate([batch.message_ends + shift for batch, shift in zip(batches, shifts)])
+        return cls(columns["timestamp"], columns["severity_ID"], columns["event_type_ID"], columns["source_ID"],
+                   buffer, starts, ends)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "message":
+                return self.messages()
+            if key not in EVENT_FIELDS:
+                raise KeyError(key)
+            return getattr(self, key)
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("EventBatch slices must be contiguous")
+            return EventBatch(self.timestamp[key], self.severity_ID[key], self.event_type_ID[key],
+                              self.source_ID[key], self.message_buffer, self.message_starts[key],
+                              self.message_ends[key])
+        index = range(len(self))[key]
+        return next(self[index:index + 1].rows())
+
+    def __iter__(self):
+        return self.rows()
+
+    def messages(self):
+        """Returns the decoded messages as an object array."""
+        message_ids = self.message_ids()
+        if message_ids is not None:
+            from .generator import MESSAGE_TABLE
+            return MESSAGE_TABLE[message_ids]
+        buffer = self.message_buffer
+        return np.array([buffer[start:end].decode()
+                         for start, end in zip(self.message_starts.tolist(), self.message_ends.tolist())],
+                        dtype=object)
+
+    def message_ids(self):
+        """Returns the generator.MESSAGE_TABLE ids of the messages, or None if the batch has its own buffer."""
+        shared = _shared_messages
+        if shared is None or self.message_buffer is not shared[0]:
+            return None
+        return np.searchsorted(shared[1], self.message_starts)
+
+    def formatted_timestamps(self):
+        """Returns the timestamps as "YYYY-MM-DD HH:MM:SS" strings."""
+        from .generator import format_timestamps
+        return format_timestamps(self.timestamp)
+
+    def rows(self):
+        """
+        Yields Event insert tuples, converting ROW_CHUNK_SIZE rows at a time.
+
+        Yields:
+            tuple: (timestamp, message, severity_ID, event_type_ID, source_ID).
+        """
+        for start in range(0, len(self), ROW_CHUNK_SIZE):
+            chunk = self[start:start + ROW_CHUNK_SIZE]
+            yield from zip(
+                chunk.formatted_timestamps().tolist(),
+                chunk.messages().tolist(),
+                chunk.severity_ID.tolist(),
+                chunk.event_type_ID.tolist(),
+                chunk.source_ID.tolist(),
+            )
+
+    def to_dicts(self):
+        """Returns the events as row dicts, for callers that need the dict format."""
+        return [dict(zip(EVENT_FIELDS, row)) for row in self.rows()]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns and offsets, plus the message buffer."""
+        arrays = (self.timestamp, self.severity_ID, self.event_type_ID, self.source_ID,
+                  self.message_starts, self.message_ends)
+        return sum(array.nbytes for array in arrays) + len(self.message_buffer)
@@ -0,0 +1,332 @@
+import random
+from datetime import datetime, timedelta
+import numpy as np
+from .event_batch import EventBatch
+
+SAMPLE_DATA = {
+    "severities": [
+        {"name": "INFO", "description": "Informational message"},
+        {"name": "WARNING", "description": "Warning condition"},
+        {"name": "ERROR", "description": "Error condition"},
+        {"name": "CRITICAL", "description": "Critical condition"}
+    ],
+    "event_types": [
+        {"name": "SYSTEM_STATUS", "description": "System status update"},
+        {"name": "SECURITY_ALERT", "description": "Security-related event"},
+        {"name": "PERFORMANCE", "description": "Performance metric event"},
+        {"name": "USER_ACTION", "description": "User-initiated action"},
+    ],
+    "sources": [
+        {
+            "name": "web-server-01",
+            "ip_address": "192.168.1.100",
+            "location": {"name": "PL-01", "country": "Poland", "city": "Katowice"}
+        },
+        {
+            "name": "web-server-02",
+            "ip_address": "192.168.1.200",
+            "location": {"name": "PL-02", "country": "Poland", "city": "Gdansk"}
+        },
+        {
+            "name": "cache-01",
+            "ip_address": "192.168.2.100",
+            "location": {"name": "US-01", "country": "USA", "city": "New York"}
+        },
+        {
+            "name": "lb-01",
+            "ip_address": "192.168.3.100",
+            "location": {"name": "DE-01", "country": "Germany", "city": "Frankfurt"}
+        }
+    ],
+    "messages": {
+        "SYSTEM_STATUS": [
+            "System startup completed",
+            "System shutdown initiated",
+            "Service restart required",
+            "Memory usage at {}%",
+            "CPU utilization peaked at {}%"
+        ],
+        "SECURITY_ALERT": [
+            "Failed login attempt from IP {}",
+            "Suspicious activity detected",
+            "Firewall rule updated",
+            "New security patch applied",
+            "User account locked after {} attempts"
+        ],
+        "PERFORMANCE": [
+            "Response time exceeded {}ms",
+            "Database query took {}ms",
+            "Network latency increased to {}ms",
+            "Queue size reached {}"
+        ],
+        "USER_ACTION": [
+            "User {} logged in successfully",
+            "Password change attempted",
+            "Configuration updated by admin",
+            "New user account created"
+        ],
+    }
+}
+
+def generate_data(events_to_generate):
+    data = []
+    for _ in range(events_to_generate):
+        # Generate random timestamp with time variation (±12 hours)
+        reference_time = datetime.now()
+        time_variation = timedelta(hours=random.uniform(-12, 12))
+        timestamp = (reference_time + time_variation).strftime("%Y-%m-%d %H:%M:%S")
+
+        severity = random.choice(SAMPLE_DATA["severities"])
+        event_type = random.choice(SAMPLE_DATA["event_types"])
+        source = random.choice(SAMPLE_DATA["sources"])
+        message_template = random.choice(SAMPLE_DATA["messages"][event_type["name"]])
+        message = message_template.format(
+            *[random.randint(1, 100) for _ in range(message_template.count("{}"))]
+        )
+
+        entry = {
+            "timestamp": timestamp,
+            "message": message,
+            "severity_ID": SAMPLE_DATA["severities"].index(severity) + 1,
+            "event_type_ID": SAMPLE_DATA["event_types"].index(event_type) + 1,
+            "source_ID": SAMPLE_DATA["sources"].index(source) + 1
+        }
+        data.append(entry)
+    return data
+
+
+# Upper bound (inclusive) of the integers substituted into message templates.
+MESSAGE_PARAM_MAX = 100
+
+# Timestamps of seeded datasets are spread around this fixed point so the same
+# seed always yields the same rows.
+SEEDED_REFERENCE_TIME = datetime(2024, 10, 18)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _build_message_index():
+    """
+    Pre-renders every message the templates can produce.
+
+    Each template contains at most one "{}" placeholder filled with an integer
+    in 1..MESSAGE_PARAM_MAX, so the full message space is small enough to be
+    rendered once and addressed by integer ID.
+
+    Returns:
+        tuple: (message table, per-event-type template offsets, per-event-type
+            template counts, per-template offset into the message table,
+            per-template flag telling whether it takes a parameter).
+    """
+    messages = []
+    type_offsets = []
+    type_counts = []
+    template_offsets = []
+    template_has_param = []
+    for event_type in SAMPLE_DATA["event_types"]:
+        templates = SAMPLE_DATA["messages"][event_type["name"]]
+        type_offsets.append(len(template_offsets))
+        type_counts.append(len(templates))
+        for template in templates:
+            placeholders = template.count("{}")
+            if placeholders > 1:
+                raise ValueError(f"Template has more than one placeholder: {template}")
+            template_offsets.append(len(messages))
+            template_has_param.append(placeholders == 1)
+            if placeholders:
+                messages.extend(template.format(i) for i in range(1, MESSAGE_PARAM_MAX + 1))
+            else:
+                messages.append(template)
+
+    return (
+        np.array(messages, dtype=object),
+        np.array(type_offsets, dtype=np.int64),
+        np.array(type_counts, dtype=np.int64),
+        np.array(template_offsets, dtype=np.int64),
+        np.array(template_has_param, dtype=bool),
+    )
+
+
+MESSAGE_TABLE, _TYPE_TEMPLATE_OFFSETS, _TYPE_TEMPLATE_COUNTS, _TEMPLATE_MESSAGE_OFFSETS, _TEMPLATE_HAS_PARAM = _build_message_index()
+
+# Bump whenever generate_columns() output for a given seed changes, so cached
+# datasets produced by an older generator are not reused.
+DATASET_SCHEMA_VERSION = 1
+
+# Column names of a columnar event batch, in generation order.
+COLUMNS = ("timestamp", "message_ID", "severity_ID", "event_type_ID", "source_ID")
+
+
+def _generate_block(rng, count, reference_seconds):
+    timestamps = reference_seconds + rng.integers(-12 * 3600, 12 * 3600, size=count, endpoint=True)
+    severity_ids = rng.integers(1, len(SAMPLE_DATA["severities"]), size=count, endpoint=True, dtype=np.int8)
+    event_type_ids = rng.integers(1, len(SAMPLE_DATA["event_types"]), size=count, endpoint=True, dtype=np.int8)
+    source_ids = rng.integers(1, len(SAMPLE_DATA["sources"]), size=count, endpoint=True, dtype=np.int8)
+
+    type_index = event_type_ids.astype(np.int64) - 1
+    template_choice = (rng.random(count) * _TYPE_TEMPLATE_COUNTS[type_index]).astype(np.int64)
+    template_ids = _TYPE_TEMPLATE_OFFSETS[type_index] + template_choice
+    params = rng.integers(0, MESSAGE_PARAM_MAX, size=count)
+    message_ids = _TEMPLATE_MESSAGE_OFFSETS[template_ids] + np.where(_TEMPLATE_HAS_PARAM[template_ids], params, 0)
+
+    return {
+        "timestamp": timestamps.astype(np.int64),
+        "message_ID": message_ids.astype(np.int16),
+        "severity_ID": severity_ids,
+        "event_type_ID": event_type_ids,
+        "source_ID": source_ids,
+    }
+
+
+def _reference_seconds(seed, reference_time):
+    if reference_time is None:
+        reference_time = datetime.now() if seed is None else SEEDED_REFERENCE_TIME
+    return int((reference_time - _EPOCH).total_seconds())
+
+
+def generate_columns(events_to_generate, seed=None, reference_time=None):
+    """
+    Generates random events as whole NumPy columns instead of per-row dicts.
+
+    Timestamps are wall-clock seconds since 1970-01-01 (no timezone shift), so
+    formatting them reproduces the local time the row-based generator emits.
+    Messages are stored as IDs into MESSAGE_TABLE.
+
+    Args:
+        events_to_generate (int): Number of events to generate.
+        seed (int): Seed for reproducible output. None draws fresh entropy.
+        reference_time (datetime): Centre of the ±12 hour timestamp window.
+            Defaults to now, or SEEDED_REFERENCE_TIME when a seed is given.
+
+    Returns:
+        dict: Column name -> NumPy array, keyed by COLUMNS.
+    """
+    rng = np.random.default_rng(seed)
+    return _generate_block(rng, events_to_generate, _reference_seconds(seed, reference_time))
+
+
+def generate_batch(events_to_generate, seed=None, reference_time=None):
+    """
+    Generates random events as an EventBatch, see generate_columns().
+
+    Returns:
+        EventBatch: The events; messages share one process-wide buffer.
+    """
+    return EventBatch.from_columns(generate_columns(events_to_generate, seed=seed, reference_time=reference_time))
+
+
+def iter_column_chunks(events_to_generate, chunk_size, seed=None, reference_time=None):
+    """
+    Yields generated events in column chunks of at most chunk_size rows.
+
+    The chunks of a seeded run are deterministic for a given chunk_size.
+
+    Args:
+        events_to_generate (int): Total number of events to generate.
+        chunk_size (int): Maximum number of rows per chunk.
+        seed (int): Seed for reproducible output.
+        reference_time (datetime): See generate_columns().
+
+    Yields:
+        dict: Column name -> NumPy array.
+    """
+    rng = np.random.default_rng(seed)
+    reference_seconds = _reference_seconds(seed, reference_time)
+    for start in range(0, events_to_generate, chunk_size):
+        yield _generate_block(rng, min(chunk_size, events_to_generate - start), reference_seconds)
+
+
+def is_columnar(events_data):
+    """Tells whether events_data is a column dict or EventBatch rather than a list of row dicts."""
+    return isinstance(events_data, (dict, EventBatch))
+
+
+def columns_length(columns):
+    """Returns the number of rows in a column dict or EventBatch."""
+    return len(columns["timestamp"])
+
+
+def slice_columns(columns, start, stop):
+    """
+    Returns rows [start, stop) of a column dict or EventBatch. The arrays are views, not copies.
+    """
+    if isinstance(columns, EventBatch):
+        return columns[start:stop]
+    return {name: values[start:stop] for name, values in columns.items()}
+
+
+def format_timestamps(timestamps):
+    """
+    Formats wall-clock epoch seconds as "YYYY-MM-DD HH:MM:SS" strings.
+
+    Args:
+        timestamps (np.ndarray): int64 seconds since 1970-01-01.
+
+    Returns:
+        np.ndarray: Array of formatted strings.
+    """
+    formatted = np.datetime_as_string(timestamps.astype("datetime64[s]"), unit="s")
+    return np.char.replace(formatted, "T", " ")
+
+
+def column_messages(columns):
+    """Returns the rendered messages of a column dict or EventBatch as an object array."""
+    if isinstance(columns, EventBatch):
+        return columns.messages()
+    return MESSAGE_TABLE[columns["message_ID"]]
+
+
+def column_rows(columns):
+    """
+    Converts a column dict or EventBatch into Event insert tuples.
+
+    Returns:
+        iterator: (timestamp, message, severity_ID, event_type_ID, source_ID) tuples.
+    """
+    if isinstance(columns, EventBatch):
+        return columns.rows()
+    return zip(
+        format_timestamps(columns["timestamp"]).tolist(),
+        column_messages(columns).tolist(),
+        columns["severity_ID"].tolist(),
+        columns["event_type_ID"].tolist(),
+        columns["source_ID"].tolist(),
+    )
+
+
+def events_length(events_data):
+    """Returns the number of events in a list of row dicts, a column dict or an EventBatch."""
+    return columns_length(events_data) if is_columnar(events_data) else len(events_data)
+
+
+def event_rows(events_data, start=0, stop=None):
+    """
+    Returns events [start, stop) as Event insert tuples.
+
+    Args:
+        events_data (list | dict | EventBatch): A list of row dicts, a column dict or an EventBatch.
+        start (int): First row.
+        stop (int): Row after the last one. Defaults to the end.
+
+    Returns:
+        list: (timestamp, message, severity_ID, event_type_ID, source_ID) tuples.
+    """
+    if is_columnar(events_data):
+        return list(column_rows(slice_columns(events_data, start, stop)))
+    return [
+        (
+            event_data['timestamp'],
+            event_data['message'],
+            event_data['severity_ID'],
+            event_data['event_type_ID'],
+            event_data['source_ID']
+        )
+        for event_data in events_data[start:stop]
+    ]
+
+
+def slice_events(events_data, start, stop):
+    """Returns events [start, stop) keeping the input representation."""
+    if is_columnar(events_data):
+        return slice_columns(events_data, start, stop)
+    return events_data[start:stop]
@@ -14,8 +14,19 @@ endpoints = {
     "maria_join_query": "maria_join_query_med.json",
     "maria_all_query": "maria_all_query_med.json",
     "maria_update": "maria_update_med.json",
+    "influx_create": "influx_create_med.json",
+    "influx_delete": "influx_delete_med.json",
+    "influx_simple_query": "influx_simple_query_med.json",
+    "influx_join_query": "influx_join_query_med.json",
+    "influx_all_query": "influx_all_query_med.json",
+    "influx_update": "influx_update_med.json",
 }
 
+# For repetition statistics, confidence intervals and regression checks run
+# the benchmarks in-process instead: python -m src.bench_runner --help
+# For full sweeps with one fresh process per cell, run in parallel on
+# separate schemas: python -m src.bench_orchestrator --help
+
 # Function to clean and parse the response
 def clean_response(response_text):
     cleaned_text = response_text.replace('\\', '').strip('"')
@@ -33,17 +44,26 @@ def duration_to_milliseconds(duration_str):
 # Function to calculate the median duration for each span
 def calculate_median_durations(data):
     span_durations = {}
+    span_engines = {}
     for entry in data:
         span = entry['span']
-        duration = duration_to_milliseconds(entry['duration'])
+        if 'duration_ns' in entry:
+            duration = entry['duration_ns'] / 1e6
+        else:
+            duration = duration_to_milliseconds(entry['duration'])
         if span not in span_durations:
             span_durations[span] = []
         span_durations[span].append(duration)
+        if 'engine' in entry:
+            span_engines[span] = entry['engine']
     
     median_durations = []
     for span, durations in span_durations.items():
         median_duration = statistics.median(durations)
-        median_durations.append({"span": span, "duration": f"{median_duration:.2f} ms"})
+        median_entry = {"span": span, "duration": f"{median_duration:.2f} ms"}
+        if span in span_engines:
+            median_entry["engine"] = span_engines[span]
+        median_durations.append(median_entry)
     
     return median_durations
 
@@ -0,0 +1,445 @@
+import itertools
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from influxdb_client import InfluxDBClient, Point, WriteOptions # type: ignore
+from influxdb_client.client.write_api import SYNCHRONOUS
+from .result_stream import DEFAULT_BATCH_SIZE, stream_rows
+from .generator import SAMPLE_DATA, column_messages, events_length, is_columnar, slice_columns
+from .tracing import phase
+
+MEASUREMENT = "event"
+
+# Location country of each source_ID, stored as a tag so the Source/Location
+# join becomes a tag filter.
+SOURCE_COUNTRIES = [source["location"]["country"] for source in SAMPLE_DATA["sources"]]
+
+# Events are written with second resolution; the nanosecond part carries a
+# running sequence number so events sharing a second and tag set do not
+# overwrite each other.
+_sequence = 0
+_sequence_lock = threading.Lock()
+
+# Rows serialized to line protocol per write_api.write() call.
+SERIALIZE_CHUNK_SIZE = 50000
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_influxdb_client():
+    """
+    Returns the process-wide InfluxDB client, creating it on first use.
+
+    Returns:
+        InfluxDBClient: The shared client, or False if it could not be created.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # A token takes precedence; username/password makes the client
+                # sign in for a session cookie instead.
+                if os.environ.get('INFLUXDB_TOKEN'):
+                    credentials = {'token': os.environ['INFLUXDB_TOKEN']}
+                else:
+                    credentials = {
+                        'username': os.environ.get('INFLUXDB_USER'),
+                        'password': os.environ.get('INFLUXDB_PASSWORD'),
+                    }
+                try:
+                    _client = InfluxDBClient(
+                        url=os.environ.get('INFLUXDB_URL', f"http://{os.environ.get('INFLUXDB_HOST', 'influxdb')}:8086"),
+                        org=os.environ['INFLUXDB_ORG'],
+                        ssl=True,
+                        verify_ssl=True,
+                        **credentials,
+                    )
+                except Exception as e:
+                    print(f"Error: {e}")
+                    return False
+    return _client
+
+
+def get_bucket():
+    return os.environ.get('INFLUXDB_BUCKET', 'influxdb_bucket')
+
+
+def get_org():
+    return os.environ.get('INFLUXDB_ORG', 'influxdb_org')
+
+
+def _escape_tag(value):
+    return str(value).replace('\\', '\\\\').replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+
+def _escape_field_string(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+_COUNTRY_TAGS = [_escape_tag(country) for country in SOURCE_COUNTRIES]
+
+
+def _timestamp_seconds(timestamp):
+    if isinstance(timestamp, datetime):
+        return int(timestamp.replace(tzinfo=timezone.utc).timestamp())
+    return int(datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+
+
+def _reserve_sequence(count):
+    """Reserves count sequence numbers so concurrent writers never share one."""
+    global _sequence
+    with _sequence_lock:
+        start = _sequence
+        _sequence += count
+    return start
+
+
+def _lines(timestamps, messages, severity_ids, event_type_ids, source_ids):
+    sequence_start = _reserve_sequence(len(timestamps))
+    return [
+        f"{MEASUREMENT},country={_COUNTRY_TAGS[source_id - 1]},event_type_ID={event_type_id},"
+        f"severity_ID={severity_id},source_ID={source_id} "
+        f"message=\"{_escape_field_string(message)}\" "
+        f"{seconds * 1_000_000_000 + (sequence_start + i) % 1_000_000_000}"
+        for i, (seconds, message, severity_id, event_type_id, source_id) in enumerate(
+            zip(timestamps, messages, severity_ids, event_type_ids, source_ids)
+        )
+    ]
+
+
+def events_to_line_protocol(events_data, start=0, stop=None):
+    """
+    Serializes events [start, stop) to InfluxDB line protocol.
+
+    Column dicts are serialized straight from their arrays; row dicts are
+    accepted for the ingestion paths. Timestamps are treated as UTC.
+
+    Args:
+        events_data (list | dict): Row dicts or a column dict.
+        start (int): First row.
+        stop (int): Row after the last one. Defaults to the end.
+
+    Returns:
+        list: One line-protocol string per event.
+    """
+    if is_columnar(events_data):
+        columns = slice_columns(events_data, start, stop)
+        return _lines(
+            columns["timestamp"].tolist(),
+            column_messages(columns).tolist(),
+            columns["severity_ID"].tolist(),
+            columns["event_type_ID"].tolist(),
+            columns["source_ID"].tolist(),
+        )
+    rows = events_data[start:stop]
+    return _lines(
+        [_timestamp_seconds(event['timestamp']) for event in rows],
+        [event['message'] for event in rows],
+        [event['severity_ID'] for event in rows],
+        [event['event_type_ID'] for event in rows],
+        [event['source_ID'] for event in rows],
+    )
+
+
+def insert_event_with_random_timestamp_influxdb(timestamp):
+    client = get_influxdb_client()
+    if not client:
+        return False
+
+    try:
+        write_api = client.write_api(write_options=SYNCHRONOUS)
+        write_api.write(bucket=get_bucket(), org=get_org(), record=Point("dummy").field("value", 1).time(timestamp))
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    return True
+
+
+def insert_events_influxdb(events_data, batch_size=None, flush_interval=None, report=None):
+    """
+    Writes events to InfluxDB through the batching WriteApi.
+
+    Args:
+        events_data (list | dict): Row dicts or a column dict.
+        batch_size (int): Points per HTTP write. Defaults to INFLUXDB_BATCH_SIZE or 5000.
+        flush_interval (int): Milliseconds before a partial batch is sent.
+            Defaults to INFLUXDB_FLUSH_INTERVAL_MS or 1000.
+        report (dict): If given, filled with rows, batch settings and throughput.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    client = get_influxdb_client()
+    if not client:
+        return False
+
+    batch_size = batch_size or int(os.environ.get('INFLUXDB_BATCH_SIZE', 5000))
+    flush_interval = flush_interval or int(os.environ.get('INFLUXDB_FLUSH_INTERVAL_MS', 1000))
+    errors = []
+
+    def on_error(conf, data, exception):
+        errors.append(exception)
+
+    total_rows = events_length(events_data)
+    started = time.perf_counter()
+    try:
+        write_api = client.write_api(
+            write_options=WriteOptions(batch_size=batch_size, flush_interval=flush_interval),
+            error_callback=on_error,
+        )
+        try:
+            for i in range(0, total_rows, SERIALIZE_CHUNK_SIZE):
+                with phase("serialize"):
+                    lines = events_to_line_protocol(events_data, i, i + SERIALIZE_CHUNK_SIZE)
+                # write() hands the points to the batching thread; close() waits
+                # for the last HTTP writes, which is InfluxDB's nearest thing to a commit.
+                with phase("execute", rows=len(lines)):
+                    write_api.write(bucket=get_bucket(), org=get_org(), record=lines)
+        finally:
+            with phase("commit"):
+                write_api.close()
+    except Exception as e:
+        print(f"Error inserting events into InfluxDB: {e}")
+        return False
+    elapsed = time.perf_counter() - started
+
+    if errors:
+        print(f"Error inserting events into InfluxDB: {errors[0]}")
+        return False
+    print(f"Wrote {total_rows} points to InfluxDB.")
+    if report is not None:
+        report.update({
+            'rows': total_rows,
+            'batch_size': batch_size,
+            'flush_interval': flush_interval,
+            'seconds': round(elapsed, 6),
+            'rows_per_sec': round(total_rows / elapsed, 1) if elapsed > 0 else None,
+        })
+    return True
+
+
+def _delete(predicate, stop="2100-01-01T00:00:00Z"):
+    client = get_influxdb_client()
+    if not client:
+        return False
+    try:
+        client.delete_api().delete(
+            start="1970-01-01T00:00:00Z",
+            stop=stop,
+            predicate=predicate,
+            bucket=get_bucket(),
+            org=get_org(),
+        )
+        return True
+    except Exception as e:
+        print(f"Error deleting from InfluxDB: {e}")
+        return False
+
+
+def clear_events_influxdb():
+    """
+    Deletes all events from the bucket.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    return _delete(f'_measurement="{MEASUREMENT}"')
+
+
+def purge_events_influxdb(cutoff):
+    """
+    Deletes the events older than cutoff.
+
+    InfluxDB drops the affected series data per shard without row locks, so
+    this is already the equivalent of MariaDB's partition strategy.
+
+    Args:
+        cutoff (datetime): Naive UTC time; earlier events are deleted.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    # The delete API's stop bound is inclusive.
+    stop = datetime.fromtimestamp(_timestamp_seconds(cutoff) - 1, timezone.utc)
+    return _delete(f'_measurement="{MEASUREMENT}"', stop=f"{stop:%Y-%m-%dT%H:%M:%S}.999999999Z")
+
+
+def delete_events_influxdb(num_entries):
+    """
+    Deletes events from InfluxDB.
+
+    InfluxDB deletes by time range and tag predicate only, so there is no
+    equivalent of MariaDB's "first N ids". The benchmark harness keeps only
+    the span it just wrote in the bucket, so this deletes all events, which
+    are the same num_entries rows.
+
+    Args:
+        num_entries (int): Number of entries the caller expects to delete.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    return clear_events_influxdb()
+
+
+def fetch_flux_results(query):
+    """
+    Runs a Flux query whose tables were pivoted into one row per event.
+
+    Returns:
+        list: A list of dictionaries with the same keys the MariaDB select helpers return.
+    """
+    client = get_influxdb_client()
+    if not client:
+        return []
+    try:
+        with phase("fetch"):
+            tables = client.query_api().query(query, org=get_org())
+    except Exception as e:
+        print(f"Error fetching query results: {e}")
+        return []
+
+    with phase("materialize"):
+        return [
+            {
+                'timestamp': record.get_time(),
+                'message': record.values.get('message'),
+                'severity_ID': int(record.values['severity_ID']),
+                'event_type_ID': int(record.values['event_type_ID']),
+                'source_ID': int(record.values['source_ID']),
+            }
+            for table in tables
+            for record in table.records
+        ]
+
+
+# Flux filters equivalent to each of the MariaDB SELECT_QUERIES shapes.
+QUERY_FILTERS = {
+    "all": (),
+    "simple": ('r.severity_ID == "2"',),
+    "join": ('r.country == "USA"',),
+}
+
+
+def _flux_events_query(*filters, suffix=''):
+    conditions = ''.join(f'\n  |> filter(fn: (r) => {condition})' for condition in filters)
+    return f'''
+from(bucket: "{get_bucket()}")
+  |> range(start: 0)
+  |> filter(fn: (r) => r._measurement == "{MEASUREMENT}"){conditions}
+  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value"){suffix}
+'''
+
+
+def select_all_events_influxdb():
+    """
+    Selects all events from InfluxDB (full scan).
+
+    Returns:
+        list: A list of dictionaries, each containing the selected event data.
+    """
+    return fetch_flux_results(_flux_events_query(*QUERY_FILTERS["all"]))
+
+
+def select_simple_events_influxdb():
+    """
+    Selects events with severity_ID 2, the equivalent of select_simple_events_mariadb().
+
+    Returns:
+        list: A list of dictionaries, each containing the selected event data.
+    """
+    return fetch_flux_results(_flux_events_query(*QUERY_FILTERS["simple"]))
+
+
+def select_join_events_influxdb():
+    """
+    Selects events from sources located in the USA.
+
+    The Source/Location join of select_join_events_mariadb() is replaced by
+    the denormalized country tag.
+
+    Returns:
+        list: A list of dictionaries, each containing the selected event data.
+    """
+    return fetch_flux_results(_flux_events_query(*QUERY_FILTERS["join"]))
+
+
+def stream_events_influxdb(query, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple"):
+    """
+    Streams one of the QUERY_FILTERS shapes record by record via query_stream().
+
+    Args:
+        query (str): Query shape.
+        batch_size (int): Records grouped per batch for the "columns" format.
+        row_format (str): One of ROW_FORMATS.
+
+    Yields:
+        tuple | EventRow | dict: See result_stream.stream_rows().
+    """
+    client = get_influxdb_client()
+    if not client:
+        raise ConnectionError("InfluxDB client is not available")
+    records = client.query_api().query_stream(_flux_events_query(*QUERY_FILTERS[query]), org=get_org())
+    rows = (
+        (
+            record.get_time(),
+            record.values.get('message'),
+            int(record.values['severity_ID']),
+            int(record.values['event_type_ID']),
+            int(record.values['source_ID']),
+        )
+        for record in records
+    )
+    try:
+        yield from stream_rows(lambda: list(itertools.islice(rows, batch_size)), row_format)
+    finally:
+        records.close()
+
+
+def update_simple_events_influxdb():
+    """
+    Moves events with severity_ID 2 to severity_ID 3.
+
+    Tags cannot be changed in place, so the matching points are rewritten
+    with the new tag and the old series is deleted.
+
+    Returns:
+        bool: True if the update was successful, False otherwise.
+    """
+    client = get_influxdb_client()
+    if not client:
+        return False
+
+    # _time is read back as an integer to keep the nanosecond sequence part.
+    query = _flux_events_query(
+        'r.severity_ID == "2"',
+        suffix='\n  |> map(fn: (r) => ({r with time_ns: int(v: r._time)}))',
+    )
+    try:
+        tables = client.query_api().query(query, org=get_org())
+    except Exception as e:
+        print(f"Error fetching query results: {e}")
+        return False
+
+    lines = [
+        f"{MEASUREMENT},country={_COUNTRY_TAGS[int(record.values['source_ID']) - 1]},"
+        f"event_type_ID={record.values['event_type_ID']},severity_ID=3,source_ID={record.values['source_ID']} "
+        f"message=\"{_escape_field_string(record.values.get('message'))}\" "
+        f"{record.values['time_ns']}"
+        for table in tables
+        for record in table.records
+    ]
+    if not lines:
+        return True
+
+    try:
+        write_api = client.write_api(write_options=SYNCHRONOUS)
+        for i in range(0, len(lines), SERIALIZE_CHUNK_SIZE):
+            write_api.write(bucket=get_bucket(), org=get_org(), record=lines[i:i + SERIALIZE_CHUNK_SIZE])
+    except Exception as e:
+        print(f"Error updating events in InfluxDB: {e}")
+        return False
+    return _delete(f'_measurement="{MEASUREMENT}" AND severity_ID="2"')
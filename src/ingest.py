@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+
+class BufferFullError(Exception):
+    """Raised when the write-behind buffer has no room for the submitted events."""
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-memory queue of events flushed to the database in batches.
+
+    Producers enqueue events and return immediately. A background task drains
+    the queue whenever `batch_size` events are waiting or `flush_interval`
+    seconds have passed since the oldest waiting event, and hands each batch
+    to `write_batch` in a worker thread. When the queue is full, producers
+    wait up to `put_timeout` seconds and are then rejected.
+
+    Args:
+        write_batch (callable): Takes a list of event dicts, returns True on success.
+        max_queue (int): Maximum number of queued events.
+        batch_size (int): Maximum number of events per flush.
+        flush_interval (float): Maximum seconds an event waits before being flushed.
+        put_timeout (float): Seconds a producer waits for room before being rejected.
+    """
+
+    def __init__(self, write_batch, max_queue=100000, batch_size=5000, flush_interval=0.5, put_timeout=0.1):
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._events = deque()
+        self._cond = None
+        self._task = None
+        self._stopping = False
+        self._stats = {
+            'enqueued': 0,
+            'rejected': 0,
+            'flushed': 0,
+            'failed': 0,
+            'flushes': 0,
+            'flush_ms_total': 0.0,
+            'flush_ms_max': 0.0,
+            'flush_ms_last': 0.0,
+        }
+
+    async def start(self):
+        """Starts the background flusher on the running event loop."""
+        self._cond = asyncio.Condition()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops accepting events and waits until everything queued is flushed."""
+        if self._task is None:
+            return
+        async with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        await self._task
+        self._task = None
+
+    async def put(self, event):
+        """Enqueues one event. See put_many()."""
+        await self.put_many([event])
+
+    async def put_many(self, events):
+        """
+        Enqueues a batch of events, all or nothing.
+
+        Args:
+            events (list): Event dicts in the format insert_events_mariadb() takes.
+
+        Raises:
+            BufferFullError: If the buffer is stopped or stays too full for the
+                whole batch for longer than put_timeout.
+        """
+        if self._task is None or self._stopping:
+            raise BufferFullError("Ingestion buffer is not running")
+        if len(events) > self.max_queue:
+            raise BufferFullError(f"Batch of {len(events)} events exceeds the queue size of {self.max_queue}")
+
+        async with self._cond:
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self.max_queue - len(self._events) >= len(events)),
+                    self.put_timeout,
+                )
+            except asyncio.TimeoutError:
+                self._stats['rejected'] += len(events)
+                raise BufferFullError("Ingestion buffer is full")
+            self._events.extend(events)
+            self._stats['enqueued'] += len(events)
+            self._cond.notify_all()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: self._events or self._stopping)
+                if not self._events:
+                    return
+
+                deadline = loop.time() + self.flush_interval
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: len(self._events) >= self.batch_size or self._stopping),
+                        max(0.0, deadline - loop.time()),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+                self._cond.notify_all()
+
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            ok = await asyncio.to_thread(self.write_batch, batch)
+        except Exception as e:
+            logging.error(f"Error flushing {len(batch)} buffered events: {e}")
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._stats['flushes'] += 1
+        self._stats['flush_ms_total'] += elapsed_ms
+        self._stats['flush_ms_max'] = max(self._stats['flush_ms_max'], elapsed_ms)
+        self._stats['flush_ms_last'] = elapsed_ms
+        if ok:
+            self._stats['flushed'] += len(batch)
+        else:
+            self._stats['failed'] += len(batch)
+            logging.error(f"Dropped {len(batch)} buffered events after a failed flush.")
+
+    def stats(self):
+        """
+        Returns a snapshot of the buffer counters.
+
+        Returns:
+            dict: Queue depth, enqueue/reject/flush counters and flush latency in ms.
+        """
+        stats = dict(self._stats)
+        stats['queue_depth'] = len(self._events)
+        stats['max_queue'] = self.max_queue
+        stats['flush_ms_avg'] = stats['flush_ms_total'] / stats['flushes'] if stats['flushes'] else 0.0
+        for key in ('flush_ms_total', 'flush_ms_max', 'flush_ms_last', 'flush_ms_avg'):
+            stats[key] = round(stats[key], 3)
+        return stats
+
+
+def buffer_from_env(write_batch):
+    """
+    Creates a WriteBehindBuffer configured from INGEST_QUEUE_SIZE,
+    INGEST_BATCH_SIZE, INGEST_FLUSH_INTERVAL_MS and INGEST_PUT_TIMEOUT_MS.
+    """
+    return WriteBehindBuffer(
+        write_batch,
+        max_queue=int(os.environ.get('INGEST_QUEUE_SIZE', 100000)),
+        batch_size=int(os.environ.get('INGEST_BATCH_SIZE', 5000)),
+        flush_interval=int(os.environ.get('INGEST_FLUSH_INTERVAL_MS', 500)) / 1000,
+        put_timeout=int(os.environ.get('INGEST_PUT_TIMEOUT_MS', 100)) / 1000,
+    )
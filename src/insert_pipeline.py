@@ -0,0 +1,239 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .db_pool import get_pool, pooled_connection
+from .generator import event_rows, events_length
+from .message_templates import ENCODED_INSERT_QUERY, encoded_rows, get_message_storage
+from .rollups import upsert_rollups
+from .statements import statement_cursor
+from .tracing import phase, run_in_context
+
+INSERT_QUERY = """
+INSERT INTO Event (timestamp, message, severity_ID, event_type_ID, source_ID)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+# Share of max_allowed_packet a single chunk may use; leaves room for protocol overhead.
+PACKET_HEADROOM = 0.8
+
+# Rough per-field protocol overhead of a bulk execute, in bytes.
+FIELD_OVERHEAD_BYTES = 4
+
+_max_allowed_packet = None
+
+
+def get_max_allowed_packet(conn):
+    """
+    Returns the server's max_allowed_packet, queried once per process.
+
+    Args:
+        conn (mariadb.Connection): An open connection.
+
+    Returns:
+        int: The packet limit in bytes.
+    """
+    global _max_allowed_packet
+    if _max_allowed_packet is None:
+        cursor = conn.cursor()
+        cursor.execute("SELECT @@max_allowed_packet")
+        _max_allowed_packet = int(cursor.fetchone()[0])
+        cursor.close()
+    return _max_allowed_packet
+
+
+def estimate_row_bytes(rows):
+    """Estimates the wire size of one insert tuple from a sample of rows."""
+    sample = rows[:100]
+    if not sample:
+        return 1
+    total = sum(len(str(value)) + FIELD_OVERHEAD_BYTES for row in sample for value in row)
+    return max(1, total // len(sample))
+
+
+class ChunkSizer:
+    """
+    Picks insert chunk sizes from measured throughput.
+
+    Each finished chunk updates a smoothed rows/sec estimate; the next chunk
+    is sized to take about `target_seconds`, may at most double per step, and
+    never exceeds what fits into the packet budget. Safe to share between
+    worker threads.
+
+    Args:
+        initial (int): Size of the first chunk.
+        min_size (int): Lower bound for any chunk.
+        max_size (int): Upper bound for any chunk.
+        target_seconds (float): Desired execute + commit time per chunk.
+        packet_bytes (int): Packet budget a chunk must fit into.
+    """
+
+    def __init__(self, initial=10000, min_size=1000, max_size=500000, target_seconds=0.5,
+                 packet_bytes=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.packet_bytes = packet_bytes
+        self.row_bytes = None
+        self.rows_per_sec = None
+        self._size = initial
+        self._lock = threading.Lock()
+
+    def _packet_limit(self):
+        if not self.packet_bytes or not self.row_bytes:
+            return self.max_size
+        return max(self.min_size, int(self.packet_bytes * PACKET_HEADROOM / self.row_bytes))
+
+    def next_size(self):
+        with self._lock:
+            return max(self.min_size, min(self._size, self.max_size, self._packet_limit()))
+
+    def record(self, rows, row_bytes, seconds):
+        """
+        Feeds back the outcome of one chunk.
+
+        Args:
+            rows (int): Rows written.
+            row_bytes (int): Estimated bytes per row of the chunk.
+            seconds (float): Time spent executing and committing it.
+        """
+        if rows <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self.row_bytes = row_bytes if self.row_bytes is None else max(self.row_bytes, row_bytes)
+            measured = rows / seconds
+            self.rows_per_sec = measured if self.rows_per_sec is None else 0.7 * self.rows_per_sec + 0.3 * measured
+            wanted = int(self.rows_per_sec * self.target_seconds)
+            self._size = max(self.min_size, min(wanted, self._size * 2, self.max_size))
+
+
+def insert_events_pipeline(events_data, workers=1, chunk_size=None, commit_every=1, sizer=None, rollups=False,
+                           statement_mode=None, message_storage=None):
+    """
+    Inserts events in chunks spread over several pooled connections.
+
+    Worker threads each hold one connection and claim the next range of rows
+    until the input is exhausted. Without a fixed chunk_size, chunk sizes are
+    tuned by a ChunkSizer bounded by the server's max_allowed_packet.
+
+    Args:
+        events_data (list | dict): Row dicts or a column dict.
+        workers (int): Number of writer connections, capped at the pool size.
+        chunk_size (int): Fixed rows per chunk. None enables adaptive sizing.
+        commit_every (int): Commit after this many chunks per worker; 0 commits
+            once after the last chunk, which needs a single worker.
+        sizer (ChunkSizer): Sizer to use, e.g. to carry tuning across calls.
+        rollups (bool): Add each chunk's counts to the rollup tables in the
+            chunk's transaction, see rollups.upsert_rollups().
+        statement_mode (str): How the INSERT is sent, one of statements.STATEMENT_MODES.
+        message_storage (str): How Event stores messages, one of
+            message_templates.MESSAGE_STORAGES. Defaults to the current schema's.
+
+    Returns:
+        dict: Totals and a per-chunk list of rows, bytes and serialize/execute/commit times.
+
+    Raises:
+        ValueError: If commit_every is 0 with more than one worker.
+        mariadb.Error: If any worker fails. Chunks other workers already
+            committed stay committed.
+    """
+    if commit_every == 0 and workers > 1:
+        # Each worker commits on its own connection, so a single commit at
+        # the end cannot cover all of them.
+        raise ValueError("commit_every=0 commits once at the end and needs workers=1")
+    total_rows = events_length(events_data)
+    if (message_storage or get_message_storage()) == "template":
+        insert_query, serialize = ENCODED_INSERT_QUERY, encoded_rows
+    else:
+        insert_query, serialize = INSERT_QUERY, event_rows
+    workers = max(1, min(workers, get_pool().size))
+    if chunk_size is None and sizer is None:
+        sizer = ChunkSizer()
+
+    chunks = []
+    claim_lock = threading.Lock()
+    next_row = [0]
+    failed = threading.Event()
+
+    def claim():
+        with claim_lock:
+            start = next_row[0]
+            if start >= total_rows or failed.is_set():
+                return None
+            size = chunk_size or sizer.next_size()
+            next_row[0] = min(total_rows, start + size)
+            return start, next_row[0]
+
+    def write(worker_id):
+        pending = 0
+        with pooled_connection() as conn:
+            if sizer is not None and sizer.packet_bytes is None:
+                sizer.packet_bytes = get_max_allowed_packet(conn)
+            cursor = conn.cursor()
+            try:
+                while True:
+                    claimed = claim()
+                    if claimed is None:
+                        break
+                    start, stop = claimed
+
+                    t0 = time.perf_counter()
+                    with phase("serialize", rows=stop - start):
+                        values = serialize(events_data, start, stop)
+                        row_bytes = estimate_row_bytes(values)
+                    t1 = time.perf_counter()
+                    with phase("execute", rows=len(values)):
+                        with statement_cursor(conn, insert_query, statement_mode) as insert_cursor:
+                            insert_cursor.executemany(insert_query, values)
+                    if rollups:
+                        upsert_rollups(cursor, events_data, start, stop)
+                    t2 = time.perf_counter()
+                    pending += 1
+                    if commit_every and pending >= commit_every:
+                        with phase("commit"):
+                            conn.commit()
+                        pending = 0
+                    t3 = time.perf_counter()
+
+                    if sizer is not None:
+                        sizer.record(len(values), row_bytes, t3 - t1)
+                    with claim_lock:
+                        chunks.append({
+                            'start': start,
+                            'rows': len(values),
+                            'bytes': row_bytes * len(values),
+                            'worker': worker_id,
+                            'serialize_ms': round((t1 - t0) * 1000, 3),
+                            'execute_ms': round((t2 - t1) * 1000, 3),
+                            'commit_ms': round((t3 - t2) * 1000, 3),
+                        })
+                    print(f"Inserted {len(values)} rows into the Event table "
+                          f"(worker {worker_id}, {(t3 - t0) * 1000:.1f} ms).")
+                if pending:
+                    with phase("commit"):
+                        conn.commit()
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                cursor.close()
+
+    started = time.perf_counter()
+    if workers == 1:
+        write(0)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='event-writer') as executor:
+            futures = [executor.submit(run_in_context(write), worker_id) for worker_id in range(workers)]
+            for future in futures:
+                future.result()
+    elapsed = time.perf_counter() - started
+
+    chunks.sort(key=lambda chunk: chunk['start'])
+    return {
+        'rows': total_rows,
+        'workers': workers,
+        'commit_every': commit_every,
+        'seconds': round(elapsed, 6),
+        'rows_per_sec': round(total_rows / elapsed, 1) if elapsed > 0 else None,
+        'final_chunk_size': chunk_size or sizer.next_size(),
+        'chunks': chunks,
+    }
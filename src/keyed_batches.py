@@ -0,0 +1,124 @@
+import logging
+import time
+import mariadb
+from .db_pool import pooled_connection
+from .tracing import phase
+
+# ER_LOCK_WAIT_TIMEOUT and ER_LOCK_DEADLOCK: the batch was rolled back and
+# can be retried as is.
+LOCK_WAIT_ERRNOS = (1205, 1213)
+
+DEFAULT_KEYED_BATCH_SIZE = 10000
+
+
+def is_lock_wait(error):
+    """Returns True if a mariadb.Error is a lock wait timeout or deadlock."""
+    return getattr(error, "errno", None) in LOCK_WAIT_ERRNOS
+
+
+def execute_in_batches(statement, condition="1=1", params=(), batch_size=DEFAULT_KEYED_BATCH_SIZE,
+                       throttle=0.0, id_range=None, retries=3, backoff=0.5, progress=None):
+    """
+    Runs an UPDATE or DELETE on the Event table in primary-key ranges.
+
+    Each range of batch_size ids is one statement in its own transaction, so
+    locks are held briefly and only on that range. A batch that hits a lock
+    wait timeout or deadlock is rolled back and retried after an exponential
+    backoff.
+
+    Args:
+        statement (str): The statement up to its WHERE clause, e.g. "UPDATE Event SET severity_ID = 3".
+        condition (str): SQL condition on Event rows, with %s placeholders.
+        params (tuple): Parameters for condition.
+        batch_size (int): Ids per statement.
+        throttle (float): Seconds to sleep after each batch.
+        id_range (tuple): (first id, last id) to walk. Defaults to the id span of the matching rows.
+        retries (int): Retries per batch after a lock wait error.
+        backoff (float): Seconds before the first retry; doubled for each further one.
+        progress (callable): Called with a progress dict after every batch.
+
+    Returns:
+        dict: rows, batches, retries, seconds and rows_per_sec.
+
+    Raises:
+        mariadb.Error: If a statement fails, or still hits lock waits after all retries.
+            Batches already committed stay applied.
+    """
+    started = time.perf_counter()
+    affected = 0
+    batches = 0
+    retried = 0
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT MIN(id), MAX(id) FROM Event WHERE {condition}", params)
+            low, high = cursor.fetchone()
+            conn.commit()
+            if id_range is not None and low is not None:
+                low, high = max(low, id_range[0]), min(high, id_range[1])
+            if low is None or low > high:
+                low, high = 1, 0
+
+            for start in range(low, high + 1, batch_size):
+                stop = min(start + batch_size - 1, high)
+                for attempt in range(retries + 1):
+                    try:
+                        with phase("execute"):
+                            cursor.execute(
+                                f"{statement} WHERE id BETWEEN %s AND %s AND ({condition})",
+                                (start, stop) + tuple(params),
+                            )
+                        affected += cursor.rowcount
+                        with phase("commit"):
+                            conn.commit()
+                        break
+                    except mariadb.Error as e:
+                        conn.rollback()
+                        if not is_lock_wait(e) or attempt == retries:
+                            raise
+                        delay = backoff * 2 ** attempt
+                        retried += 1
+                        logging.warning(f"Lock wait on ids {start}-{stop}: {e}. Retrying in {delay} seconds... "
+                                        f"(Attempt {attempt + 1}/{retries})")
+                        time.sleep(delay)
+                batches += 1
+                if progress is not None:
+                    elapsed = time.perf_counter() - started
+                    progress({
+                        'rows': affected,
+                        'batches': batches,
+                        'last_id': stop,
+                        'max_id': high,
+                        'fraction': round((stop - low + 1) / (high - low + 1), 4),
+                        'rows_per_sec': round(affected / elapsed, 1) if elapsed > 0 else None,
+                    })
+                if throttle:
+                    time.sleep(throttle)
+        finally:
+            cursor.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': affected,
+        'batches': batches,
+        'retries': retried,
+        'seconds': round(elapsed, 6),
+        'rows_per_sec': round(affected / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def log_progress(every=10):
+    """
+    Builds a progress callback for execute_in_batches() that logs every Nth batch.
+
+    Args:
+        every (int): Batches between log lines.
+
+    Returns:
+        callable: The callback.
+    """
+    def report(state):
+        if state['batches'] % every == 0 or state['last_id'] == state['max_id']:
+            logging.info(f"{state['rows']} rows in {state['batches']} batches, "
+                         f"{state['fraction']:.0%} of ids, {state['rows_per_sec']} rows/s")
+    return report
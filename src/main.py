@@ -1,47 +1,30 @@
+import asyncio
 import os
 import random
-import json
 import logging
-import string
 import time
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
-import mariadb
-from influxdb_client import InfluxDBClient, Point # type: ignore
-from influxdb_client.client.write_api import SYNCHRONOUS
-import matplotlib.pyplot as plt
-
-def get_mariadb_connection():
-    try:
-        connection = mariadb.connect(
-            host=os.environ['MARIADB_HOST'],
-            user=os.environ['MARIADB_USER'],
-            password=os.environ['MARIADB_PASSWORD'],
-            database=os.environ['MARIADB_DATABASE'],
-            max_allowed_packet=1024 * 1024 * 256  # 64M
-        )
-    except mariadb.Error as e:
-        print(f"Error: {e}")
-        return False
-
-    return connection
-
-def get_influxdb_client():
-    try:
-        client = InfluxDBClient(
-            url='http://influxdb:8086',
-            token=os.environ['INFLUXDB_TOKEN'],
-            org=os.environ['INFLUXDB_ORG'],
-            username=os.environ['INFLUXDB_USER'],
-            password=os.environ['INFLUXDB_PASSWORD'],
-            ssl=True,
-            verify_ssl=True,
-        )
-    except Exception as e:
-        print(f"Error: {e}")
-        return False
-
-    return client
+from .db_pool import get_pool
+from .dataset_cache import get_dataset_cache
+from .dimensions import get_dimension_cache
+from .query_cache import get_query_cache
+from .statements import STATEMENT_MODES, statement_stats
+from .ingest import BufferFullError, buffer_from_env
+from .maria import (
+    aggregate_events_mariadb,
+    insert_event_with_random_timestamp_mariadb,
+    insert_events_mariadb,
+    select_events_by_dimension_mariadb,
+    select_events_page_mariadb,
+)
+from .backends import available_backends
+from .schema_profiles import PROFILES
+from .benchmark import process_data
+from .bench_pagination import benchmark_pagination
+from .bench_templates import SCANS, benchmark_message_storage
+from .rollups import get_rollup_mode, rebuild_rollups, run_compactor
 
 def get_random_timestamp():
     start_timestamp = datetime(2024, 10, 1).timestamp()
@@ -50,422 +33,47 @@ def get_random_timestamp():
 
     return datetime.fromtimestamp(random_timestamp)
 
-def insert_event_with_random_timestamp_mariadb(timestamp):
-    conn = get_mariadb_connection()
-    if not conn:
-        return False
-
-    cursor = conn.cursor()
-    cursor.execute('INSERT INTO dummy (timestamp) VALUES (%s)', (timestamp,))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-    return True
-
-def get_db_connection():
-    """
-    Establishes a connection to the MariaDB database.
-
-    Returns:
-        conn: The database connection object.
-        cursor: The database cursor object.
-    """
-    db_config = {
-        'host': os.environ.get('MARIADB_HOST', 'localhost'),
-        'port': int(os.environ.get('MARIADB_PORT', 3306)),
-        'user': os.environ.get('MARIADB_USER', 'root'),
-        'password': os.environ.get('MARIADB_PASSWORD', ''),
-        'database': os.environ.get('MARIADB_DATABASE', 'test_db')
-    }
+app = FastAPI()
 
-    conn = mariadb.connect(**db_config)
-    cursor = conn.cursor()
-    return conn, cursor
+class EventIn(BaseModel):
+    timestamp: datetime | None = None
+    message: str = Field(max_length=255)
+    severity_ID: int
+    event_type_ID: int
+    source_ID: int
+
+    def to_event(self):
+        timestamp = self.timestamp or datetime.now()
+        return {
+            'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            'message': self.message,
+            'severity_ID': self.severity_ID,
+            'event_type_ID': self.event_type_ID,
+            'source_ID': self.source_ID,
+        }
 
-def execute_query(query, params=None):
-    """
-    Executes a given query on the MariaDB database.
+ingest_buffer = buffer_from_env(insert_events_mariadb)
 
-    Args:
-        query (str): The SQL query to execute.
-        params (tuple): The parameters to pass to the query.
+compactor_task = None
 
-    Returns:
-        bool: True if the operation was successful, False otherwise.
-    """
-    try:
-        conn, cursor = get_db_connection()
-        cursor.execute(query, params)
-        conn.commit()
-        cursor.close()
-        conn.close()
-        return True
-    except mariadb.Error as e:
-        print(f"Error executing query: {e}")
-        return False
-
-def fetch_query_results(query, params=None):
-    """
-    Fetches results from a given query on the MariaDB database.
-
-    Args:
-        query (str): The SQL query to execute.
-        params (tuple): The parameters to pass to the query.
-
-    Returns:
-        list: A list of dictionaries containing the query results.
-    """
-    try:
-        conn, cursor = get_db_connection()
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return results
-    except mariadb.Error as e:
-        print(f"Error fetching query results: {e}")
-        return []
-
-def clear_events_table():
-    """
-    Clears all rows from the Event table in the MariaDB database.
-
-    Returns:
-        bool: True if the operation was successful, False otherwise.
-    """
-    clear_query = "DELETE FROM Event"
-    return execute_query(clear_query)
-
-def insert_events_mariadb(events_data):
-    """
-    Inserts multiple events into the MariaDB database in chunks of 200,000 rows.
-
-    Args:
-        events_data (list): A list of dictionaries, each containing the following keys:
-            - timestamp (datetime): The event timestamp.
-            - message (str): A message describing the event (up to 255 characters).
-            - severity_ID (int): The severity level ID.
-            - event_type_ID (int): The event type ID.
-            - source_ID (int): The source ID.
-
-    Returns:
-        bool: True if the operation was successful, False otherwise.
-    """
-    insert_query = """
-    INSERT INTO Event (timestamp, message, severity_ID, event_type_ID, source_ID)
-    VALUES (%s, %s, %s, %s, %s)
-    """
-
-    chunk_size = 200000
-    try:
-        conn, cursor = get_db_connection()
-        for i in range(0, len(events_data), chunk_size):
-            chunk = events_data[i:i + chunk_size]
-            values = [
-                (
-                    event_data['timestamp'],
-                    event_data['message'],
-                    event_data['severity_ID'],
-                    event_data['event_type_ID'],
-                    event_data['source_ID']
-                )
-                for event_data in chunk
-            ]
-            cursor.executemany(insert_query, values)
-            conn.commit()
-            print(f"Inserted {len(values)} rows into the Event table.")
-        cursor.close()
-        conn.close()
-        return True
-    except (mariadb.Error, ValueError) as e:
-        print(f"Error inserting events into MariaDB: {e}")
-        return False
-
-
-def delete_events_mariadb(num_entries):
-    """
-    Deletes entries from the Event table in the MariaDB database.
-
-    Args:
-        num_entries (int): The number of entries to delete, starting from primary key 1.
-
-    Returns:
-        bool: True if the operation was successful, False otherwise.
-    """
-    delete_query = """
-    DELETE FROM Event
-    WHERE id BETWEEN 1 AND %s
-    """
-    return execute_query(delete_query, (num_entries,))
-
-def select_all_events_mariadb():
-    """
-    Selects events from the MariaDB database based on specified criteria.
-
-    Returns:
-        list: A list of dictionaries, each containing the selected event data.
-    """
-    select_query_severity = """
-    SELECT * FROM Event
-    """
-    results = fetch_query_results(select_query_severity)
-    events_data = [
-        {
-            'timestamp': event[0],
-            'message': event[1],
-            'severity_ID': event[2],
-            'event_type_ID': event[3],
-            'source_ID': event[4]
-        }
-        for event in results
-    ]
-    return events_data
-
-def select_simple_events_mariadb():
-    """
-    Selects events from the MariaDB database based on specified criteria.
-
-    Returns:
-        list: A list of dictionaries, each containing the selected event data.
-    """
-    select_query_severity = """
-    SELECT * FROM Event
-    WHERE severity_ID = 2
-    """
-    results = fetch_query_results(select_query_severity)
-    events_data = [
-        {
-            'timestamp': event[0],
-            'message': event[1],
-            'severity_ID': event[2],
-            'event_type_ID': event[3],
-            'source_ID': event[4]
-        }
-        for event in results
-    ]
-    return events_data
-
-def select_join_events_mariadb():
-    """
-    Selects events from the MariaDB database based on specified criteria.
-
-    Returns:
-        list: A list of dictionaries, each containing the selected event data.
-    """
-    select_query_country = """
-    SELECT e.* FROM Event e
-    JOIN Source s ON e.source_ID = s.id
-    JOIN Location l ON s.location_id = l.id
-    WHERE l.country = 'USA'
-    """
-    results = fetch_query_results(select_query_country)
-    events_data = [
-        {
-            'timestamp': event[0],
-            'message': event[1],
-            'severity_ID': event[2],
-            'event_type_ID': event[3],
-            'source_ID': event[4]
-        }
-        for event in results
-    ]
-    return events_data
+# Heavy or optional dependencies (influxdb_client, duckdb, matplotlib) are not
+# imported here: backends load on first use, see backends.create_backend(), so
+# worker start stays fast; python -m src.bench_startup tracks it.
 
+@app.on_event("startup")
+async def configure_logging():
+    logging.basicConfig(level=logging.INFO)
 
-import logging
-import time
-
-def update_simple_events_mariadb(retries=3, delay=5):
-    """
-    Updates events in the MariaDB database based on specified criteria.
-
-    Args:
-        retries (int): Number of times to retry the update in case of lock wait timeout.
-        delay (int): Delay in seconds between retries.
-
-    Returns:
-        bool: True if the update was successful, False otherwise.
-    """
-    update_query_severity = """
-    UPDATE Event 
-    SET severity_ID = 3 
-    WHERE severity_ID = 2
-    """
-    for attempt in range(retries):
-        try:
-            # Execute the update query without fetching results
-            execute_query(update_query_severity)
-            return True
-        except Exception as e:
-            if "Lock wait timeout exceeded" in str(e):
-                logging.warning(f"Lock wait timeout exceeded. Retrying in {delay} seconds... (Attempt {attempt + 1}/{retries})")
-                time.sleep(delay)
-            else:
-                logging.error(f"Error executing query: {e}")
-                return False
-    logging.error("Failed to update events after multiple attempts.")
-    return False
-
-
-SAMPLE_DATA = {
-    "severities": [
-        {"name": "INFO", "description": "Informational message"},
-        {"name": "WARNING", "description": "Warning condition"},
-        {"name": "ERROR", "description": "Error condition"},
-        {"name": "CRITICAL", "description": "Critical condition"}
-    ],
-    "event_types": [
-        {"name": "SYSTEM_STATUS", "description": "System status update"},
-        {"name": "SECURITY_ALERT", "description": "Security-related event"},
-        {"name": "PERFORMANCE", "description": "Performance metric event"},
-        {"name": "USER_ACTION", "description": "User-initiated action"},
-    ],
-    "sources": [
-        {
-            "name": "web-server-01",
-            "ip_address": "192.168.1.100",
-            "location": {"name": "PL-01", "country": "Poland", "city": "Katowice"}
-        },
-        {
-            "name": "web-server-02",
-            "ip_address": "192.168.1.200",
-            "location": {"name": "PL-02", "country": "Poland", "city": "Gdansk"}
-        },
-        {
-            "name": "cache-01",
-            "ip_address": "192.168.2.100",
-            "location": {"name": "US-01", "country": "USA", "city": "New York"}
-        },
-        {
-            "name": "lb-01",
-            "ip_address": "192.168.3.100",
-            "location": {"name": "DE-01", "country": "Germany", "city": "Frankfurt"}
-        }
-    ],
-    "messages": {
-        "SYSTEM_STATUS": [
-            "System startup completed",
-            "System shutdown initiated",
-            "Service restart required",
-            "Memory usage at {}%",
-            "CPU utilization peaked at {}%"
-        ],
-        "SECURITY_ALERT": [
-            "Failed login attempt from IP {}",
-            "Suspicious activity detected",
-            "Firewall rule updated",
-            "New security patch applied",
-            "User account locked after {} attempts"
-        ],
-        "PERFORMANCE": [
-            "Response time exceeded {}ms",
-            "Database query took {}ms",
-            "Network latency increased to {}ms",
-            "Queue size reached {}"
-        ],
-        "USER_ACTION": [
-            "User {} logged in successfully",
-            "Password change attempted",
-            "Configuration updated by admin",
-            "New user account created"
-        ],
-    }
-}
-
-def generate_data(events_to_generate):
-    data = []
-    for _ in range(events_to_generate):
-        # Generate random timestamp with time variation (±12 hours)
-        reference_time = datetime.now()
-        time_variation = timedelta(hours=random.uniform(-12, 12))
-        timestamp = (reference_time + time_variation).strftime("%Y-%m-%d %H:%M:%S")
-
-        severity = random.choice(SAMPLE_DATA["severities"])
-        event_type = random.choice(SAMPLE_DATA["event_types"])
-        source = random.choice(SAMPLE_DATA["sources"])
-        message_template = random.choice(SAMPLE_DATA["messages"][event_type["name"]])
-        message = message_template.format(
-            *[random.randint(1, 100) for _ in range(message_template.count("{}"))]
-        )
-
-        entry = {
-            "timestamp": timestamp,
-            "message": message,
-            "severity_ID": SAMPLE_DATA["severities"].index(severity) + 1,
-            "event_type_ID": SAMPLE_DATA["event_types"].index(event_type) + 1,
-            "source_ID": SAMPLE_DATA["sources"].index(source) + 1
-        }
-        data.append(entry)
-    return data
-
-def process_data(operation, query_function=None):
-    data = generate_data(1000000)
-    
-    time_durations = []
-    
-    # Define spans for insert and other operations
-    insert_spans = [1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 200000]
-    other_spans = [1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000]
-    
-    if operation == "insert":
-        for span in insert_spans:
-            temp_data = data[:span]
-            timestamp_start = datetime.now()
-            insert_result = insert_events_mariadb(temp_data)
-            if not insert_result:
-                return json.dumps({'message': 'Error saving data in MariaDb!'})
-            timestamp_end = datetime.now()
-            duration = timestamp_end - timestamp_start
-            time_durations.append({'span': span, 'duration': str(duration)})
-    else:
-        for span in other_spans:
-            temp_data = data[:span]
-            if operation == "delete":
-                insert_result = insert_events_mariadb(temp_data)
-                if not insert_result:
-                    return json.dumps({'message': 'Error saving data in MariaDb!'})
-                timestamp_start = datetime.now()
-                operation_result = delete_events_mariadb(span)
-                if not operation_result:
-                    return json.dumps({'message': 'Error deleting data in MariaDb!'})
-                timestamp_end = datetime.now()
-            elif operation == "update":
-                result = insert_events_mariadb(temp_data)
-                if not result:
-                    return json.dumps({'message': 'Error saving data in MariaDb!'})
-                timestamp_start = datetime.now()
-                result_2 = update_simple_events_mariadb()
-                if not result_2:
-                    return json.dumps({'message': 'Error updating data in MariaDb!'})
-                timestamp_end = datetime.now()
-            elif operation == "query":
-                # Clear the table before inserting data
-                clear_result = clear_events_table()
-                if not clear_result:
-                    return json.dumps({'message': 'Error clearing Event table in MariaDb!'})
-                print(f"Table cleared for span {span}")
-                insert_result = insert_events_mariadb(temp_data)
-                if not insert_result:
-                    return json.dumps({'message': 'Error saving data in MariaDb!'})
-                print(f"Data inserted for span {span}")
-                timestamp_start = datetime.now()
-                operation_result = query_function()
-                if operation_result is None:
-                    return json.dumps({'message': 'Error querying data in MariaDb!'})
-                elif not operation_result:
-                    print(f"No matching records found for span {span}")
-                timestamp_end = datetime.now()
-                print(f"Data queried for span {span}")
-            
-            duration = timestamp_end - timestamp_start
-            time_durations.append({'span': span, 'duration': str(duration)})
-    
-    return json.dumps(time_durations)
-
-logging.basicConfig(level=logging.INFO)
+@app.on_event("startup")
+async def start_ingest_buffer():
+    await ingest_buffer.start()
 
-app = FastAPI()
+@app.on_event("startup")
+async def start_rollup_compactor():
+    global compactor_task
+    if get_rollup_mode() == "compactor":
+        interval = float(os.environ.get('ROLLUP_COMPACT_INTERVAL_S', 5))
+        compactor_task = asyncio.create_task(run_compactor(interval))
 
 #@app.on_event("startup")
 #def startup_event():
@@ -477,38 +85,230 @@ app = FastAPI()
 
 # Update the FastAPI endpoint
 @app.get('/')
-def read_root():
+def read_root(statements: str | None = None):
+    if statements is not None and statements not in STATEMENT_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown statement mode: {statements}")
     timestamp = get_random_timestamp()
-    result_mariadb = insert_event_with_random_timestamp_mariadb(timestamp)
+    result_mariadb = insert_event_with_random_timestamp_mariadb(timestamp, statements)
     if not result_mariadb:
         return {'message': 'Something went wrong with MariaDB!'}
 
+    from .influx import insert_event_with_random_timestamp_influxdb
     result_influxdb = insert_event_with_random_timestamp_influxdb(timestamp)
     if not result_influxdb:
         return {'message': 'Something went wrong with InfluxDB!'}
 
     return {'message': 'All good!'}
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if compactor_task is not None:
+        compactor_task.cancel()
+    await ingest_buffer.stop()
+    get_pool().close()
+
+@app.post("/events", status_code=202)
+async def ingest_events(events: EventIn | list[EventIn]):
+    batch = [event.to_event() for event in (events if isinstance(events, list) else [events])]
+    try:
+        await ingest_buffer.put_many(batch)
+    except BufferFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': '1'})
+    return {'accepted': len(batch)}
+
+@app.get("/ingest_stats")
+def ingest_stats():
+    return ingest_buffer.stats()
+
+@app.get("/pool_stats")
+def pool_stats():
+    return get_pool().stats()
+
+@app.get("/dataset_cache_stats")
+def dataset_cache_stats():
+    return get_dataset_cache().stats()
+
+@app.get("/statement_stats")
+def statement_stats_endpoint():
+    return statement_stats()
+
+@app.get("/query_cache_stats")
+def query_cache_stats():
+    return get_query_cache().stats()
+
+@app.get("/dimension_cache_stats")
+def dimension_cache_stats():
+    return get_dimension_cache().stats()
+
+@app.get("/events")
+def events_page(start: str | None = None, end: str | None = None, severity: int | None = None,
+                event_type: int | None = None, source: int | None = None, country: str | None = None,
+                order: str = "desc", limit: int = 500, cursor: str | None = None):
+    started = time.perf_counter()
+    try:
+        page = select_events_page_mariadb(start, end, severity, event_type, source, country, order, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return page
+
+@app.get("/pagination_query")
+def pagination_query(modes: str = "keyset,offset", page_size: int = 500, depths: str = "1,10,100,1000",
+                     source: int | None = None, country: str | None = None):
+    try:
+        return benchmark_pagination(modes.split(','), page_size, [int(depth) for depth in depths.split(',')],
+                                    source=source, country=country)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/message_storage_query")
+def message_storage_query(profiles: str = "baseline,templated", scans: str = ",".join(SCANS),
+                          repetitions: int = 5):
+    try:
+        return benchmark_message_storage(profiles.split(','), repetitions=repetitions, scans=scans.split(','))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/events/by_dimension")
+def events_by_dimension(country: str | None = None, city: str | None = None, severity: str | None = None,
+                        enrich: bool = True):
+    started = time.perf_counter()
+    events = select_events_by_dimension_mariadb(country, city, severity, enrich)
+    return {
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+        'count': len(events),
+        'events': events,
+    }
+
+@app.get("/schema_profiles")
+def schema_profiles():
+    return {name: profile["description"] for name, profile in PROFILES.items()}
+
+@app.get("/aggregates/{dimension}")
+def aggregates(dimension: str, source: str = "rollup", granularity: str = "hour", start: str | None = None,
+               end: str | None = None):
+    started = time.perf_counter()
+    try:
+        rows = aggregate_events_mariadb(dimension, source, granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        'dimension': dimension,
+        'source': source,
+        'granularity': granularity,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+        'rows': rows,
+    }
+
+@app.get("/rollups/rebuild")
+def rollups_rebuild():
+    started = time.perf_counter()
+    try:
+        rebuild_rollups()
+    except Exception as e:
+        logging.error(f"Error rebuilding rollups: {e}")
+        return {'message': 'Something went wrong with the rollup rebuild!'}
+    return {'duration_ms': round((time.perf_counter() - started) * 1000, 3)}
+
+@app.get("/backends")
+def backends():
+    return available_backends()
+
+@app.get("/create")
+def create(backend: str = "mariadb", engine: str = "executemany", workers: int = 1, commit_every: int = 1,
+           profile: str | None = None, statements: str | None = None, trace: bool = False):
+    return process_data("insert", backend=backend, engine=engine, workers=workers, commit_every=commit_every,
+                        profile=profile, statements=statements, trace_phases=trace)
+
+@app.get("/delete")
+def delete(backend: str = "mariadb", profile: str | None = None, retention: str = "batched",
+           retention_batch_size: int = 10000, retention_throttle_ms: int = 0, trace: bool = False):
+    return process_data("delete", backend=backend, profile=profile, retention=retention,
+                        retention_batch_size=retention_batch_size, retention_throttle_ms=retention_throttle_ms,
+                        trace_phases=trace)
+
+@app.get("/purge")
+def purge(backend: str = "mariadb", profile: str | None = None, retention: str = "batched",
+          retention_batch_size: int = 10000, retention_throttle_ms: int = 0, trace: bool = False):
+    return process_data("purge", backend=backend, profile=profile, retention=retention,
+                        retention_batch_size=retention_batch_size, retention_throttle_ms=retention_throttle_ms,
+                        trace_phases=trace)
+
+@app.get("/simple_query")
+def simple_query(backend: str = "mariadb", result_mode: str | None = None, row_format: str = "tuple",
+                 profile: str | None = None, statements: str | None = None, trace: bool = False):
+    return process_data("query", "simple", backend=backend, result_mode=result_mode, row_format=row_format,
+                        profile=profile, statements=statements, trace_phases=trace)
+
+@app.get("/aggregate_query")
+def aggregate_query(dimension: str = "severity", source: str = "rollup", backend: str = "mariadb",
+                    profile: str | None = None, trace: bool = False):
+    return process_data("aggregate", dimension, backend=backend, aggregate_source=source, profile=profile,
+                        trace_phases=trace)
+
+@app.get("/update")
+def update(backend: str = "mariadb", profile: str | None = None, update_batch_size: int = 10000,
+           trace: bool = False):
+    return process_data("update", backend=backend, profile=profile, update_batch_size=update_batch_size,
+                        trace_phases=trace)
+
+@app.get("/join_query")
+def join_query(backend: str = "mariadb", result_mode: str | None = None, row_format: str = "tuple",
+                 profile: str | None = None, join_path: str = "join", statements: str | None = None,
+                 trace: bool = False):
+    return process_data("query", "join", backend=backend, result_mode=result_mode, row_format=row_format,
+                        profile=profile, join_path=join_path, statements=statements, trace_phases=trace)
+
+@app.get("/all_query")
+def all_query(backend: str = "mariadb", result_mode: str | None = None, row_format: str = "tuple",
+                 profile: str | None = None, statements: str | None = None, trace: bool = False):
+    return process_data("query", "all", backend=backend, result_mode=result_mode, row_format=row_format,
+                        profile=profile, statements=statements, trace_phases=trace)
+
 @app.get("/maria_create")
-def maria_create():
-    return process_data("insert")
+def maria_create(engine: str = "executemany", workers: int = 1, commit_every: int = 1):
+    return create("mariadb", engine, workers, commit_every)
 
 @app.get("/maria_delete")
 def maria_delete():
-    return process_data("delete")
+    return delete("mariadb")
 
 @app.get("/maria_simple_query")
 def maria_simple_query():
-    return process_data("query", select_simple_events_mariadb)
+    return simple_query("mariadb")
 
 @app.get("/maria_update")
 def maria_update():
-    return process_data("update")
+    return update("mariadb")
 
 @app.get("/maria_join_query")
 def maria_join_query():
-    return process_data("query", select_join_events_mariadb)
+    return join_query("mariadb")
 
 @app.get("/maria_all_query")
 def maria_all_query():
-    return process_data("query", select_all_events_mariadb)
+    return all_query("mariadb")
+
+@app.get("/influx_create")
+def influx_create():
+    return create("influxdb")
+
+@app.get("/influx_delete")
+def influx_delete():
+    return delete("influxdb")
+
+@app.get("/influx_simple_query")
+def influx_simple_query():
+    return simple_query("influxdb")
+
+@app.get("/influx_update")
+def influx_update():
+    return update("influxdb")
+
+@app.get("/influx_join_query")
+def influx_join_query():
+    return join_query("influxdb")
+
+@app.get("/influx_all_query")
+def influx_all_query():
+    return all_query("influxdb")
@@ -0,0 +1,622 @@
+import logging
+import time
+import mariadb
+from .db_pool import PoolTimeoutError, pooled_connection
+from .dimensions import get_dimension_cache
+from .event_batch import EventBatch
+from .query_cache import get_query_cache, invalidates, tables_in
+from .statements import statement_cursor
+from .bulk_load import load_data_infile
+from .insert_pipeline import insert_events_pipeline
+from .pagination import DEFAULT_PAGE_SIZE, PAGE_COLUMNS, decode_cursor, encode_cursor, page_query
+from .message_templates import (
+    ENCODED_SELECT_COLUMNS,
+    decode_rows,
+    event_records,
+    get_message_storage,
+    with_template_columns,
+)
+from .keyed_batches import DEFAULT_KEYED_BATCH_SIZE, execute_in_batches, is_lock_wait, log_progress
+from .result_stream import DEFAULT_BATCH_SIZE, iter_cursor, stream_rows
+from .tracing import phase
+from .schema_profiles import profile_generates_ids
+from .rollups import aggregate_query, clear_rollups, get_rollup_mode, upsert_rollups
+from .retention import (
+    RETENTION_BATCH_SIZE,
+    RETENTION_STRATEGIES,
+    clear_events,
+    delete_first,
+    purge_events_before,
+)
+
+DUMMY_INSERT_QUERY = "INSERT INTO dummy (timestamp) VALUES (%s)"
+
+def insert_event_with_random_timestamp_mariadb(timestamp, statement_mode=None):
+    try:
+        with pooled_connection() as conn:
+            with statement_cursor(conn, DUMMY_INSERT_QUERY, statement_mode) as cursor:
+                cursor.execute(DUMMY_INSERT_QUERY, (timestamp,))
+            conn.commit()
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error: {e}")
+        return False
+
+    return True
+
+def execute_query(query, params=None):
+    """
+    Executes a given query on the MariaDB database.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple): The parameters to pass to the query.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    try:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            with phase("execute"):
+                cursor.execute(query, params)
+            with phase("commit"):
+                conn.commit()
+            cursor.close()
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error executing query: {e}")
+        return False
+    get_query_cache().invalidate(*tables_in(query))
+    return True
+
+def fetch_query_results(query, params=None):
+    """
+    Fetches results from a given query on the MariaDB database.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple): The parameters to pass to the query.
+
+    Returns:
+        list: A list of dictionaries containing the query results.
+    """
+    try:
+        return _fetch_all(query, params)
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error fetching query results: {e}")
+        return []
+
+def _fetch_all(query, params=None, statement_mode="text"):
+    with pooled_connection() as conn:
+        with statement_cursor(conn, query, statement_mode) as cursor:
+            with phase("execute"):
+                cursor.execute(query, params)
+            with phase("fetch"):
+                results = cursor.fetchall()
+    return results
+
+def cached_query_results(query, params=None, statement_mode=None):
+    """
+    Fetches results like fetch_query_results(), served from the query cache when enabled.
+
+    Failed queries return an empty list and are not cached.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple): The parameters to pass to the query.
+        statement_mode (str): One of STATEMENT_MODES. Defaults to SQL_STATEMENT_MODE.
+
+    Returns:
+        list: The result rows as tuples. Shared with the cache; do not modify.
+    """
+    try:
+        return get_query_cache().fetch(query, params, lambda: _fetch_all(query, params, statement_mode))
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error fetching query results: {e}")
+        return []
+
+# InnoDB status counters that show row lock contention.
+LOCK_STATUS_VARIABLES = ("Innodb_row_lock_waits", "Innodb_row_lock_time", "Innodb_deadlocks")
+
+def lock_status_mariadb():
+    """
+    Reads the server-wide InnoDB row lock counters.
+
+    Returns:
+        dict: Counter name -> value; empty if the status could not be read.
+    """
+    placeholders = ", ".join("%s" for _ in LOCK_STATUS_VARIABLES)
+    results = fetch_query_results(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})",
+                                  LOCK_STATUS_VARIABLES)
+    return {name: int(value) for name, value in results}
+
+def _keyless_strategy(strategy):
+    """
+    Returns the retention strategy to use under the active schema profile.
+
+    The batched strategies walk primary-key ranges, which a profile without
+    generated ids does not have, so those profiles delete with one statement.
+    """
+    if profile_generates_ids() or strategy not in RETENTION_STRATEGIES:
+        return strategy
+    return "single"
+
+def _run_retention(action, report, *args, **kwargs):
+    try:
+        result = action(*args, **kwargs)
+    except (mariadb.Error, ValueError, PoolTimeoutError) as e:
+        print(f"Error deleting events from MariaDB: {e}")
+        return False
+    if report is not None:
+        report.update(result)
+    return True
+
+@invalidates("Event")
+def clear_events_table(strategy="batched", batch_size=RETENTION_BATCH_SIZE, throttle=0.0, report=None):
+    """
+    Clears all rows from the Event table in the MariaDB database.
+
+    Args:
+        strategy (str): One of RETENTION_STRATEGIES. "single" runs one DELETE FROM Event,
+            as do all strategies under a profile without generated ids.
+        batch_size (int): Ids per DELETE for the batched strategies.
+        throttle (float): Seconds to sleep between batches.
+        report (dict): If given, filled with rows deleted, batches and seconds.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    return _run_retention(clear_events, report, _keyless_strategy(strategy), batch_size=batch_size,
+                          throttle=throttle)
+
+# Bulk insert engines accepted by insert_events_mariadb().
+INSERT_ENGINES = ("executemany", "load_data")
+
+@invalidates("Event")
+def insert_events_mariadb(events_data, engine="executemany", workers=1, chunk_size=None, commit_every=1,
+                          report=None, rollups=None, statement_mode=None):
+    """
+    Inserts multiple events into the MariaDB database.
+
+    The "executemany" engine sends chunks through cursor.executemany, sized
+    adaptively unless chunk_size is given and optionally spread over several
+    connections. The "load_data" engine streams the rows as TSV into
+    LOAD DATA LOCAL INFILE without materializing them all first.
+
+    Args:
+        events_data (list | dict): A list of dictionaries, each containing the following keys:
+            - timestamp (datetime): The event timestamp.
+            - message (str): A message describing the event (up to 255 characters).
+            - severity_ID (int): The severity level ID.
+            - event_type_ID (int): The event type ID.
+            - source_ID (int): The source ID.
+            Alternatively a column dict as produced by generate_columns(), or an EventBatch.
+        engine (str): One of INSERT_ENGINES.
+        workers (int): Writer connections used by the "executemany" engine.
+        chunk_size (int): Fixed rows per chunk. None tunes it from measured throughput.
+        commit_every (int): Commit after this many chunks per worker; 0 commits once at the
+            end and requires workers=1.
+        report (dict): If given, filled with the rows written, throughput and, for the
+            "executemany" engine, per-chunk timings.
+        rollups (bool): Maintain the rollup tables in the insert transactions.
+            Defaults to True when ROLLUP_MODE is "pipeline".
+        statement_mode (str): How the "executemany" engine sends its INSERT, one of
+            STATEMENT_MODES. Defaults to SQL_STATEMENT_MODE.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    try:
+        if engine not in INSERT_ENGINES:
+            raise ValueError(f"Unknown insert engine: {engine}")
+        if rollups is None:
+            rollups = get_rollup_mode() == "pipeline"
+        if engine == "load_data":
+            started = time.perf_counter()
+            with pooled_connection() as conn:
+                rows = load_data_infile(conn, events_data)
+                if rollups:
+                    cursor = conn.cursor()
+                    upsert_rollups(cursor, events_data)
+                    cursor.close()
+                with phase("commit"):
+                    conn.commit()
+            elapsed = time.perf_counter() - started
+            print(f"Loaded {rows} rows into the Event table.")
+            if report is not None:
+                report.update({
+                    'rows': rows,
+                    'seconds': round(elapsed, 6),
+                    'rows_per_sec': round(rows / elapsed, 1) if elapsed > 0 else None,
+                })
+            return True
+
+        result = insert_events_pipeline(events_data, workers=workers, chunk_size=chunk_size,
+                                        commit_every=commit_every, rollups=rollups,
+                                        statement_mode=statement_mode)
+        if report is not None:
+            report.update(result)
+        return True
+    except (mariadb.Error, ValueError, OSError, PoolTimeoutError) as e:
+        print(f"Error inserting events into MariaDB: {e}")
+        return False
+
+
+@invalidates("Event")
+def delete_events_mariadb(num_entries, strategy="batched", batch_size=RETENTION_BATCH_SIZE, throttle=0.0,
+                          report=None):
+    """
+    Deletes entries from the Event table in the MariaDB database.
+
+    Ids are not tied to partitions, so the "partition" strategy deletes in
+    batches like "batched".
+
+    Args:
+        num_entries (int): The number of entries to delete, starting from the lowest primary key.
+        strategy (str): One of RETENTION_STRATEGIES. "single" runs one DELETE for the whole range.
+        batch_size (int): Ids per DELETE for the batched strategies.
+        throttle (float): Seconds to sleep between batches.
+        report (dict): If given, filled with rows deleted, batches and seconds.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    if strategy not in RETENTION_STRATEGIES:
+        print(f"Unknown retention strategy: {strategy}")
+        return False
+    return _run_retention(delete_first, report, num_entries, strategy, batch_size=batch_size, throttle=throttle)
+
+@invalidates("Event")
+def purge_events_mariadb(cutoff, strategy="batched", batch_size=RETENTION_BATCH_SIZE, throttle=0.0, report=None):
+    """
+    Deletes the events older than cutoff from the Event table.
+
+    Args:
+        cutoff (datetime): Events with an earlier timestamp are deleted.
+        strategy (str): One of RETENTION_STRATEGIES. "partition" empties whole
+            partitions when a partitioned schema profile is in use. Profiles
+            without generated ids always use "single".
+        batch_size (int): Ids per DELETE for the batched strategies.
+        throttle (float): Seconds to sleep between batches.
+        report (dict): If given, filled with rows deleted, batches and seconds.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    return _run_retention(purge_events_before, report, cutoff, _keyless_strategy(strategy), batch_size=batch_size,
+                          throttle=throttle)
+
+EVENT_COLUMNS = "timestamp, message, severity_ID, event_type_ID, source_ID"
+
+# Event queries by shape; every shape returns the columns of EVENT_COLUMNS,
+# followed by ENCODED_SELECT_COLUMNS in template message storage.
+SELECT_QUERIES = {
+    "all": f"""
+    SELECT {EVENT_COLUMNS} FROM Event
+    """,
+    "simple": f"""
+    SELECT {EVENT_COLUMNS} FROM Event
+    WHERE severity_ID = 2
+    """,
+    "join": """
+    SELECT e.timestamp, e.message, e.severity_ID, e.event_type_ID, e.source_ID FROM Event e
+    JOIN Source s ON e.source_ID = s.id
+    JOIN Location l ON s.location_id = l.id
+    WHERE l.country = 'USA'
+    """,
+}
+
+def _events_as_dicts(results, message_storage="text"):
+    with phase("materialize", rows=len(results)):
+        if message_storage == "template":
+            return event_records(results)
+        return [
+            {
+                'timestamp': event[0],
+                'message': event[1],
+                'severity_ID': event[2],
+                'event_type_ID': event[3],
+                'source_ID': event[4]
+            }
+            for event in results
+        ]
+
+def _select_events(query, params=None, as_batch=False, statement_mode=None):
+    message_storage = get_message_storage()
+    if message_storage == "template":
+        query = with_template_columns(query)
+    if not as_batch:
+        return _events_as_dicts(cached_query_results(query, params, statement_mode), message_storage)
+    if get_query_cache().enabled:
+        rows = cached_query_results(query, params, statement_mode)
+        with phase("materialize"):
+            return EventBatch.from_rows(decode_rows(rows) if message_storage == "template" else rows)
+    # Converted batch by batch, so the full result never exists as tuples.
+    try:
+        return EventBatch.concat(list(stream_query_results(query, params, row_format="batch",
+                                                           message_storage=message_storage)))
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error fetching query results: {e}")
+        return EventBatch.empty()
+
+def select_all_events_mariadb(as_batch=False, statement_mode=None):
+    """
+    Selects events from the MariaDB database based on specified criteria.
+
+    Args:
+        as_batch (bool): Return an EventBatch instead of dicts.
+        statement_mode (str): One of STATEMENT_MODES. Defaults to SQL_STATEMENT_MODE.
+
+    Returns:
+        list | EventBatch: A list of dictionaries, each containing the selected event data.
+    """
+    return _select_events(SELECT_QUERIES["all"], as_batch=as_batch, statement_mode=statement_mode)
+
+def select_simple_events_mariadb(as_batch=False, statement_mode=None):
+    """
+    Selects events from the MariaDB database based on specified criteria.
+
+    Args:
+        as_batch (bool): Return an EventBatch instead of dicts.
+        statement_mode (str): One of STATEMENT_MODES. Defaults to SQL_STATEMENT_MODE.
+
+    Returns:
+        list | EventBatch: A list of dictionaries, each containing the selected event data.
+    """
+    return _select_events(SELECT_QUERIES["simple"], as_batch=as_batch, statement_mode=statement_mode)
+
+# How the "join" shape filters by country: joining Source and Location in
+# SQL, or rewriting the filter into source ids from the dimension cache.
+JOIN_PATHS = ("join", "cached")
+
+def dimension_query(country=None, city=None, severity=None):
+    """
+    Builds an Event query filtered on dimension columns without joining them.
+
+    Returns:
+        tuple: (query, params) selecting EVENT_COLUMNS.
+
+    Raises:
+        mariadb.Error: If the dimension cache cannot be loaded.
+    """
+    condition, params = get_dimension_cache().event_filter(country=country, city=city, severity=severity)
+    return f"SELECT {EVENT_COLUMNS} FROM Event WHERE {condition}", params
+
+def _shape_query(query, join_path="join"):
+    if join_path not in JOIN_PATHS:
+        raise ValueError(f"Unknown join path: {join_path}")
+    if query == "join" and join_path == "cached":
+        return dimension_query(country="USA")
+    return SELECT_QUERIES[query], None
+
+def select_join_events_mariadb(join_path="join", as_batch=False, statement_mode=None):
+    """
+    Selects events from the MariaDB database based on specified criteria.
+
+    Args:
+        join_path (str): One of JOIN_PATHS.
+        as_batch (bool): Return an EventBatch instead of dicts.
+        statement_mode (str): One of STATEMENT_MODES. Defaults to SQL_STATEMENT_MODE.
+
+    Returns:
+        list | EventBatch: A list of dictionaries, each containing the selected event data.
+    """
+    try:
+        query, params = _shape_query("join", join_path)
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error loading dimension tables: {e}")
+        return EventBatch.empty() if as_batch else []
+    return _select_events(query, params, as_batch, statement_mode)
+
+def select_events_by_dimension_mariadb(country=None, city=None, severity=None, enrich=True):
+    """
+    Selects events by source country/city and severity name through the dimension cache.
+
+    Args:
+        country (str): Location.country of the event's source.
+        city (str): Location.city of the event's source.
+        severity (str): Severity.name, case-insensitive.
+        enrich (bool): Add the dimension names to each event, see DimensionCache.enrich().
+
+    Returns:
+        list: A list of dictionaries, each containing the selected event data.
+    """
+    try:
+        query, params = dimension_query(country, city, severity)
+        events = _select_events(query, params)
+        return get_dimension_cache().enrich(events) if enrich else events
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error loading dimension tables: {e}")
+        return []
+
+def page_source_ids(source=None, country=None):
+    """
+    Combines a source_ID filter and a country filter into source ids for page_query().
+
+    Returns:
+        list: Matching source ids; None if neither filter is set.
+
+    Raises:
+        mariadb.Error: If the dimension cache cannot be loaded.
+    """
+    source_ids = None
+    if country is not None:
+        source_ids = get_dimension_cache().source_ids(country=country)
+    if source is not None:
+        source_ids = [source] if source_ids is None or source in source_ids else []
+    return source_ids
+
+def select_events_page_mariadb(start=None, end=None, severity=None, event_type=None, source=None, country=None,
+                               order="desc", limit=DEFAULT_PAGE_SIZE, cursor=None, offset=None,
+                               statement_mode=None):
+    """
+    Selects one page of filtered events, see pagination.page_query().
+
+    Args:
+        start (str): Inclusive lower time bound.
+        end (str): Exclusive upper time bound.
+        severity (int): severity_ID to match.
+        event_type (int): event_type_ID to match.
+        source (int): source_ID to match.
+        country (str): Country of the event's source, resolved through the dimension cache.
+        order (str): One of PAGE_ORDERS; "desc" is newest first.
+        limit (int): Rows per page.
+        cursor (str): next_cursor of the previous page.
+        offset (int): Rows to skip instead of a cursor, for comparison with keyset pages.
+        statement_mode (str): One of STATEMENT_MODES. Defaults to SQL_STATEMENT_MODE.
+
+    Returns:
+        dict: "events", a list of event dicts including their id, and "next_cursor",
+        None on the last page. In template message storage the events are EventRecords.
+
+    Raises:
+        ValueError: On an invalid cursor, order or page size.
+    """
+    try:
+        source_ids = page_source_ids(source, country)
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error loading dimension tables: {e}")
+        return {'events': [], 'next_cursor': None}
+    after = decode_cursor(cursor) if cursor else None
+    templated = get_message_storage() == "template"
+    columns = f"{PAGE_COLUMNS}, {ENCODED_SELECT_COLUMNS}" if templated else PAGE_COLUMNS
+    query, params = page_query(start, end, severity, event_type, source_ids, order, limit, after, offset, columns)
+
+    rows = cached_query_results(query, params, statement_mode)
+    with phase("materialize", rows=len(rows)):
+        if templated:
+            events = event_records(row[1:] for row in rows)
+            for event, row in zip(events, rows):
+                event['id'] = row[0]
+        else:
+            events = [
+                {
+                    'id': row[0],
+                    'timestamp': row[1],
+                    'message': row[2],
+                    'severity_ID': row[3],
+                    'event_type_ID': row[4],
+                    'source_ID': row[5]
+                }
+                for row in rows
+            ]
+    next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+    return {'events': events, 'next_cursor': next_cursor}
+
+def stream_query_results(query, params=None, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple",
+                         message_storage="text"):
+    """
+    Streams the results of a query through an unbuffered cursor.
+
+    Rows are fetched in batches of batch_size, so memory stays bounded
+    regardless of the result size. The pooled connection is held until the
+    stream is exhausted or closed.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (tuple): The parameters to pass to the query.
+        batch_size (int): Rows per fetchmany() call.
+        row_format (str): One of ROW_FORMATS.
+        message_storage (str): "template" if the query selects ENCODED_SELECT_COLUMNS
+            after the event columns; their messages are rendered batch by batch.
+
+    Yields:
+        tuple | EventRow | dict: See stream_rows().
+
+    Raises:
+        mariadb.Error: If the query fails.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor(buffered=False)
+        try:
+            with phase("execute"):
+                cursor.execute(query, params)
+            if message_storage == "template":
+                yield from stream_rows(lambda: decode_rows(cursor.fetchmany(batch_size)), row_format)
+            else:
+                yield from iter_cursor(cursor, batch_size, row_format)
+        finally:
+            cursor.close()
+
+def stream_events_mariadb(query, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple", join_path="join"):
+    """
+    Streams one of the SELECT_QUERIES shapes. See stream_query_results().
+    """
+    query, params = _shape_query(query, join_path)
+    message_storage = get_message_storage()
+    if message_storage == "template":
+        query = with_template_columns(query)
+    return stream_query_results(query, params, batch_size=batch_size, row_format=row_format,
+                                message_storage=message_storage)
+
+def aggregate_events_mariadb(dimension, source="rollup", granularity="hour", start=None, end=None):
+    """
+    Runs a dashboard aggregate, see rollups.aggregate_query().
+
+    Returns:
+        list: (key, count) tuples, e.g. (severity_ID, events) or (bucket, events).
+
+    Raises:
+        ValueError: On an unknown dimension, source or granularity.
+    """
+    query, params = aggregate_query(dimension, source, granularity, start, end)
+    return [(key, int(count)) for key, count in fetch_query_results(query, params)]
+
+def reset_rollups_mariadb():
+    """
+    Empties the rollup tables, see rollups.clear_rollups().
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    try:
+        clear_rollups()
+        return True
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error clearing rollups: {e}")
+        return False
+
+@invalidates("Event")
+def update_events_mariadb(assignments, condition, params=(), batch_size=DEFAULT_KEYED_BATCH_SIZE, retries=3,
+                          delay=0.5, throttle=0.0, report=None):
+    """
+    Updates events in the MariaDB database in primary-key batches.
+
+    Every batch commits on its own, and a batch that hits a lock wait timeout
+    or deadlock is retried with exponential backoff. Progress is logged as
+    the batches complete.
+
+    Args:
+        assignments (str): SET clause, e.g. "severity_ID = 3".
+        condition (str): WHERE condition selecting the events, with %s placeholders.
+        params (tuple): Parameters for condition.
+        batch_size (int): Ids per UPDATE.
+        retries (int): Retries per batch in case of lock wait timeout or deadlock.
+        delay (float): Delay in seconds before the first retry, doubled for each further one.
+        throttle (float): Seconds to sleep between batches.
+        report (dict): If given, filled with rows, batches, retries, seconds and rows_per_sec.
+
+    Returns:
+        bool: True if the update was successful, False otherwise.
+    """
+    try:
+        result = execute_in_batches(f"UPDATE Event SET {assignments}", condition, params, batch_size=batch_size,
+                                    throttle=throttle, retries=retries, backoff=delay, progress=log_progress())
+    except (mariadb.Error, PoolTimeoutError) as e:
+        if is_lock_wait(e):
+            logging.error("Failed to update events after multiple attempts.")
+        logging.error(f"Error executing query: {e}")
+        return False
+    print(f"Updated {result['rows']} rows in the Event table ({result['rows_per_sec']} rows/s).")
+    if report is not None:
+        report.update(result)
+    return True
+
+def update_simple_events_mariadb(retries=3, delay=0.5, batch_size=DEFAULT_KEYED_BATCH_SIZE, report=None):
+    """
+    Moves events with severity_ID 2 to severity_ID 3, see update_events_mariadb().
+
+    Returns:
+        bool: True if the update was successful, False otherwise.
+    """
+    return update_events_mariadb("severity_ID = 3", "severity_ID = 2", batch_size=batch_size,
+                                 retries=retries, delay=delay, report=report)
@@ -0,0 +1,298 @@
+"""
+Dictionary encoding of Event.message by message template.
+
+Almost every message is one of the SAMPLE_DATA templates with at most one
+integer filled in. Under the "templated" schema profile, Event stores
+template_ID and message_param instead of the text, and MessageTemplate maps
+template ids to templates. Messages matching no template keep their text in
+Event.message.
+
+Inserts encode on the way in; selects return EventRecord rows that render
+the message only when it is read.
+"""
+import threading
+from collections.abc import MutableMapping
+from functools import lru_cache
+import mariadb
+import numpy as np
+from .db_pool import PoolTimeoutError, pooled_connection
+from .event_batch import EVENT_FIELDS, EventBatch
+from .generator import (
+    MESSAGE_PARAM_MAX,
+    MESSAGE_TABLE,
+    SAMPLE_DATA,
+    _TEMPLATE_HAS_PARAM,
+    _TEMPLATE_MESSAGE_OFFSETS,
+    format_timestamps,
+    is_columnar,
+    slice_columns,
+)
+
+MESSAGE_STORAGES = ("text", "template")
+
+# Templates by id - 1, in the generator's order.
+TEMPLATES = tuple(
+    template
+    for event_type in SAMPLE_DATA["event_types"]
+    for template in SAMPLE_DATA["messages"][event_type["name"]]
+)
+
+# Columns of an encoded Event row, in insert order.
+ENCODED_COLUMNS = "timestamp, message, template_ID, message_param, severity_ID, event_type_ID, source_ID"
+
+ENCODED_INSERT_QUERY = f"""
+INSERT INTO Event ({ENCODED_COLUMNS})
+VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+# message_param is a signed INT column.
+MESSAGE_PARAM_LIMIT = 2**31 - 1
+
+# Extra columns selected after the text columns in template storage.
+ENCODED_SELECT_COLUMNS = "template_ID, message_param"
+
+MESSAGE_TEMPLATE_DDL = """
+CREATE TABLE IF NOT EXISTS MessageTemplate (
+    id SMALLINT NOT NULL PRIMARY KEY,
+    template VARCHAR(255) NOT NULL
+)
+"""
+
+TEMPLATE_SEED_QUERY = "INSERT IGNORE INTO MessageTemplate (id, template) VALUES (%s, %s)"
+
+
+def _message_codes():
+    """Returns (template id, param or -1) for every entry of generator.MESSAGE_TABLE."""
+    template_ids = np.zeros(len(MESSAGE_TABLE), dtype=np.int16)
+    params = np.full(len(MESSAGE_TABLE), -1, dtype=np.int32)
+    for index, (offset, has_param) in enumerate(zip(_TEMPLATE_MESSAGE_OFFSETS.tolist(),
+                                                    _TEMPLATE_HAS_PARAM.tolist())):
+        count = MESSAGE_PARAM_MAX if has_param else 1
+        template_ids[offset:offset + count] = index + 1
+        if has_param:
+            params[offset:offset + count] = np.arange(1, MESSAGE_PARAM_MAX + 1)
+    return template_ids, params
+
+
+MESSAGE_TEMPLATE_IDS, MESSAGE_PARAMS = _message_codes()
+
+_PLAIN = {template: index + 1 for index, template in enumerate(TEMPLATES) if "{}" not in template}
+_PARAMETRIZED = [(index + 1,) + tuple(template.split("{}")) for index, template in enumerate(TEMPLATES)
+                 if "{}" in template]
+
+
+@lru_cache(maxsize=8192)
+def encode_message(message):
+    """
+    Encodes a message as (template_ID, message_param).
+
+    Returns:
+        tuple: (template id, int param or None), or (None, None) if no template
+        reproduces the message exactly.
+    """
+    template_id = _PLAIN.get(message)
+    if template_id is not None:
+        return template_id, None
+    for template_id, prefix, suffix in _PARAMETRIZED:
+        if message.startswith(prefix) and message.endswith(suffix) and len(message) > len(prefix) + len(suffix):
+            value = message[len(prefix):len(message) - len(suffix)]
+            if value.isdigit() and str(int(value)) == value and int(value) <= MESSAGE_PARAM_LIMIT:
+                return template_id, int(value)
+    return None, None
+
+
+def render_message(template_id, param):
+    """Renders an encoded message."""
+    template = TEMPLATES[template_id - 1]
+    return template if param is None else template.format(param)
+
+
+def _generated_message_ids(columns):
+    """Returns the MESSAGE_TABLE ids of a column dict or generated EventBatch, else None."""
+    if isinstance(columns, EventBatch):
+        return columns.message_ids()
+    return columns["message_ID"]
+
+
+def _encode_messages(messages):
+    """Returns (messages kept as text, template ids, params) for rendered messages."""
+    kept, template_ids, params = [], [], []
+    for message in messages:
+        template_id, param = encode_message(message)
+        kept.append(None if template_id else message)
+        template_ids.append(template_id)
+        params.append(param)
+    return kept, template_ids, params
+
+
+def encoded_rows(events_data, start=0, stop=None):
+    """
+    Returns events [start, stop) as tuples in ENCODED_COLUMNS order.
+
+    Generated columns are encoded by array lookup; other messages go
+    through encode_message().
+
+    Args:
+        events_data (list | dict | EventBatch): Row dicts, a column dict or an EventBatch.
+        start (int): First row.
+        stop (int): Row after the last one. Defaults to the end.
+
+    Returns:
+        list: (timestamp, message, template_ID, message_param, severity_ID, event_type_ID, source_ID) tuples.
+    """
+    if not is_columnar(events_data):
+        messages, template_ids, params = _encode_messages(event['message'] for event in events_data[start:stop])
+        return [
+            (event['timestamp'], message, template_id, param,
+             event['severity_ID'], event['event_type_ID'], event['source_ID'])
+            for event, message, template_id, param in zip(events_data[start:stop], messages, template_ids, params)
+        ]
+
+    columns = slice_columns(events_data, start, stop)
+    message_ids = _generated_message_ids(columns)
+    if message_ids is not None:
+        template_ids = MESSAGE_TEMPLATE_IDS[message_ids].tolist()
+        params = [param if param >= 0 else None for param in MESSAGE_PARAMS[message_ids].tolist()]
+        messages = [None] * len(template_ids)
+    else:
+        messages, template_ids, params = _encode_messages(columns["message"].tolist())
+    return list(zip(
+        format_timestamps(columns["timestamp"]).tolist(),
+        messages,
+        template_ids,
+        params,
+        columns["severity_ID"].tolist(),
+        columns["event_type_ID"].tolist(),
+        columns["source_ID"].tolist(),
+    ))
+
+
+class EventRecord(MutableMapping):
+    """
+    An event row whose message is rendered from its template on first access.
+
+    Behaves like the event dicts of the text mode, including extra keys
+    such as the names added by DimensionCache.enrich().
+    """
+
+    __slots__ = ("timestamp", "severity_ID", "event_type_ID", "source_ID", "_template", "_param", "_message",
+                 "_extra")
+
+    def __init__(self, timestamp, message, severity_ID, event_type_ID, source_ID, template_id, param):
+        self.timestamp = timestamp
+        self.severity_ID = severity_ID
+        self.event_type_ID = event_type_ID
+        self.source_ID = source_ID
+        self._template = template_id
+        self._param = param
+        self._message = message
+        self._extra = None
+
+    def __getitem__(self, key):
+        if key == "message":
+            if self._message is None and self._template is not None:
+                self._message = render_message(self._template, self._param)
+            return self._message
+        if key in EVENT_FIELDS:
+            return getattr(self, key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key == "message":
+            self._message = value
+            self._template = None
+        elif key in EVENT_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in EVENT_FIELDS or self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from EVENT_FIELDS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(EVENT_FIELDS) + len(self._extra or ())
+
+    def __repr__(self):
+        return f"EventRecord({dict(self)!r})"
+
+
+def with_template_columns(query):
+    """
+    Adds template_ID and message_param to the select list of an Event query.
+
+    The columns are appended before the first FROM, so they follow the
+    EVENT_FIELDS columns of each row. Their names are unique among the
+    joined tables and need no qualifier.
+    """
+    head, separator, tail = query.partition(" FROM ")
+    if not separator:
+        raise ValueError("Query has no FROM clause")
+    return f"{head}, {ENCODED_SELECT_COLUMNS}{separator}{tail}"
+
+
+def event_records(rows):
+    """Wraps (timestamp, message, severity, event type, source, template_ID, message_param) rows."""
+    return [EventRecord(*row) for row in rows]
+
+
+def decode_rows(rows):
+    """Turns encoded select rows into plain (timestamp, message, ...) tuples, rendering every message."""
+    return [
+        (timestamp, message if template_id is None else render_message(template_id, param),
+         severity, event_type, source)
+        for timestamp, message, severity, event_type, source, template_id, param in rows
+    ]
+
+
+def seed_templates(cursor):
+    """Creates MessageTemplate if needed and inserts TEMPLATES, keeping existing rows."""
+    cursor.execute(MESSAGE_TEMPLATE_DDL)
+    cursor.executemany(TEMPLATE_SEED_QUERY, [(index + 1, template) for index, template in enumerate(TEMPLATES)])
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_message_storage():
+    """
+    Returns how the current Event table stores messages, one of MESSAGE_STORAGES.
+
+    Read from the schema once and cached until reset_message_storage();
+    "text" if the schema cannot be read.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                try:
+                    with pooled_connection() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute(
+                            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+                            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Event' AND COLUMN_NAME = 'template_ID'"
+                        )
+                        _storage = "template" if cursor.fetchone()[0] else "text"
+                        cursor.close()
+                except (mariadb.Error, PoolTimeoutError) as e:
+                    print(f"Error reading the Event schema: {e}")
+                    return "text"
+    return _storage
+
+
+def reset_message_storage():
+    """Forgets the cached storage mode, e.g. after the Event table was recreated."""
+    global _storage
+    with _storage_lock:
+        _storage = None
@@ -0,0 +1,130 @@
+"""
+Filtered event pages with keyset (seek) pagination on (timestamp, id).
+
+A page ends with an opaque cursor holding the (timestamp, id) of its last
+row; the next page starts strictly after it. With an index leading with the
+equality filter and followed by (timestamp, id), see init.sql, the server
+reads only the rows of the page however deep the client scrolls, whereas
+OFFSET reads and discards every skipped row.
+"""
+import base64
+from datetime import datetime
+
+PAGE_ORDERS = ("desc", "asc")
+PAGINATION_MODES = ("keyset", "offset")
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 10000
+
+PAGE_COLUMNS = "id, timestamp, message, severity_ID, event_type_ID, source_ID"
+
+_CURSOR_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def encode_cursor(timestamp, event_id):
+    """Encodes the (timestamp, id) of a page's last row as a URL-safe token."""
+    raw = f"{timestamp:{_CURSOR_FORMAT}}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a token from encode_cursor().
+
+    Returns:
+        tuple: (timestamp string, id).
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, event_id = raw.split("|")
+        datetime.strptime(timestamp, _CURSOR_FORMAT)
+        return timestamp, int(event_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+
+
+def _filters(start, end, severity, event_type, source_ids):
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append("timestamp >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("timestamp < %s")
+        params.append(end)
+    if severity is not None:
+        conditions.append("severity_ID = %s")
+        params.append(severity)
+    if event_type is not None:
+        conditions.append("event_type_ID = %s")
+        params.append(event_type)
+    if source_ids is not None:
+        if not source_ids:
+            conditions.append("1=0")
+        elif len(source_ids) == 1:
+            conditions.append("source_ID = %s")
+            params.append(source_ids[0])
+    return conditions, params
+
+
+def page_query(start=None, end=None, severity=None, event_type=None, source_ids=None, order="desc",
+               limit=DEFAULT_PAGE_SIZE, after=None, offset=None, columns=PAGE_COLUMNS):
+    """
+    Builds the query for one page of events.
+
+    Several source ids become one ordered, limited branch per source combined
+    with UNION ALL, so each branch seeks in (source_ID, timestamp, id) instead
+    of the server sorting every matching row.
+
+    Args:
+        start (str): Inclusive lower time bound.
+        end (str): Exclusive upper time bound.
+        severity (int): severity_ID to match.
+        event_type (int): event_type_ID to match.
+        source_ids (list): source_IDs to match; None matches all, [] none.
+        order (str): One of PAGE_ORDERS; "desc" is newest first.
+        limit (int): Rows per page.
+        after (tuple): (timestamp, id) of the previous page's last row, for keyset pages.
+        offset (int): Rows to skip, for OFFSET pages. Exclusive with after.
+        columns (str): Select list; must start with PAGE_COLUMNS.
+
+    Returns:
+        tuple: (query, params) selecting columns.
+
+    Raises:
+        ValueError: On an unknown order, a limit out of range or both after and offset.
+    """
+    if order not in PAGE_ORDERS:
+        raise ValueError(f"Unknown page order: {order}")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}")
+    if after is not None and offset:
+        raise ValueError("A page is addressed by cursor or by offset, not both")
+
+    conditions, params = _filters(start, end, severity, event_type, source_ids)
+    if after is not None:
+        # Expanded form of (timestamp, id) < (%s, %s), which the optimizer
+        # can turn into an index range.
+        comparison = "<" if order == "desc" else ">"
+        conditions.append(f"timestamp {comparison}= %s AND (timestamp {comparison} %s OR id {comparison} %s)")
+        params.extend([after[0], after[0], after[1]])
+    direction = order.upper()
+    order_by = f"ORDER BY timestamp {direction}, id {direction}"
+    skip = f" OFFSET {int(offset)}" if offset else ""
+
+    if source_ids is not None and len(source_ids) > 1:
+        branches = []
+        branch_params = []
+        for source_id in source_ids:
+            where = " AND ".join(conditions + ["source_ID = %s"])
+            # Every branch must return enough rows to fill the skipped ones too.
+            branches.append(f"(SELECT {columns} FROM Event WHERE {where} {order_by} "
+                            f"LIMIT {limit + int(offset or 0)})")
+            branch_params.extend(params + [source_id])
+        query = f"SELECT {columns} FROM ({' UNION ALL '.join(branches)}) page {order_by} LIMIT {limit}{skip}"
+        return query, tuple(branch_params)
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM Event{where} {order_by} LIMIT {limit}{skip}", tuple(params)
@@ -1,43 +1,264 @@
+"""
+Charts of benchmark results.
+
+Reads any mix of result files and renders one report per operation and
+query shape. Each report has a throughput chart (rows/s) and a latency
+percentile chart, both log-scale, with one series per backend, engine and
+profile. Supported inputs:
+
+- bench_runner result documents (python -m src.bench_runner run --output),
+- bench_orchestrator result documents,
+- raw process_data() output lists, summarized here,
+- median files written by get_mariadb_endpoint.py.
+
+Series are labelled with the file they came from, so repeated runs of the
+same settings stay apart. Raw and median files named after the HTTP
+endpoints, e.g. maria_join_query_med.json, share reports with the other
+backends' files for the same operation.
+
+Reports render in parallel worker processes on the headless Agg backend;
+matplotlib is only imported by the workers.
+
+Usage:
+    python -m src.plot insert.json simple.json sweep.json --output-dir reports --jobs 4
+"""
+import argparse
 import json
-import matplotlib.pyplot as plt
-import pandas as pd
+import os
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+PERCENTILE_STYLES = (("p50_ms", "-"), ("p90_ms", ":"), ("p99_ms", "--"))
+
+REPORT_FORMATS = ("png", "svg", "pdf")
+
+# Endpoint names get_mariadb_endpoint.py writes its median files under,
+# "<backend>_<operation>_med.json", mapped to registered backends and to
+# process_data() operations and query shapes.
+LEGACY_BACKENDS = {"maria": "mariadb", "influx": "influxdb"}
+LEGACY_OPERATIONS = {
+    "create": ("insert", None),
+    "delete": ("delete", None),
+    "update": ("update", None),
+    "all_query": ("query", "all"),
+    "simple_query": ("query", "simple"),
+    "join_query": ("query", "join"),
+}
+
+
+def _milliseconds(text):
+    """Parses the "123.45 ms" durations of median files."""
+    return float(text.removesuffix(" ms"))
+
+
+def _label(name, *parts):
+    """Labels a series by its settings and the result file it came from, so runs stay apart."""
+    return f"{' / '.join(str(part) for part in parts if part)} ({name})"
+
+
+def _legacy_endpoint(name):
+    """
+    Parses a get_mariadb_endpoint.py file name such as "maria_join_query_med".
+
+    Returns:
+        tuple: (backend, operation, query), or None for other names.
+    """
+    prefix, _, rest = name.removesuffix("_med").partition("_")
+    if prefix not in LEGACY_BACKENDS or rest not in LEGACY_OPERATIONS:
+        return None
+    return (LEGACY_BACKENDS[prefix],) + LEGACY_OPERATIONS[rest]
+
+
+def _point(operation, query, label, span, result):
+    p50 = result['p50_ms']
+    rows = result.get('rows') or span
+    rows_per_sec = result.get('rows_per_sec')
+    if rows_per_sec is None and p50:
+        rows_per_sec = rows / (p50 / 1000)
+    return {
+        'operation': operation,
+        'query': query,
+        'label': label,
+        'span': span,
+        'p50_ms': p50,
+        'p90_ms': result.get('p90_ms'),
+        'p99_ms': result.get('p99_ms'),
+        'rows_per_sec': rows_per_sec,
+    }
+
+
+def _summarize_entries(entries):
+    """Turns raw process_data() entries, possibly several runs, into one point per span."""
+    durations = {}
+    for entry in entries:
+        durations.setdefault(entry['span'], []).append(entry['duration_ns'] / 1e6)
+    summaries = {}
+    for span, values in durations.items():
+        summary = {'p50_ms': statistics.median(values), 'p90_ms': None, 'p99_ms': None}
+        if len(values) > 1:
+            quantiles = statistics.quantiles(values, n=100, method='inclusive')
+            summary['p90_ms'] = quantiles[89]
+            summary['p99_ms'] = quantiles[98]
+        summaries[span] = summary
+    return summaries
 
-# List of JSON files
-json_files = ['maria_simple_query_med.json', 'maria_create_med.json', 'maria_delete_med.json', 'maria_join_query_med.json', 'maria_all_query_med.json', 'maria_update_med.json']
 
-# Loop through each JSON file and plot the data
-for json_file in json_files:
-    # Load JSON data with utf-8-sig encoding
-    with open(json_file, encoding='utf-8-sig') as f:
+def load_points(path):
+    """
+    Reads one result file into chart points.
+
+    Returns:
+        list: Dicts with operation, query, label, span, p50_ms, p90_ms, p99_ms and rows_per_sec.
+
+    Raises:
+        ValueError: If the file is not a known result format.
+    """
+    with open(path, encoding='utf-8-sig') as f:
         data = json.load(f)
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    if isinstance(data, dict) and 'benchmark' in data:
+        backend = data['backend']
+        label = _label(name, backend['name'], backend['engine'], backend['profile'])
+        benchmark = data['benchmark']
+        return [_point(benchmark['operation'], benchmark['query'], label, result['span'], result)
+                for result in data['results']]
+
+    if isinstance(data, dict) and 'settings' in data:
+        settings = data['settings']
+        return [
+            _point(result['operation'], result['query'],
+                   _label(name, settings['backend'], result.get('engine'), result.get('profile')),
+                   result['span'], result)
+            for result in data['results'] if 'error' not in result
+        ]
+
+    # Raw and median lists carry no operation; endpoint file names tell it,
+    # otherwise each file gets a report of its own.
+    backend, operation, query = _legacy_endpoint(name) or (None, name, None)
+
+    if isinstance(data, list) and data and 'duration_ns' in data[0]:
+        groups = {}
+        for entry in data:
+            key = (entry.get('backend') or backend, entry.get('engine'), entry.get('profile'), entry.get('result_mode'))
+            groups.setdefault(key, []).append(entry)
+        points = []
+        for key, entries in groups.items():
+            rows = {entry['span']: entry.get('rows', entry['span']) for entry in entries}
+            for span, summary in _summarize_entries(entries).items():
+                points.append(_point(operation, query, _label(name, *key), span, {**summary, 'rows': rows[span]}))
+        return points
+
+    if isinstance(data, list) and data and isinstance(data[0].get('duration'), str):
+        return [_point(operation, query, _label(name, backend, entry.get('engine')), entry['span'],
+                       {'p50_ms': _milliseconds(entry['duration'])})
+                for entry in data]
+
+    raise ValueError(f"{path}: unknown result format")
+
+
+def group_reports(points):
+    """
+    Groups points into reports, one per operation and query.
+
+    Returns:
+        dict: (operation, query) -> {label -> points sorted by span}.
+    """
+    reports = {}
+    for point in points:
+        series = reports.setdefault((point['operation'], point['query']), {})
+        series.setdefault(point['label'], []).append(point)
+    for series in reports.values():
+        for values in series.values():
+            values.sort(key=lambda point: point['span'])
+    return reports
+
+
+def report_name(operation, query):
+    return f"{operation}_{query}" if query else operation
+
+
+def render_report(operation, query, series, output_dir, image_format="png"):
+    """
+    Renders one report to <output_dir>/<operation>[_<query>].<image_format>.
+
+    Returns:
+        str: The written path.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    figure, (throughput, latency) = plt.subplots(1, 2, figsize=(14, 5.5))
+    for index, (label, values) in enumerate(sorted(series.items())):
+        color = f"C{index % 10}"
+        spans = [point['span'] for point in values]
+        throughput.plot(spans, [point['rows_per_sec'] for point in values], marker="o", color=color, label=label)
+        for key, style in PERCENTILE_STYLES:
+            measured = [(point['span'], point[key]) for point in values if point[key] is not None]
+            if measured:
+                latency.plot(*zip(*measured), linestyle=style, marker="o" if key == "p50_ms" else None,
+                             color=color, label=f"{label} {key[:-3]}")
+
+    for axes, ylabel in ((throughput, "Rows per second"), (latency, "Latency (ms)")):
+        axes.set_xscale("log")
+        axes.set_yscale("log")
+        axes.set_xlabel("Span (rows)")
+        axes.set_ylabel(ylabel)
+        axes.grid(True, which="both", alpha=0.3)
+        axes.legend(fontsize="small")
+    throughput.set_title("Throughput")
+    latency.set_title("Latency percentiles")
+    figure.suptitle(report_name(operation, query).replace("_", " "))
+    figure.tight_layout()
+
+    path = os.path.join(output_dir, f"{report_name(operation, query)}.{image_format}")
+    figure.savefig(path)
+    plt.close(figure)
+    return path
 
-    # Convert JSON data to a DataFrame
-    df = pd.DataFrame(data)
 
-    # Remove "ms" and convert 'duration' to float
-    df['duration'] = df['duration'].str.replace(' ms', '').astype(float)
+def render_reports(paths, output_dir=".", jobs=None, image_format="png"):
+    """
+    Renders the reports of all result files, several at a time.
 
-    # Sort the DataFrame by 'span'
-    df = df.sort_values(by='span')
+    Args:
+        paths (list): Result files.
+        output_dir (str): Directory for the images, created if needed.
+        jobs (int): Worker processes. Defaults to the CPU count; 1 renders in this process.
+        image_format (str): One of REPORT_FORMATS.
 
-    # Create a new figure for each JSON file
-    plt.figure(figsize=(12, 6))
+    Returns:
+        list: Paths of the written images.
+    """
+    if image_format not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {image_format}")
+    points = [point for path in paths for point in load_points(path)]
+    reports = group_reports(points)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = min(jobs or os.cpu_count() or 1, len(reports) or 1)
+    if jobs == 1:
+        return [render_report(operation, query, series, output_dir, image_format)
+                for (operation, query), series in reports.items()]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(render_report, operation, query, series, output_dir, image_format)
+                   for (operation, query), series in reports.items()]
+        return [future.result() for future in futures]
 
-    # Plot the data as points without lines
-    plt.scatter(df['span'], df['duration'], marker='o')
-    plt.xlabel('Span')
-    plt.ylabel('Duration (ms)')
-    plt.title(f'Span vs Duration - {json_file}')
-    plt.grid(True)
 
-    # Set x-ticks to show numbers every 50,000
-    plt.xticks(range(0, max(df['span']) + 1, 50000), rotation=45)
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('results', nargs='+', help='result files')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--jobs', type=int, help='worker processes; defaults to the CPU count')
+    parser.add_argument('--format', default='png', choices=REPORT_FORMATS)
+    args = parser.parse_args()
 
-    # Adjust layout to ensure the lower description is fully visible
-    plt.tight_layout(pad=3.0)
+    for path in render_reports(args.results, args.output_dir, args.jobs, args.format):
+        print(f"Saved {path}")
+    return 0
 
-    # Save the figure as a separate image file
-    plt.savefig(f'{json_file.split(".")[0]}.png')
 
-    # Show the plot
-    plt.show()
+if __name__ == '__main__':
+    sys.exit(main())
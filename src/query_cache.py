@@ -0,0 +1,213 @@
+"""
+In-process cache of query results, invalidated by the write paths.
+
+Results are keyed by the whitespace-normalized SQL and its parameters and
+remember which tables the query reads. Write helpers call invalidate() with
+the tables they change, which drops every result reading one of them. Each
+table also carries a version, so a result fetched while a write was running
+is not stored once the write has invalidated its table.
+
+Invalidation only sees writes made by this process; entries also expire
+after a TTL, which bounds how stale results can get when other processes
+write to the same database.
+"""
+import functools
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Table names following FROM, JOIN, INTO, UPDATE or TABLE.
+_TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?(\w+)`?", re.IGNORECASE)
+
+
+def normalize_query(query):
+    """Collapses runs of whitespace so formatting does not change the cache key."""
+    return " ".join(query.split())
+
+
+def tables_in(query):
+    """Returns the names of the tables a statement reads or writes."""
+    return frozenset(_TABLE_PATTERN.findall(query))
+
+
+class QueryCache:
+    """
+    LRU of query results bounded by entry count, total rows and age.
+
+    Args:
+        max_entries (int): Maximum number of cached results.
+        max_rows (int): Maximum rows over all cached results; larger results are not cached.
+        ttl (float): Seconds a result stays valid.
+        enabled (bool): False makes fetch() always run the loader.
+    """
+
+    def __init__(self, max_entries=256, max_rows=200000, ttl=30.0, enabled=True):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0,
+                       'uncacheable': 0}
+
+    def _drop(self, key):
+        """Removes an entry. Caller holds the lock."""
+        rows, _, _ = self._entries.pop(key)
+        self._rows -= len(rows)
+
+    def get(self, key):
+        """
+        Returns the cached rows for a key, or None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            rows, _, expires = entry
+            if time.monotonic() >= expires:
+                self._drop(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return rows
+
+    def versions(self, tables):
+        """Returns the current versions of tables, to be passed to put()."""
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in sorted(tables))
+
+    def put(self, key, rows, tables, versions):
+        """
+        Stores rows unless one of their tables was invalidated since versions was taken.
+
+        Args:
+            key (tuple): (normalized query, params).
+            rows (list): Rows to cache; must not be modified afterwards.
+            tables (frozenset): Tables the query reads.
+            versions (tuple): Result of versions(tables) taken before the query ran.
+        """
+        with self._lock:
+            if tuple(self._versions.get(table, 0) for table in sorted(tables)) != versions:
+                return
+            if len(rows) > self.max_rows:
+                self._stats['uncacheable'] += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (rows, tables, time.monotonic() + self.ttl)
+            self._rows += len(rows)
+            while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def fetch(self, query, params, loader):
+        """
+        Returns the rows of a query from the cache, calling loader() on a miss.
+
+        Exceptions from loader() propagate and nothing is cached.
+
+        Args:
+            query (str): The SQL query.
+            params (tuple): Its parameters.
+            loader (callable): Runs the query and returns its rows as a list of tuples.
+
+        Returns:
+            list: The rows.
+        """
+        if not self.enabled:
+            return loader()
+        key = (normalize_query(query), tuple(params or ()))
+        rows = self.get(key)
+        if rows is not None:
+            return rows
+        tables = tables_in(query)
+        versions = self.versions(tables)
+        rows = loader()
+        self.put(key, rows, tables, versions)
+        return rows
+
+    def invalidate(self, *tables):
+        """Drops the results reading any of tables and bumps their versions."""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            stale = [key for key, (_, read, _) in self._entries.items() if not read.isdisjoint(tables)]
+            for key in stale:
+                self._drop(key)
+            self._stats['invalidations'] += len(stale)
+
+    def clear(self):
+        """Drops every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Hit/miss/eviction/invalidation counters and the current footprint.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['enabled'] = self.enabled
+            stats['entries'] = len(self._entries)
+            stats['rows'] = self._rows
+            stats['max_entries'] = self.max_entries
+            stats['max_rows'] = self.max_rows
+            stats['ttl'] = self.ttl
+        return stats
+
+
+def invalidates(*tables):
+    """
+    Decorates a write helper to invalidate cached results of tables once it returns.
+
+    Invalidation also happens when the helper fails, since batched writes may
+    have committed part of their work.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_query_cache().invalidate(*tables)
+        return wrapper
+    return decorator
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache():
+    """
+    Returns the process-wide query cache, creating it on first use.
+
+    Settings are read from QUERY_CACHE_ENABLED (off unless "1"),
+    QUERY_CACHE_TTL_S, QUERY_CACHE_MAX_ENTRIES and QUERY_CACHE_MAX_ROWS.
+
+    Returns:
+        QueryCache: The shared cache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryCache(
+                    max_entries=int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', 256)),
+                    max_rows=int(os.environ.get('QUERY_CACHE_MAX_ROWS', 200000)),
+                    ttl=float(os.environ.get('QUERY_CACHE_TTL_S', 30)),
+                    enabled=os.environ.get('QUERY_CACHE_ENABLED', '0') == '1',
+                )
+    return _cache
@@ -0,0 +1,93 @@
+from collections import namedtuple
+import numpy as np
+from .event_batch import EVENT_FIELDS, EventBatch
+from .tracing import phase
+
+EventRow = namedtuple("EventRow", EVENT_FIELDS)
+
+# Shapes stream_rows() can yield: plain tuples, EventRow namedtuples, or per
+# fetched batch one dict of column arrays or one EventBatch.
+ROW_FORMATS = ("tuple", "namedtuple", "columns", "batch")
+
+# How a benchmark consumes a streamed result: stop after the first row, read
+# every row without keeping it, or keep every row in a list.
+RESULT_MODES = ("first_row", "drain", "materialize")
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def _batch_to_columns(batch):
+    columns = list(zip(*batch))
+    return {
+        name: np.array(values, dtype=object if name in ("timestamp", "message") else None)
+        for name, values in zip(EVENT_FIELDS, columns)
+    }
+
+
+def stream_rows(fetch_batch, row_format="tuple"):
+    """
+    Turns a batch fetcher into a stream of rows in the requested format.
+
+    Args:
+        fetch_batch (callable): Returns the next list of row tuples, empty when done
+            (e.g. a bound cursor.fetchmany with its size).
+        row_format (str): One of ROW_FORMATS.
+
+    Yields:
+        tuple | EventRow | dict | EventBatch: A row, or one dict of column arrays or
+            EventBatch per batch for "columns" and "batch".
+    """
+    if row_format not in ROW_FORMATS:
+        raise ValueError(f"Unknown row format: {row_format}")
+    while True:
+        with phase("fetch"):
+            batch = fetch_batch()
+        if not batch:
+            return
+        if row_format == "columns":
+            with phase("materialize", rows=len(batch)):
+                columns = _batch_to_columns(batch)
+            yield columns
+        elif row_format == "batch":
+            with phase("materialize", rows=len(batch)):
+                events = EventBatch.from_rows(batch)
+            yield events
+        elif row_format == "namedtuple":
+            yield from (EventRow._make(row) for row in batch)
+        else:
+            yield from (tuple(row) for row in batch)
+
+
+def iter_cursor(cursor, batch_size=DEFAULT_BATCH_SIZE, row_format="tuple"):
+    """Streams the pending result of a DB-API cursor with fetchmany(batch_size)."""
+    return stream_rows(lambda: cursor.fetchmany(batch_size), row_format)
+
+
+def consume(rows, mode):
+    """
+    Consumes a row stream the way a benchmark mode prescribes.
+
+    The stream is left open so that closing it, which for an unbuffered
+    cursor discards the unread rows, can happen outside the timed section.
+
+    Args:
+        rows (iterator): A stream from stream_rows() or a backend's stream().
+        mode (str): One of RESULT_MODES.
+
+    Returns:
+        int: Number of rows consumed; 1 or 0 for "first_row".
+    """
+    if mode not in RESULT_MODES:
+        raise ValueError(f"Unknown result mode: {mode}")
+    if mode == "first_row":
+        return 1 if next(rows, None) is not None else 0
+    if mode == "materialize":
+        return sum(_row_count(item) for item in list(rows))
+    count = 0
+    for item in rows:
+        count += _row_count(item)
+    return count
+
+
+def _row_count(item):
+    return len(item["timestamp"]) if isinstance(item, (dict, EventBatch)) else 1
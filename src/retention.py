@@ -0,0 +1,213 @@
+import time
+from .db_pool import pooled_connection
+from .keyed_batches import execute_in_batches
+
+# How events are removed: one DELETE statement, bounded primary-key batches
+# each committed on its own, or whole time partitions (with batched deletes
+# for any rows the partition boundaries do not cover).
+RETENTION_STRATEGIES = ("single", "batched", "partition")
+
+RETENTION_BATCH_SIZE = 10000
+
+
+def _report(strategy, rows, batches, started, **extra):
+    report = {
+        'strategy': strategy,
+        'rows': rows,
+        'batches': batches,
+        'seconds': round(time.perf_counter() - started, 6),
+    }
+    report.update(extra)
+    return report
+
+
+def delete_in_batches(condition="1=1", params=(), batch_size=RETENTION_BATCH_SIZE, throttle=0.0, id_range=None):
+    """
+    Deletes matching events in primary-key ranges of batch_size ids.
+
+    Each range is its own short transaction (see keyed_batches.execute_in_batches()),
+    so row locks and undo are bounded and concurrent inserts, which take new
+    higher ids, are never blocked for long.
+
+    Args:
+        condition (str): SQL condition on Event rows, with %s placeholders.
+        params (tuple): Parameters for condition.
+        batch_size (int): Ids per DELETE.
+        throttle (float): Seconds to sleep after each batch.
+        id_range (tuple): (first id, last id) to walk. Defaults to the id span
+            of the matching rows.
+
+    Returns:
+        dict: Strategy, rows deleted, batches and elapsed seconds.
+
+    Raises:
+        mariadb.Error: If a statement fails. Batches already committed stay deleted.
+    """
+    started = time.perf_counter()
+    result = execute_in_batches("DELETE FROM Event", condition, params, batch_size=batch_size,
+                                throttle=throttle, id_range=id_range)
+    print(f"Deleted {result['rows']} rows from the Event table in {result['batches']} batches.")
+    return _report("batched", result['rows'], result['batches'], started)
+
+
+def delete_single(condition="1=1", params=()):
+    """
+    Deletes matching events with one DELETE statement in one transaction.
+
+    Returns:
+        dict: Strategy, rows deleted, batches and elapsed seconds.
+    """
+    started = time.perf_counter()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM Event WHERE {condition}", params)
+        deleted = cursor.rowcount
+        conn.commit()
+        cursor.close()
+    return _report("single", deleted, 1, started)
+
+
+def delete_first(count, strategy="batched", batch_size=RETENTION_BATCH_SIZE, throttle=0.0):
+    """
+    Deletes the count events with the lowest ids.
+
+    Ids keep growing when the table is emptied, so the range starts at the
+    lowest id left rather than at 1. Ids of one bulk insert into an emptied
+    table are consecutive; with gaps fewer rows are deleted, as the report shows.
+
+    Returns:
+        dict: Strategy, rows deleted, batches and elapsed seconds.
+    """
+    started = time.perf_counter()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(id) FROM Event")
+        low = cursor.fetchone()[0]
+        cursor.close()
+    if low is None:
+        return _report(strategy, 0, 0, started)
+    id_range = (low, low + count - 1)
+    if strategy == "single":
+        return delete_single("id BETWEEN %s AND %s", id_range)
+    return delete_in_batches(batch_size=batch_size, throttle=throttle, id_range=id_range)
+
+
+def list_partitions():
+    """
+    Lists the RANGE partitions of the Event table.
+
+    Returns:
+        list: (partition name, upper bound as a UNIX timestamp or None for MAXVALUE)
+            tuples in partition order. Empty if Event is not partitioned.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Event' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """)
+        partitions = [
+            (name, None if description == 'MAXVALUE' else int(description))
+            for name, description in cursor.fetchall()
+        ]
+        cursor.close()
+    return partitions
+
+
+def purge_partitions_before(cutoff, mode="truncate", batch_size=RETENTION_BATCH_SIZE, throttle=0.0):
+    """
+    Removes events older than cutoff by emptying whole time partitions.
+
+    Partitions whose upper bound is at or before cutoff are truncated (or
+    dropped); rows older than cutoff in the partition that straddles it are
+    removed with delete_in_batches(). Without partitioning this is a plain
+    batched delete.
+
+    Args:
+        cutoff (datetime | str): Events with an earlier timestamp are removed.
+        mode (str): "truncate" keeps the emptied partitions, "drop" removes them.
+        batch_size (int): Ids per DELETE for the remaining rows.
+        throttle (float): Seconds to sleep after each batched DELETE.
+
+    Returns:
+        dict: Strategy, rows deleted, partitions emptied and elapsed seconds.
+    """
+    if mode not in ("truncate", "drop"):
+        raise ValueError(f"Unknown partition purge mode: {mode}")
+    started = time.perf_counter()
+    partitions = list_partitions()
+    removed = []
+    partition_rows = 0
+    if partitions:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT UNIX_TIMESTAMP(%s)", (cutoff,))
+            cutoff_unix = int(cursor.fetchone()[0])
+            removed = [name for name, bound in partitions if bound is not None and bound <= cutoff_unix]
+            if mode == "drop" and len(removed) == len(partitions) - 1:
+                # A RANGE-partitioned table must keep at least one partition
+                # below MAXVALUE for the layout to stay meaningful.
+                removed = removed[1:]
+            if removed:
+                names = ", ".join(removed)
+                cursor.execute(
+                    f"SELECT COUNT(*) FROM Event PARTITION ({names})"
+                )
+                partition_rows = cursor.fetchone()[0]
+                cursor.execute(f"ALTER TABLE Event {mode.upper()} PARTITION {names}")
+            cursor.close()
+
+    remainder = delete_in_batches("timestamp < %s", (cutoff,), batch_size=batch_size, throttle=throttle)
+    print(f"Emptied {len(removed)} partitions of the Event table.")
+    return _report(
+        "partition",
+        partition_rows + remainder['rows'],
+        remainder['batches'],
+        started,
+        partitions=removed,
+    )
+
+
+def purge_events_before(cutoff, strategy="batched", batch_size=RETENTION_BATCH_SIZE, throttle=0.0):
+    """
+    Removes events older than cutoff with one of RETENTION_STRATEGIES.
+
+    Returns:
+        dict: Strategy, rows deleted, batches and elapsed seconds.
+    """
+    if strategy == "single":
+        return delete_single("timestamp < %s", (cutoff,))
+    if strategy == "batched":
+        return delete_in_batches("timestamp < %s", (cutoff,), batch_size=batch_size, throttle=throttle)
+    if strategy == "partition":
+        return purge_partitions_before(cutoff, batch_size=batch_size, throttle=throttle)
+    raise ValueError(f"Unknown retention strategy: {strategy}")
+
+
+def clear_events(strategy="batched", batch_size=RETENTION_BATCH_SIZE, throttle=0.0):
+    """
+    Removes every event with one of RETENTION_STRATEGIES.
+
+    "partition" truncates all partitions at once and falls back to batched
+    deletes if Event is not partitioned.
+
+    Returns:
+        dict: Strategy, rows deleted, batches and elapsed seconds.
+    """
+    if strategy == "single":
+        return delete_single()
+    if strategy == "batched":
+        return delete_in_batches(batch_size=batch_size, throttle=throttle)
+    if strategy != "partition":
+        raise ValueError(f"Unknown retention strategy: {strategy}")
+    if not list_partitions():
+        return delete_in_batches(batch_size=batch_size, throttle=throttle)
+    started = time.perf_counter()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM Event")
+        rows = cursor.fetchone()[0]
+        cursor.execute("ALTER TABLE Event TRUNCATE PARTITION ALL")
+        cursor.close()
+    return _report("partition", rows, 0, started)
@@ -0,0 +1,272 @@
+"""
+Per-minute and per-hour event counts for dashboard queries.
+
+Counts are keyed by time bucket, severity, event type and source; location
+and country are reached through the small Source and Location tables. The
+rollups are maintained in one of two ways, chosen with ROLLUP_MODE:
+
+- "pipeline": insert_events_mariadb() upserts the counts of each chunk in
+  the same transaction as the chunk itself.
+- "compactor": a background task periodically folds the events after a
+  stored id watermark into the rollups. This assumes ids become visible in
+  increasing order, e.g. a single writer.
+
+Rollups record what was ingested; updates and deletes of raw events are not
+reflected until rebuild_rollups() runs.
+"""
+import asyncio
+import logging
+import os
+from collections import Counter
+import numpy as np
+from .db_pool import pooled_connection
+from .generator import format_timestamps, is_columnar, slice_columns
+from .tracing import phase
+
+ROLLUP_MODES = ("off", "pipeline", "compactor")
+
+# Granularity -> (rollup table, bucket width in seconds, DATE_FORMAT pattern).
+GRANULARITIES = {
+    "minute": ("Event_rollup_minute", 60, "%Y-%m-%d %H:%i:00"),
+    "hour": ("Event_rollup_hour", 3600, "%Y-%m-%d %H:00:00"),
+}
+
+# Dashboard aggregates: dimension -> (raw query, rollup query). {table} is a
+# rollup table, {range} an optional time filter and %s the bucket pattern.
+AGGREGATES = {
+    "severity": (
+        "SELECT severity_ID, COUNT(*) FROM Event {range} GROUP BY severity_ID ORDER BY severity_ID",
+        "SELECT severity_ID, SUM(event_count) FROM {table} {range} GROUP BY severity_ID ORDER BY severity_ID",
+    ),
+    "country": (
+        """
+        SELECT l.country, COUNT(*) FROM Event e
+        JOIN Source s ON e.source_ID = s.id
+        JOIN Location l ON s.location_id = l.id
+        {range} GROUP BY l.country ORDER BY l.country
+        """,
+        """
+        SELECT l.country, SUM(r.event_count) FROM {table} r
+        JOIN Source s ON r.source_ID = s.id
+        JOIN Location l ON s.location_id = l.id
+        {range} GROUP BY l.country ORDER BY l.country
+        """,
+    ),
+    "time": (
+        "SELECT DATE_FORMAT(timestamp, %s) AS bucket, COUNT(*) FROM Event {range} GROUP BY bucket ORDER BY bucket",
+        "SELECT bucket, SUM(event_count) FROM {table} {range} GROUP BY bucket ORDER BY bucket",
+    ),
+}
+
+AGGREGATE_SOURCES = ("rollup", "raw")
+
+UPSERT_QUERY = """
+INSERT INTO {table} (bucket, severity_ID, event_type_ID, source_ID, event_count)
+VALUES (%s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE event_count = event_count + VALUES(event_count)
+"""
+
+COMPACT_QUERY = """
+INSERT INTO {table} (bucket, severity_ID, event_type_ID, source_ID, event_count)
+SELECT DATE_FORMAT(timestamp, %s), severity_ID, event_type_ID, source_ID, COUNT(*) FROM Event
+WHERE id > %s AND id <= %s
+GROUP BY 1, 2, 3, 4
+ON DUPLICATE KEY UPDATE event_count = event_count + VALUES(event_count)
+"""
+
+
+def get_rollup_mode():
+    """Returns ROLLUP_MODE, one of ROLLUP_MODES; "off" by default."""
+    return os.environ.get('ROLLUP_MODE', 'off')
+
+
+def rollup_counts(events_data, start, stop, granularity):
+    """
+    Counts events per bucket, severity, event type and source.
+
+    Args:
+        events_data (list | dict): Row dicts or a column dict.
+        start (int): First row.
+        stop (int): Row after the last.
+        granularity (str): A key of GRANULARITIES.
+
+    Returns:
+        list: Sorted (bucket, severity_ID, event_type_ID, source_ID, count) tuples.
+    """
+    seconds = GRANULARITIES[granularity][1]
+    if is_columnar(events_data):
+        columns = slice_columns(events_data, start, stop)
+        timestamps = columns["timestamp"]
+        keys = np.stack([
+            timestamps - timestamps % seconds,
+            columns["severity_ID"].astype(np.int64),
+            columns["event_type_ID"].astype(np.int64),
+            columns["source_ID"].astype(np.int64),
+        ], axis=1)
+        unique, counts = np.unique(keys, axis=0, return_counts=True)
+        buckets = format_timestamps(unique[:, 0]).tolist()
+        return [
+            (bucket, severity, event_type, source, count)
+            for bucket, (severity, event_type, source), count
+            in zip(buckets, unique[:, 1:].tolist(), counts.tolist())
+        ]
+
+    # "YYYY-MM-DD HH:MM:SS" truncated to the minute or hour.
+    width, suffix = (16, ":00") if seconds == 60 else (13, ":00:00")
+    counter = Counter(
+        (str(event['timestamp'])[:width] + suffix, event['severity_ID'], event['event_type_ID'], event['source_ID'])
+        for event in events_data[start:stop]
+    )
+    return sorted(key + (count,) for key, count in counter.items())
+
+
+def upsert_rollups(cursor, events_data, start=0, stop=None):
+    """
+    Adds the counts of a range of events to every rollup table.
+
+    Runs in the caller's transaction. Keys are written in sorted order so
+    concurrent writers lock rollup rows in the same order.
+    """
+    if stop is None:
+        stop = len(events_data["timestamp"]) if is_columnar(events_data) else len(events_data)
+    for granularity, (table, _, _) in GRANULARITIES.items():
+        with phase("serialize"):
+            counts = rollup_counts(events_data, start, stop, granularity)
+        if counts:
+            with phase("execute", rows=len(counts)):
+                cursor.executemany(UPSERT_QUERY.format(table=table), counts)
+
+
+def _watermark(cursor):
+    cursor.execute("SELECT last_event_id FROM Rollup_watermark WHERE name = 'Event' FOR UPDATE")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _set_watermark(cursor, event_id):
+    cursor.execute(
+        "INSERT INTO Rollup_watermark (name, last_event_id) VALUES ('Event', %s) "
+        "ON DUPLICATE KEY UPDATE last_event_id = VALUES(last_event_id)",
+        (event_id,),
+    )
+
+
+def compact_rollups(batch_size=100000):
+    """
+    Folds up to batch_size events after the watermark into the rollups.
+
+    The counts and the new watermark commit together, so every event is
+    counted exactly once even if the compactor is interrupted. If Event was
+    recreated and its ids restarted below the watermark, counting restarts
+    from the first id.
+
+    Returns:
+        dict: from_id, to_id and whether events remain after to_id ("pending").
+
+    Raises:
+        mariadb.Error: If a statement fails; nothing is committed then.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            last = _watermark(cursor)
+            cursor.execute("SELECT MAX(id) FROM Event")
+            high = cursor.fetchone()[0] or 0
+            if high < last:
+                last = 0
+            upto = min(high, last + batch_size)
+            if upto > last:
+                for table, _, pattern in GRANULARITIES.values():
+                    cursor.execute(COMPACT_QUERY.format(table=table), (pattern, last, upto))
+            _set_watermark(cursor, upto)
+            conn.commit()
+        finally:
+            cursor.close()
+    return {'from_id': last, 'to_id': upto, 'pending': upto < high}
+
+
+def clear_rollups(watermark_to_end=True):
+    """
+    Empties the rollup tables.
+
+    Args:
+        watermark_to_end (bool): Move the watermark past the current events so
+            the compactor does not count them again; False resets it to 0.
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        for table, _, _ in GRANULARITIES.values():
+            cursor.execute(f"DELETE FROM {table}")
+        high = 0
+        if watermark_to_end:
+            cursor.execute("SELECT MAX(id) FROM Event")
+            high = cursor.fetchone()[0] or 0
+        _set_watermark(cursor, high)
+        conn.commit()
+        cursor.close()
+
+
+def rebuild_rollups(batch_size=100000):
+    """Recomputes the rollups from all events in Event."""
+    clear_rollups(watermark_to_end=False)
+    while compact_rollups(batch_size)['pending']:
+        pass
+
+
+async def run_compactor(interval=5.0, batch_size=100000):
+    """
+    Compacts new events every interval seconds until cancelled.
+
+    Batches are folded back to back while a backlog remains.
+    """
+    while True:
+        try:
+            result = await asyncio.to_thread(compact_rollups, batch_size)
+            if result['pending']:
+                continue
+        except Exception as e:
+            logging.error(f"Error compacting rollups: {e}")
+        await asyncio.sleep(interval)
+
+
+def aggregate_query(dimension, source="rollup", granularity="hour", start=None, end=None):
+    """
+    Builds a dashboard aggregate query.
+
+    Args:
+        dimension (str): A key of AGGREGATES.
+        source (str): "rollup" or "raw", see AGGREGATE_SOURCES.
+        granularity (str): Rollup table to read and, for "time", the bucket width.
+        start (str): Optional inclusive lower time bound.
+        end (str): Optional exclusive upper time bound.
+
+    Returns:
+        tuple: (query, params).
+
+    Raises:
+        ValueError: On an unknown dimension, source or granularity.
+    """
+    if dimension not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {dimension}")
+    if source not in AGGREGATE_SOURCES:
+        raise ValueError(f"Unknown aggregate source: {source}")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    table, _, pattern = GRANULARITIES[granularity]
+    raw_query, rollup_query = AGGREGATES[dimension]
+    if source == "raw":
+        column = "e.timestamp" if dimension == "country" else "timestamp"
+    else:
+        column = "r.bucket" if dimension == "country" else "bucket"
+
+    conditions = []
+    params = [pattern] if dimension == "time" and source == "raw" else []
+    if start is not None:
+        conditions.append(f"{column} >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append(f"{column} < %s")
+        params.append(end)
+    time_range = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (raw_query if source == "raw" else rollup_query).format(table=table, range=time_range)
+    return query, tuple(params)
@@ -0,0 +1,238 @@
+from datetime import timedelta
+import mariadb
+from .db_pool import PoolTimeoutError, pooled_connection
+from .generator import SEEDED_REFERENCE_TIME
+from .message_templates import reset_message_storage, seed_templates
+from .query_cache import invalidates
+
+# Keyset pagination indexes of mariadb/init.sql, see pagination.py.
+KEYSET_INDEXES = [
+    ("idx_event_ts", ["timestamp", "id"]),
+    ("idx_event_source_ts", ["source_ID", "timestamp", "id"]),
+    ("idx_event_severity_ts", ["severity_ID", "timestamp", "id"]),
+    ("idx_event_type_ts", ["event_type_ID", "timestamp", "id"]),
+]
+
+# Physical designs of the Event table that can be applied before a benchmark
+# run. "baseline" matches mariadb/init.sql. Profiles store the message text
+# unless "message_storage" is "template", see message_templates.py. Profiles
+# with "generated_ids" False leave Event.id NULL.
+PROFILES = {
+    "baseline": {
+        "description": "Keyset pagination indexes on (filter column, timestamp, id), as in init.sql",
+        "engine": "InnoDB",
+        "indexes": KEYSET_INDEXES,
+        "partitioned": False,
+    },
+    "bare": {
+        "description": "Primary key only",
+        "engine": "InnoDB",
+        "indexes": [],
+        "partitioned": False,
+    },
+    "templated": {
+        "description": "Keyset indexes as baseline; messages stored as MessageTemplate id and parameter",
+        "engine": "InnoDB",
+        "indexes": KEYSET_INDEXES,
+        "partitioned": False,
+        "message_storage": "template",
+    },
+    "indexed": {
+        "description": "Secondary indexes on severity_ID, source_ID and timestamp",
+        "engine": "InnoDB",
+        "indexes": [
+            ("idx_event_severity", ["severity_ID"]),
+            ("idx_event_source", ["source_ID"]),
+            ("idx_event_timestamp", ["timestamp"]),
+        ],
+        "partitioned": False,
+    },
+    "composite": {
+        "description": "Composite indexes leading with the filter column, then timestamp",
+        "engine": "InnoDB",
+        "indexes": [
+            ("idx_event_severity_ts", ["severity_ID", "timestamp"]),
+            ("idx_event_source_ts", ["source_ID", "timestamp"]),
+        ],
+        "partitioned": False,
+    },
+    "partitioned": {
+        "description": "Hourly RANGE partitions on timestamp plus composite indexes",
+        "engine": "InnoDB",
+        "indexes": [
+            ("idx_event_severity_ts", ["severity_ID", "timestamp"]),
+            ("idx_event_source_ts", ["source_ID", "timestamp"]),
+        ],
+        "partitioned": True,
+    },
+    "aria": {
+        "description": "Aria engine with secondary indexes",
+        "engine": "Aria",
+        "indexes": [
+            ("idx_event_severity", ["severity_ID"]),
+            ("idx_event_source", ["source_ID"]),
+            ("idx_event_timestamp", ["timestamp"]),
+        ],
+        "partitioned": False,
+    },
+    "columnstore": {
+        "description": "ColumnStore engine; no keys, ids are not generated",
+        "engine": "ColumnStore",
+        "indexes": [],
+        "partitioned": False,
+        "generated_ids": False,
+    },
+}
+
+# Benchmarks that rely on generated ids: deletes remove the first ids,
+# updates walk them in batches, and inserts without id generation would not
+# compare with the other designs.
+ID_OPERATIONS = ("insert", "delete", "update")
+
+# Hourly partitions cover this window around the seeded datasets' timestamps;
+# older and newer rows land in p_past and p_future.
+PARTITION_START = SEEDED_REFERENCE_TIME - timedelta(days=1)
+PARTITION_END = SEEDED_REFERENCE_TIME + timedelta(days=2)
+PARTITION_HOURS = 1
+
+_active_profile = None
+
+
+def partition_name(boundary):
+    """Returns the name of the partition holding rows older than boundary."""
+    return f"p{boundary:%Y%m%d%H}"
+
+
+def build_partitions(start=PARTITION_START, end=PARTITION_END, hours=PARTITION_HOURS):
+    """
+    Builds the RANGE partition list for a time window.
+
+    Returns:
+        list: (partition name, boundary datetime or None for MAXVALUE) tuples.
+    """
+    partitions = [("p_past", start)]
+    boundary = start
+    while boundary < end:
+        boundary += timedelta(hours=hours)
+        partitions.append((partition_name(boundary), boundary))
+    partitions.append(("p_future", None))
+    return partitions
+
+
+def build_event_table_ddl(profile):
+    """
+    Builds the CREATE TABLE statement for the Event table under a profile.
+
+    Args:
+        profile (dict): An entry of PROFILES.
+
+    Returns:
+        str: The DDL statement.
+    """
+    columnstore = profile["engine"] == "ColumnStore"
+    lines = [
+        # ColumnStore has no AUTO_INCREMENT; inserts leave id NULL.
+        "id INT NULL" if columnstore else "id INT NOT NULL AUTO_INCREMENT",
+        "timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    ]
+    if profile.get("message_storage") == "template":
+        # message only holds text that matches no template.
+        lines.extend([
+            "message VARCHAR(255) NULL",
+            "template_ID SMALLINT NULL",
+            "message_param INT NULL",
+        ])
+    else:
+        lines.append("message VARCHAR(255) NOT NULL")
+    lines += [
+        "severity_ID INT NOT NULL",
+        "event_type_ID INT NOT NULL",
+        "source_ID INT NOT NULL",
+    ]
+    if not columnstore:
+        # Partitioned tables need the partitioning column in every unique key.
+        lines.append("PRIMARY KEY (id, timestamp)" if profile["partitioned"] else "PRIMARY KEY (id)")
+    lines.extend(f"KEY {name} ({', '.join(columns)})" for name, columns in profile["indexes"])
+
+    ddl = "CREATE TABLE Event (\n    " + ",\n    ".join(lines) + f"\n) ENGINE={profile['engine']}"
+    if profile["partitioned"]:
+        partitions = [
+            f"PARTITION {name} VALUES LESS THAN "
+            + ("MAXVALUE" if boundary is None else f"(UNIX_TIMESTAMP('{boundary:%Y-%m-%d %H:%M:%S}'))")
+            for name, boundary in build_partitions()
+        ]
+        ddl += "\nPARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (\n    " + ",\n    ".join(partitions) + "\n)"
+    return ddl
+
+
+def engine_available(cursor, engine):
+    cursor.execute("SELECT SUPPORT FROM information_schema.ENGINES WHERE ENGINE = %s", (engine,))
+    row = cursor.fetchone()
+    return row is not None and row[0] in ("YES", "DEFAULT")
+
+
+@invalidates("Event")
+def apply_profile(name):
+    """
+    Recreates the Event table with the physical design of a profile.
+
+    All events are dropped. Tables referencing Event are not affected since
+    init.sql declares no foreign keys.
+
+    Args:
+        name (str): A key of PROFILES.
+
+    Returns:
+        bool: True if the profile was applied, False otherwise.
+    """
+    global _active_profile
+    profile = PROFILES.get(name)
+    if profile is None:
+        print(f"Unknown schema profile: {name}")
+        return False
+
+    try:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            if not engine_available(cursor, profile["engine"]):
+                print(f"Storage engine {profile['engine']} is not available on this server.")
+                cursor.close()
+                return False
+            if profile.get("message_storage") == "template":
+                seed_templates(cursor)
+            cursor.execute("DROP TABLE IF EXISTS Event")
+            cursor.execute(build_event_table_ddl(profile))
+            conn.commit()
+            cursor.close()
+    except (mariadb.Error, PoolTimeoutError) as e:
+        print(f"Error applying schema profile {name}: {e}")
+        return False
+    finally:
+        reset_message_storage()
+
+    _active_profile = name
+    print(f"Applied schema profile {name}.")
+    return True
+
+
+def get_active_profile():
+    """Returns the name of the profile last applied by this process, or None."""
+    return _active_profile
+
+
+def profile_generates_ids():
+    """Tells whether the profile last applied by this process fills Event.id; True if none was applied."""
+    return PROFILES.get(_active_profile, {}).get("generated_ids", True)
+
+
+def unsupported_operation(operation):
+    """
+    Tells why a benchmark operation cannot run under the active profile.
+
+    Returns:
+        str: An error message, or None if the operation is supported.
+    """
+    if operation in ID_OPERATIONS and not profile_generates_ids():
+        return (f"Schema profile {_active_profile} does not generate event ids; "
+                f"{operation} benchmarks need them. Use it for query, purge or aggregate runs.")
+    return None
@@ -0,0 +1,121 @@
+"""
+Server-side prepared statements for the hot insert and query paths.
+
+In "prepared" mode each statement is prepared once per pooled connection
+with a prepared cursor (binary protocol; executemany() sends parameter
+arrays) and the cursor is kept in the connection's registry, so later
+calls skip parsing and planning on the server. In "text" mode every call
+sends plain SQL through a fresh cursor, as before.
+"""
+import os
+import threading
+from contextlib import contextmanager
+import mariadb
+from .db_pool import get_pool
+
+STATEMENT_MODES = ("text", "prepared")
+
+# Prepared cursors kept per connection; the least recently used is closed
+# beyond this, well below the server's max_prepared_stmt_count.
+MAX_STATEMENTS_PER_CONNECTION = 64
+
+_stats = {'prepares': 0, 'prepared_executes': 0, 'text_executes': 0, 'evictions': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+
+
+def get_statement_mode():
+    """Returns SQL_STATEMENT_MODE, one of STATEMENT_MODES; "text" by default."""
+    return os.environ.get('SQL_STATEMENT_MODE', 'text')
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def prepared_cursor(conn, sql):
+    """
+    Returns the prepared cursor for sql on a pooled connection, creating it on first use.
+
+    The statement itself is prepared by the cursor's first execute() and
+    reused by every later one with the same SQL text.
+
+    Args:
+        conn (mariadb.Connection): A connection borrowed from the shared pool.
+        sql (str): The statement.
+
+    Returns:
+        mariadb.Cursor: A prepared cursor owned by the registry; do not close it.
+    """
+    registry = get_pool().statements(conn)
+    cursor = registry.get(sql)
+    if cursor is not None:
+        registry.move_to_end(sql)
+        return cursor
+    cursor = conn.cursor(prepared=True)
+    registry[sql] = cursor
+    _count('prepares')
+    while len(registry) > MAX_STATEMENTS_PER_CONNECTION:
+        _, evicted = registry.popitem(last=False)
+        evicted.close()
+        _count('evictions')
+    return cursor
+
+
+@contextmanager
+def statement_cursor(conn, sql, mode=None):
+    """
+    Yields a cursor to run sql once on conn in the given statement mode.
+
+    A prepared cursor that raised an error is dropped from the registry and
+    prepared again on next use.
+
+    Args:
+        conn (mariadb.Connection): A connection borrowed from the shared pool.
+        sql (str): The statement the cursor will execute.
+        mode (str): One of STATEMENT_MODES. Defaults to get_statement_mode().
+
+    Yields:
+        mariadb.Cursor: The cursor; text cursors are closed on exit.
+    """
+    mode = mode or get_statement_mode()
+    if mode not in STATEMENT_MODES:
+        raise ValueError(f"Unknown statement mode: {mode}")
+    if mode == "text":
+        _count('text_executes')
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+        return
+
+    cursor = prepared_cursor(conn, sql)
+    _count('prepared_executes')
+    try:
+        yield cursor
+    except mariadb.Error:
+        _count('errors')
+        get_pool().statements(conn).pop(sql, None)
+        try:
+            cursor.close()
+        except mariadb.Error:
+            pass
+        raise
+
+
+def statement_stats():
+    """
+    Returns a snapshot of the statement counters of this process.
+
+    Returns:
+        dict: Prepares, prepared and text executes, evictions, errors and the
+        executes served per prepare.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['mode'] = get_statement_mode()
+    stats['executes_per_prepare'] = (
+        round(stats['prepared_executes'] / stats['prepares'], 1) if stats['prepares'] else None
+    )
+    return stats
@@ -0,0 +1,171 @@
+"""
+Per-phase timings of benchmark operations.
+
+Code on the hot path wraps its steps in `with phase("execute"):`. Unless a
+trace() is active in the current context, phase() returns a shared no-op
+context manager, so the instrumentation costs one ContextVar lookup.
+
+Finished traces can be exported as OTLP/JSON lines, the format of the
+OpenTelemetry file exporter, and loaded by any OTLP-aware tool.
+"""
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Phases the instrumented code records.
+PHASES = ("connect", "serialize", "execute", "commit", "fetch", "materialize")
+
+SERVICE_NAME = "event-logging-benchmark"
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_NOOP = nullcontext()
+
+
+class Trace:
+    """
+    Spans recorded while a trace() is active.
+
+    Phases may be recorded from several threads at once (pipeline workers,
+    the LOAD DATA writer), so appends take a lock.
+    """
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self._lock = threading.Lock()
+        # perf_counter_ns() is monotonic but has no epoch; spans are placed
+        # on the wall clock relative to this pair.
+        self._wall_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def phase_totals_ms(self):
+        """Returns the summed duration of each phase in milliseconds."""
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                if span['phase']:
+                    totals[span['name']] = totals.get(span['name'], 0) + span['end'] - span['start']
+        return {name: round(total / 1e6, 4) for name, total in totals.items()}
+
+    def to_otlp(self):
+        """Builds an OTLP/JSON ExportTraceServiceRequest for this trace."""
+        offset = self._wall_ns - self._perf_ns
+        with self._lock:
+            spans = [
+                {
+                    'traceId': self.trace_id,
+                    'spanId': span['id'],
+                    'parentSpanId': span['parent'] or '',
+                    'name': span['name'],
+                    'kind': 1,
+                    'startTimeUnixNano': str(span['start'] + offset),
+                    'endTimeUnixNano': str(span['end'] + offset),
+                    'attributes': [_otlp_attribute(key, value) for key, value in span['attributes'].items()],
+                }
+                for span in self.spans
+            ]
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [_otlp_attribute('service.name', SERVICE_NAME)]},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+            }]
+        }
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+@contextmanager
+def _record(current, name, attributes, is_phase):
+    span_id = secrets.token_hex(8)
+    token = _current_span.set(span_id)
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        _current_span.reset(token)
+        current.add({
+            'id': span_id,
+            'parent': _current_span.get(),
+            'name': name,
+            'start': start,
+            'end': end,
+            'attributes': attributes,
+            'phase': is_phase,
+        })
+
+
+def phase(name, **attributes):
+    """
+    Times a step of an operation if a trace is active, otherwise does nothing.
+
+    Args:
+        name (str): One of PHASES.
+        **attributes: Span attributes, e.g. rows=1000.
+
+    Returns:
+        A context manager.
+    """
+    current = _current_trace.get()
+    if current is None:
+        return _NOOP
+    return _record(current, name, attributes, True)
+
+
+@contextmanager
+def trace(name, **attributes):
+    """
+    Records the phases run inside the block into a new Trace.
+
+    Phases only reach the trace from threads started with the block's
+    context, see run_in_context().
+
+    Yields:
+        Trace: The trace; complete once the block exits.
+    """
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        with _record(current, name, attributes, False):
+            yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def run_in_context(func):
+    """Wraps func to run in a copy of the caller's context, e.g. as a thread target."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+
+def export_trace(current, path=None):
+    """
+    Appends a trace to an OTLP/JSON lines file.
+
+    Args:
+        current (Trace): A finished trace.
+        path (str): Output file. Defaults to TRACE_EXPORT_PATH or "traces.otlp.jsonl".
+    """
+    path = path or os.environ.get('TRACE_EXPORT_PATH', 'traces.otlp.jsonl')
+    line = json.dumps(current.to_otlp(), separators=(',', ':'))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line + "\n")
@@ -0,0 +1,410 @@
+"""
+Concurrent mixed-workload driver.
+
+Runs a weighted mix of single-event inserts, queries and updates against a
+backend from several threads, processes or asyncio tasks, either as fast as
+possible (closed loop) or at a target rate (open loop), and reports
+throughput and latency histograms per operation.
+
+In open-loop mode latencies are measured from each operation's scheduled
+start, so time spent queued behind a slow operation counts against it.
+
+Usage:
+    python -m src.workload --backend mariadb --mix insert=80,simple=15,join=5 --workers 8 --duration 30
+    python -m src.workload --mode asyncio --workers 32 --rate 500 --output workload.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .backends import create_backend
+from .benchmark import BENCHMARK_SEED, DATASET_ROWS
+from .dataset_cache import get_dataset_cache
+from .generator import slice_events
+
+MODES = ("threads", "processes", "asyncio")
+
+DEFAULT_MIX = {"insert": 80, "simple": 15, "join": 5}
+
+# Histogram buckets grow by 2^(1/8) (about 9%) from 1 µs, so percentiles are
+# exact to within one bucket width up to several hours.
+_BUCKETS_PER_DOUBLING = 8
+_BUCKET_COUNT = 8 * 44
+
+
+def _insert_one(store, data, index, report):
+    return store.insert(slice_events(data, index, index + 1))
+
+
+def _update(store, data, index, report):
+    return store.update(report=report)
+
+
+# Operation name -> callable(store, data, row index, report dict) returning
+# a truthy value on success. Inserts and queries go through the backends,
+# i.e. the same helpers the HTTP endpoints use.
+OPERATIONS = {
+    "insert": _insert_one,
+    "simple": lambda store, data, index, report: store.select_simple() is not None,
+    "join": lambda store, data, index, report: store.select_join() is not None,
+    "all": lambda store, data, index, report: store.select_all() is not None,
+    "update": _update,
+}
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram that can be merged across workers.
+
+    Latencies are recorded in nanoseconds; summaries are in milliseconds.
+    """
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    @staticmethod
+    def _bucket(ns):
+        if ns < 1000:
+            return 0
+        return min(_BUCKET_COUNT - 1, int(math.log2(ns / 1000) * _BUCKETS_PER_DOUBLING) + 1)
+
+    @staticmethod
+    def _upper_ns(bucket):
+        return 1000 * 2 ** (bucket / _BUCKETS_PER_DOUBLING)
+
+    def record(self, ns, ok=True):
+        self.counts[self._bucket(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        self.min_ns = ns if self.min_ns is None else min(self.min_ns, ns)
+        self.max_ns = max(self.max_ns, ns)
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.errors += other.errors
+        self.total_ns += other.total_ns
+        if other.min_ns is not None:
+            self.min_ns = other.min_ns if self.min_ns is None else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, q):
+        """Returns the upper bound of the bucket holding the q-th percentile, in nanoseconds."""
+        if not self.count:
+            return None
+        rank = math.ceil(q / 100 * self.count)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_ns(bucket), self.max_ns)
+        return self.max_ns
+
+    def summary(self, seconds):
+        """
+        Summarizes the histogram.
+
+        Args:
+            seconds (float): Length of the run, for throughput.
+
+        Returns:
+            dict: count, errors, ops_per_sec, min/mean/max and p50/p90/p99/p99.9 in ms,
+                and the non-empty buckets as [upper bound ms, count] pairs.
+        """
+        def ms(ns):
+            return None if ns is None else round(ns / 1e6, 4)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'ops_per_sec': round(self.count / seconds, 1) if seconds > 0 else None,
+            'min_ms': ms(self.min_ns),
+            'mean_ms': ms(self.total_ns / self.count) if self.count else None,
+            'max_ms': ms(self.max_ns),
+            'p50_ms': ms(self.percentile(50)),
+            'p90_ms': ms(self.percentile(90)),
+            'p99_ms': ms(self.percentile(99)),
+            'p999_ms': ms(self.percentile(99.9)),
+            'buckets': [
+                [ms(self._upper_ns(bucket)), count]
+                for bucket, count in enumerate(self.counts) if count
+            ],
+        }
+
+
+def parse_mix(text):
+    """
+    Parses a mix such as "insert=80,simple=15,join=5".
+
+    Raises:
+        ValueError: If an operation is unknown or no weight is positive.
+    """
+    mix = {}
+    for part in text.split(','):
+        name, weight = part.split('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown workload operation: {name}")
+        mix[name] = float(weight)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("Workload mix needs at least one positive weight")
+    return mix
+
+
+def _delta(before, after):
+    return {key: round(after[key] - before.get(key, 0), 3) for key in after}
+
+
+def _worker(worker_id, workers, backend, backend_options, mix, seed, rate, duration, started_at):
+    """
+    Runs one worker's share of the workload in the calling thread.
+
+    Args:
+        rate (float): This worker's operations per second; None for closed loop.
+        started_at (float): time.time() at which all workers start, so that
+            workers in other processes share one schedule.
+
+    Returns:
+        dict: "histograms" maps operation names to LatencyHistograms;
+            "retries" counts lock wait retries reported by updates.
+    """
+    store = create_backend(backend, **backend_options)
+    data = get_dataset_cache().get(DATASET_ROWS, seed)
+    rng = random.Random(seed * 1000 + worker_id)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    histograms = {name: LatencyHistogram() for name in names}
+    retries = 0
+    # Each worker inserts its own stripe of the dataset.
+    row = worker_id
+
+    delay = max(0.0, started_at - time.time())
+    time.sleep(delay)
+    origin = time.perf_counter_ns()
+    deadline = origin + int(duration * 1e9)
+    interval_ns = int(1e9 / rate) if rate else 0
+    sequence = 0
+    try:
+        while True:
+            scheduled = origin + sequence * interval_ns if interval_ns else time.perf_counter_ns()
+            if scheduled >= deadline:
+                break
+            now = time.perf_counter_ns()
+            if scheduled > now:
+                time.sleep((scheduled - now) / 1e9)
+            name = rng.choices(names, weights)[0]
+            report = {}
+            start = scheduled if interval_ns else time.perf_counter_ns()
+            try:
+                ok = bool(OPERATIONS[name](store, data, row % DATASET_ROWS, report))
+            except Exception as e:
+                print(f"Error running workload operation {name}: {e}")
+                ok = False
+            histograms[name].record(time.perf_counter_ns() - start, ok)
+            retries += report.get('retries', 0)
+            if name == "insert":
+                row += workers
+            sequence += 1
+    finally:
+        store.close()
+    return {'histograms': histograms, 'retries': retries}
+
+
+def _process_worker(args):
+    backend, backend_options = args[2], args[3]
+    probe = create_backend(backend, **backend_options)
+    before = probe.lock_stats() if hasattr(probe, "lock_stats") else None
+    result = _worker(*args)
+    if before is not None:
+        result['contention'] = _delta(before, probe.lock_stats())
+    probe.close()
+    return result
+
+
+def _run_threads(worker_args, workers):
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='workload') as executor:
+        futures = [executor.submit(_worker, worker_id, *worker_args) for worker_id in range(workers)]
+        return [future.result() for future in futures]
+
+
+def _run_processes(worker_args, workers):
+    # spawn gives every worker its own interpreter, connection pool and GIL.
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        return pool.map(_process_worker, [(worker_id, *worker_args) for worker_id in range(workers)])
+
+
+async def _task(worker_id, workers, store, data, mix, seed, rate, duration, started_at, executor):
+    """
+    Runs one asyncio task's share of the workload, see _worker().
+
+    Pacing happens on the event loop; each operation is one blocking backend
+    call handed to the shared executor, so tasks queue for its threads like
+    requests queue for the threadpool of the FastAPI endpoints. Open-loop
+    latencies include that queueing.
+    """
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed * 1000 + worker_id)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    histograms = {name: LatencyHistogram() for name in names}
+    retries = 0
+    row = worker_id
+
+    await asyncio.sleep(max(0.0, started_at - time.time()))
+    origin = time.perf_counter_ns()
+    deadline = origin + int(duration * 1e9)
+    interval_ns = int(1e9 / rate) if rate else 0
+    sequence = 0
+    while True:
+        scheduled = origin + sequence * interval_ns if interval_ns else time.perf_counter_ns()
+        if scheduled >= deadline:
+            break
+        now = time.perf_counter_ns()
+        if scheduled > now:
+            await asyncio.sleep((scheduled - now) / 1e9)
+        name = rng.choices(names, weights)[0]
+        report = {}
+        start = scheduled if interval_ns else time.perf_counter_ns()
+        try:
+            ok = bool(await loop.run_in_executor(executor, OPERATIONS[name], store, data, row % DATASET_ROWS, report))
+        except Exception as e:
+            print(f"Error running workload operation {name}: {e}")
+            ok = False
+        histograms[name].record(time.perf_counter_ns() - start, ok)
+        retries += report.get('retries', 0)
+        if name == "insert":
+            row += workers
+        sequence += 1
+    return {'histograms': histograms, 'retries': retries}
+
+
+async def _run_tasks(worker_args, workers, threads):
+    _, backend, backend_options, mix, seed, rate, duration, started_at = worker_args
+    data = get_dataset_cache().get(DATASET_ROWS, seed)
+    stores = [create_backend(backend, **backend_options) for _ in range(workers)]
+    try:
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='workload') as executor:
+            return await asyncio.gather(*(
+                _task(worker_id, workers, store, data, mix, seed, rate, duration, started_at, executor)
+                for worker_id, store in enumerate(stores)
+            ))
+    finally:
+        for store in stores:
+            store.close()
+
+
+def run_workload(backend="mariadb", mix=None, workers=4, mode="threads", rate=None, duration=10.0,
+                 seed=BENCHMARK_SEED, threads=None, **backend_options):
+    """
+    Runs a mixed workload and summarizes it.
+
+    Args:
+        backend (str): A registered backend name.
+        mix (dict): Operation name -> relative weight. Defaults to DEFAULT_MIX.
+        workers (int): Concurrent threads, processes or asyncio tasks.
+        mode (str): One of MODES.
+        rate (float): Target operations per second over all workers; None runs closed-loop.
+        duration (float): Seconds to run.
+        seed (int): Dataset seed and base of the workers' random streams.
+        threads (int): Executor threads shared by the asyncio tasks. Defaults to
+            ThreadPoolExecutor's own default, min(32, CPU count + 4).
+        **backend_options: Backend settings, see create_backend().
+
+    Returns:
+        dict: Settings, per-operation histogram summaries, totals and contention counters.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown workload mode: {mode}")
+    mix = mix or DEFAULT_MIX
+    # Build the dataset before timing so workers only map it.
+    get_dataset_cache().get(DATASET_ROWS, seed)
+    probe = create_backend(backend, **backend_options)
+    lock_before = probe.lock_stats() if hasattr(probe, "lock_stats") else None
+
+    worker_rate = rate / workers if rate else None
+    # Common start time, leaving spawned processes time to import.
+    started_at = time.time() + (3.0 if mode == "processes" else 0.2)
+    worker_args = (workers, backend, backend_options, mix, seed, worker_rate, duration, started_at)
+    if mode == "threads":
+        results = _run_threads(worker_args, workers)
+    elif mode == "processes":
+        results = _run_processes(worker_args, workers)
+    else:
+        results = asyncio.run(_run_tasks(worker_args, workers, threads))
+    contention = {}
+    if lock_before is not None:
+        contention = _delta(lock_before, probe.lock_stats())
+        if mode == "processes":
+            # The probe only sees this process's pool; use the workers' own.
+            for key in [key for key in contention if key.startswith('pool_')]:
+                contention[key] = round(sum(result['contention'][key] for result in results), 3)
+    probe.close()
+    contention['lock_wait_retries'] = sum(result['retries'] for result in results)
+
+    merged = {name: LatencyHistogram() for name in mix}
+    total = LatencyHistogram()
+    for result in results:
+        for name, histogram in result['histograms'].items():
+            merged[name].merge(histogram)
+            total.merge(histogram)
+    return {
+        'backend': backend,
+        'options': backend_options,
+        'mode': mode,
+        'workers': workers,
+        'threads': threads if mode == "asyncio" else None,
+        'rate': rate,
+        'duration': duration,
+        'mix': mix,
+        'seed': seed,
+        'operations': {name: histogram.summary(duration) for name, histogram in merged.items()},
+        'total': total.summary(duration),
+        'contention': contention,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', default='mariadb')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='weighted operations, e.g. insert=80,simple=15,join=5')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mode', choices=MODES, default='threads')
+    parser.add_argument('--threads', type=int, help='executor threads for --mode asyncio')
+    parser.add_argument('--rate', type=float, help='target operations per second; closed loop if omitted')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+    parser.add_argument('--option', action='append', default=[], metavar='KEY=VALUE',
+                        help='backend option, e.g. retention=batched')
+    parser.add_argument('--output', help='JSON result file')
+    args = parser.parse_args()
+
+    options = {}
+    for option in args.option:
+        key, value = option.split('=', 1)
+        options[key] = int(value) if value.lstrip('-').isdigit() else value
+    result = run_workload(args.backend, args.mix, args.workers, args.mode, args.rate, args.duration,
+                          args.seed, args.threads, **options)
+    for name, summary in result['operations'].items():
+        print(f"{name:<8} {summary['count']:>8} ops  {summary['ops_per_sec']:>9} ops/s  "
+              f"p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms  errors {summary['errors']}")
+    print(f"contention: {result['contention']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
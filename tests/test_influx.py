@@ -0,0 +1,223 @@
+"""
+InfluxDB helpers against a stub of the InfluxDB v2 HTTP API.
+"""
+import gzip
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from src import influx
+from src.generator import MESSAGE_TABLE, generate_columns
+
+
+class InfluxStub(BaseHTTPRequestHandler):
+    """
+    Records every POST as (path, query string, body).
+
+    Writes and deletes are answered with 204, queries with query_csv, an
+    annotated CSV of the pivoted records.
+    """
+
+    calls = None
+    query_csv = ""
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        self.calls.append((url.path, parse_qs(url.query), body.decode('utf-8')))
+        if url.path == '/api/v2/query':
+            payload = self.query_csv.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        self.send_response(204 if url.path in ('/api/v2/write', '/api/v2/delete') else 404)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+    @classmethod
+    def bodies(cls, path):
+        return [body for call_path, _, body in cls.calls if call_path == path]
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Points the module's client at a local stub and returns its handler class."""
+    handler = type('Handler', (InfluxStub,), {'calls': []})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('INFLUXDB_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv('INFLUXDB_TOKEN', 'test-token')
+    monkeypatch.setenv('INFLUXDB_ORG', 'test-org')
+    monkeypatch.setenv('INFLUXDB_BUCKET', 'test-bucket')
+    monkeypatch.setattr(influx, '_client', None)
+    monkeypatch.setattr(influx, '_sequence', 0)
+    yield handler
+    if influx._client:
+        influx._client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _writes(stub):
+    """Returns the (query string, body) of every write sent to the stub."""
+    return [(params, body) for path, params, body in stub.calls if path == '/api/v2/write']
+
+
+def _points(writes):
+    return [line for _, body in writes for line in body.splitlines() if line]
+
+
+def test_every_generated_event_is_written(stub):
+    columns = generate_columns(1200, seed=7)
+    report = {}
+
+    assert influx.insert_events_influxdb(columns, batch_size=500, flush_interval=100, report=report)
+
+    points = _points(_writes(stub))
+    assert len(points) == 1200
+    assert report['rows'] == 1200
+    assert len(_writes(stub)) >= 3
+    for query, _ in _writes(stub):
+        assert query['bucket'] == ['test-bucket']
+        assert query['org'] == ['test-org']
+        assert query['precision'] == ['ns']
+    messages = {message.replace('\\', '\\\\').replace('"', '\\"') for message in MESSAGE_TABLE[columns['message_ID']]}
+    assert {point.split(' message="', 1)[1].rsplit('" ', 1)[0] for point in points} == messages
+
+
+def test_timestamps_are_seconds_plus_sequence(stub):
+    columns = generate_columns(300, seed=11)
+
+    assert influx.insert_events_influxdb(columns, batch_size=100, flush_interval=100)
+
+    timestamps = sorted(int(point.rsplit(' ', 1)[1]) for point in _points(_writes(stub)))
+    seconds = sorted(columns['timestamp'].tolist())
+    # Nanosecond precision: the second is kept and the sub-second part is the
+    # running sequence number, unique across the write.
+    assert sorted(timestamp // 1_000_000_000 for timestamp in timestamps) == seconds
+    assert sorted(timestamp % 1_000_000_000 for timestamp in timestamps) == list(range(300))
+    assert influx._sequence == 300
+
+
+def test_sequence_continues_across_writes(stub):
+    assert influx.insert_events_influxdb(generate_columns(50, seed=1))
+    assert influx.insert_events_influxdb(generate_columns(50, seed=2))
+
+    suffixes = sorted(int(point.rsplit(' ', 1)[1]) % 1_000_000_000 for point in _points(_writes(stub)))
+    assert suffixes == list(range(100))
+
+
+def test_tags_and_fields_are_escaped(stub, monkeypatch):
+    monkeypatch.setattr(influx, '_COUNTRY_TAGS', [influx._escape_tag('New Zealand, North=1')] * 4)
+    events = [
+        {'timestamp': '2024-05-01 12:00:00', 'message': 'Disk "sda" at C:\\data full',
+         'severity_ID': 2, 'event_type_ID': 3, 'source_ID': 1},
+        {'timestamp': datetime(2024, 5, 1, 12, 0, 1), 'message': 'Login, user=admin',
+         'severity_ID': 1, 'event_type_ID': 1, 'source_ID': 4},
+    ]
+
+    assert influx.insert_events_influxdb(events)
+
+    second = int(datetime(2024, 5, 1, 12, tzinfo=timezone.utc).timestamp())
+    assert _points(_writes(stub)) == [
+        'event,country=New\\ Zealand\\,\\ North\\=1,event_type_ID=3,severity_ID=2,source_ID=1 '
+        f'message="Disk \\"sda\\" at C:\\\\data full" {second * 1_000_000_000}',
+        'event,country=New\\ Zealand\\,\\ North\\=1,event_type_ID=1,severity_ID=1,source_ID=4 '
+        f'message="Login, user=admin" {(second + 1) * 1_000_000_000 + 1}',
+    ]
+
+
+def _annotated_csv(columns, types, rows):
+    """Builds the annotated CSV the query endpoint returns for pivoted records."""
+    lines = [
+        "#datatype,string,long," + ",".join(types),
+        "#group,false,false," + ",".join("false" for _ in columns),
+        "#default,_result,," + ",".join("" for _ in columns),
+        ",result,table," + ",".join(columns),
+    ]
+    lines += [",,0," + ",".join(row) for row in rows]
+    return "\r\n".join(lines) + "\r\n\r\n"
+
+
+RECORD_COLUMNS = ["_time", "_measurement", "country", "event_type_ID", "severity_ID", "source_ID", "message"]
+RECORD_TYPES = ["dateTime:RFC3339", "string", "string", "string", "string", "string", "string"]
+
+
+def _flux(stub):
+    return [json.loads(body)['query'] for body in stub.bodies('/api/v2/query')]
+
+
+@pytest.mark.parametrize("shape, select, condition", [
+    ("all", influx.select_all_events_influxdb, None),
+    ("simple", influx.select_simple_events_influxdb, 'r.severity_ID == "2"'),
+    ("join", influx.select_join_events_influxdb, 'r.country == "USA"'),
+])
+def test_select_sends_the_shape_filter(stub, shape, select, condition):
+    stub.query_csv = _annotated_csv(RECORD_COLUMNS, RECORD_TYPES, [
+        ["2024-05-01T12:00:00Z", "event", "USA", "1", "2", "3", '"Login, ok"'],
+    ])
+
+    events = select()
+
+    [query] = _flux(stub)
+    [(_, params, _)] = stub.calls
+    assert params['org'] == ['test-org']
+    assert 'from(bucket: "test-bucket")' in query
+    assert '|> range(start: 0)' in query
+    assert '|> filter(fn: (r) => r._measurement == "event")' in query
+    assert query.count('|> filter(') == (2 if condition else 1)
+    if condition:
+        assert f'|> filter(fn: (r) => {condition})' in query
+    assert query.rstrip().endswith('|> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")')
+    assert events == [{
+        'timestamp': datetime(2024, 5, 1, 12, tzinfo=timezone.utc),
+        'message': 'Login, ok',
+        'severity_ID': 2,
+        'event_type_ID': 1,
+        'source_ID': 3,
+    }]
+
+
+def test_update_rewrites_points_and_deletes_the_old_series(stub):
+    stub.query_csv = _annotated_csv(RECORD_COLUMNS + ["time_ns"], RECORD_TYPES + ["long"], [
+        ["2024-05-01T12:00:00Z", "event", "USA", "1", "2", "3", '"Disk ""sda"" full"', "1714564800000000007"],
+        ["2024-05-01T12:00:01Z", "event", "Poland", "4", "2", "1", "Login ok", "1714564801000000008"],
+    ])
+
+    assert influx.update_simple_events_influxdb()
+
+    assert [path for path, _, _ in stub.calls] == ['/api/v2/query', '/api/v2/write', '/api/v2/delete']
+    [query] = _flux(stub)
+    assert '|> filter(fn: (r) => r.severity_ID == "2")' in query
+    assert '|> map(fn: (r) => ({r with time_ns: int(v: r._time)}))' in query
+    # Same tags except severity, same message, and the original nanosecond timestamps.
+    assert _points(_writes(stub)) == [
+        'event,country=USA,event_type_ID=1,severity_ID=3,source_ID=3 message="Disk \\"sda\\" full" '
+        '1714564800000000007',
+        'event,country=Poland,event_type_ID=4,severity_ID=3,source_ID=1 message="Login ok" 1714564801000000008',
+    ]
+    [(_, params, body)] = [call for call in stub.calls if call[0] == '/api/v2/delete']
+    assert params['bucket'] == ['test-bucket']
+    assert params['org'] == ['test-org']
+    delete = json.loads(body)
+    assert delete['predicate'] == '_measurement="event" AND severity_ID="2"'
+    assert delete['start'].startswith('1970-01-01T00:00:00')
+    assert delete['stop'].startswith('2100-01-01T00:00:00')
+
+
+def test_update_without_matches_writes_nothing(stub):
+    stub.query_csv = _annotated_csv(RECORD_COLUMNS + ["time_ns"], RECORD_TYPES + ["long"], [])
+
+    assert influx.update_simple_events_influxdb()
+
+    assert [path for path, _, _ in stub.calls] == ['/api/v2/query']
@@ -0,0 +1,28 @@
+"""
+Cold start budget of the web app, see src/bench_startup.py.
+
+The limits are generous on purpose: they catch a heavy dependency creeping
+back into the import path, not normal variance between machines.
+"""
+import pytest
+from src.bench_startup import measure_startup
+
+MAX_IMPORT_MS = 3000
+MAX_RSS_MB = 250
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return measure_startup()
+
+
+def test_no_heavy_modules_at_startup(startup):
+    assert startup['loaded'] == []
+
+
+def test_import_time_within_budget(startup):
+    assert startup['import_ms'] < MAX_IMPORT_MS
+
+
+def test_rss_within_budget(startup):
+    assert startup['rss_mb'] < MAX_RSS_MB